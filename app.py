@@ -1,4 +1,5 @@
 # app.py
+import os
 from flask import Flask, render_template, session, redirect, url_for
 from flask_mysqldb import MySQL
 
@@ -28,6 +29,13 @@ app.register_blueprint(reviewer_bp)
 app.register_blueprint(timestamp_bp)
 app.register_blueprint(result_bp)
 
+# 분석 전용 워커는 ML 모델을 기동 시 미리 로드 (SHORTORY_WARMUP=1)
+# 그 외 워커는 첫 분석 요청 때 로드되므로 로그인/상점 등은 빠르게 뜸
+app.config['ANALYSIS_WARMUP'] = os.environ.get('SHORTORY_WARMUP') == '1'
+if app.config['ANALYSIS_WARMUP']:
+    from reviewer.services.analysis_service import warm_up
+    warm_up(load_object_model=True)
+
 # ✅ 메인: 항상 랜딩 페이지 렌더
 @app.route('/')
 def index():
@@ -3,6 +3,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, sessio
 from datetime import datetime
 from MySQLdb.cursors import DictCursor
 import os, glob
+from reviewer.services.timeline_store import post_timelines
 
 creator_bp = Blueprint('creator', __name__, url_prefix='/creator')
 
@@ -249,7 +250,28 @@ def review_result(post_id, reviewer_id):
                            clips=clips)
 
 
-# ★ 별점 저장 (Creator가 Reviewer에게) - JSON 응답
+# 리뷰어 통합 집중도 히트맵 (초 단위 평균 집중도 / 감정 분포 / 시선이 객체에 머문 샘플 수) - JSON 응답
+@creator_bp.route('/attention_timeline/<int:post_id>')
+def attention_timeline(post_id):
+    if 'loggedin' not in session or session.get('role') != 'creator':
+        return jsonify({"ok": False, "msg": "로그인이 필요합니다."}), 401
+
+    cur = current_app.mysql.connection.cursor(DictCursor)
+    cur.execute("SELECT creator_id FROM posts WHERE id=%s", (post_id,))
+    row = cur.fetchone()
+    cur.close()
+    if not row:
+        return jsonify({"ok": False, "msg": "해당 글을 찾을 수 없습니다."}), 404
+    if row['creator_id'] != session['user_id']:
+        return jsonify({"ok": False, "msg": "권한이 없습니다."}), 403
+
+    heatmap = post_timelines.heatmap(post_id)
+    if heatmap is None:
+        return jsonify({"ok": True, "timeline": None, "msg": "아직 분석이 끝난 리뷰 세션이 없습니다."}), 200
+    return jsonify({"ok": True, "timeline": heatmap}), 200
+
+
+
 @creator_bp.route('/rate', methods=['POST'])
 @creator_bp.post('/rate')
 def rate_reviewer():
@@ -0,0 +1,73 @@
+# background_writer.py
+# 파이프라인 단계 사이의 데이터는 메모리로 바로 넘기고, 감사/디버깅용 중간 결과 파일은
+# 백그라운드 스레드에서 저장 (직렬화/디스크 쓰기가 숏폼 생성까지의 경로를 막지 않도록)
+import os
+import json
+import queue
+import threading
+from typing import Any, Dict, Iterable, Iterator
+
+from .object_log import ObjectLogWriter
+
+_END = object()
+
+
+def save_json_async(path: str, data: Any) -> threading.Thread:
+    """
+    data를 JSON으로 저장하는 스레드를 시작하고 반환 (기다릴 필요가 있을 때만 join)
+    """
+    def write():
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"[PERSIST ERROR] {path}: {e}")
+
+    thread = threading.Thread(target=write, name="persist-json")
+    thread.start()
+    return thread
+
+
+class AsyncObjectLog:
+    """
+    tee()로 흘려보내는 프레임 레코드를 백그라운드 스레드가 .jsonl 객체 로그로 기록.
+    레코드 직렬화는 탐지보다 훨씬 빨라 큐는 거의 비어 있으므로 크기 제한 없이 탐지를 막지 않음.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.Queue" = queue.Queue()
+        self._failed = False
+        self._thread = threading.Thread(target=self._write_loop, name="persist-objects")
+        self._thread.start()
+
+    def _write_loop(self):
+        try:
+            with ObjectLogWriter(self.path) as writer:
+                while True:
+                    record = self._queue.get()
+                    if record is _END:
+                        return
+                    writer.write(record)
+        except Exception as e:
+            self._failed = True
+            print(f"[PERSIST ERROR] {self.path}: {e}")
+
+    def tee(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        records를 그대로 내보내면서 기록 큐에도 넣음 (records가 끝나거나 중단되면 로그를 닫음)
+        """
+        try:
+            for record in records:
+                if not self._failed:
+                    self._queue.put(record)
+                yield record
+        finally:
+            self.close()
+
+    def close(self):
+        self._queue.put(_END)
+
+    def join(self, timeout: float = None):
+        self._thread.join(timeout)
@@ -0,0 +1,554 @@
+# benchmark.py
+# 분석 파이프라인 성능 측정용 CLI
+#
+#   python -m reviewer.analysis.benchmark face --video webcam_sample.mp4
+#   python -m reviewer.analysis.benchmark startup
+#   python -m reviewer.analysis.benchmark yolo --video sample.mp4 --batch-sizes 1 8 16
+#   python -m reviewer.analysis.benchmark decode --video sample.mp4 --skip 30
+#   python -m reviewer.analysis.benchmark shard --video long.mp4 --workers 1 2 4 8
+#   python -m reviewer.analysis.benchmark gate --video talking_head.mp4 --thresholds 2 4 8
+#   python -m reviewer.analysis.benchmark profile --fixture a.mp4 a_emotion_log.npz --imgsz 640 480 320 --classes person "cell phone"
+#   python -m reviewer.analysis.benchmark focus --minutes 60
+#   python -m reviewer.analysis.benchmark focus-verify --sessions 20
+#   python -m reviewer.analysis.benchmark emotion-parity [--fixtures path/to/face_fixtures]
+import os
+import sys
+import time
+import random
+import subprocess
+import argparse
+from typing import List
+
+import cv2
+import numpy as np
+
+from .box_tracker import bbox_iou
+from .export_emotion_model import PARITY_FACES, PARITY_SEED
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def load_frames(source: str, max_frames: int = 200, step: int = 1) -> List[np.ndarray]:
+    """
+    비디오 파일 또는 이미지 디렉토리에서 BGR 프레임 목록을 읽음
+    """
+    frames: List[np.ndarray] = []
+    if os.path.isdir(source):
+        for fname in sorted(os.listdir(source)):
+            if fname.lower().endswith(IMAGE_EXTS):
+                img = cv2.imread(os.path.join(source, fname), cv2.IMREAD_COLOR)
+                if img is not None:
+                    frames.append(img)
+            if len(frames) >= max_frames:
+                break
+        return frames
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise IOError(f"영상 열기 실패: {source}")
+    frame_id = 0
+    try:
+        while len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if frame_id % step == 0:
+                frames.append(frame)
+            frame_id += 1
+    finally:
+        cap.release()
+    return frames
+
+
+def bench_face(args):
+    """
+    얼굴 위치 추정 방식별 프레임당 CPU 시간 비교 (cascade + FaceMesh vs FaceMesh 단독)
+    """
+    from . import emotion_gaze
+
+    frames = load_frames(args.video, max_frames=args.frames, step=args.step)
+    if not frames:
+        print("[BENCH] 프레임 없음")
+        return
+    print(f"[BENCH] 프레임 {len(frames)}개, 해상도 {frames[0].shape[1]}x{frames[0].shape[0]}")
+
+    # 모델/세션 초기화 비용이 측정에 섞이지 않도록 한 번 실행
+    emotion_gaze.analyze_frame_np(frames[0], "bench-warmup", localizer="cascade")
+    emotion_gaze.close_session("bench-warmup")
+
+    outputs = {}
+    for mode in ("cascade", "mesh"):
+        task_id = f"bench-{mode}"
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        outputs[mode] = [emotion_gaze.analyze_frame_np(f, task_id, localizer=mode) for f in frames]
+        cpu_ms = (time.process_time() - cpu_start) / len(frames) * 1000.0
+        wall_ms = (time.perf_counter() - wall_start) / len(frames) * 1000.0
+        emotion_gaze.close_session(task_id)
+
+        found = sum(1 for r in outputs[mode] if r["emotion"] not in ("Unknown", "Error"))
+        print(f"[BENCH] {mode:8s} CPU {cpu_ms:7.2f}ms/frame, wall {wall_ms:7.2f}ms/frame, 얼굴 검출 {found}/{len(frames)}")
+
+    same = sum(1 for a, b in zip(outputs["cascade"], outputs["mesh"]) if a["emotion"] == b["emotion"])
+    print(f"[BENCH] 감정 일치율 {same / len(frames) * 100:.1f}%")
+
+
+def _time_import_app(warmup: bool) -> float:
+    code = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+    env = dict(os.environ, SHORTORY_WARMUP="1" if warmup else "0")
+    out = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env,
+                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def bench_startup(args):
+    """
+    `import app` 소요 시간: 지연 로드(기본) vs 기동 시 ML 모델 로드(SHORTORY_WARMUP=1, 기존 방식과 동일한 비용)
+    """
+    for label, warmup in (("lazy", False), ("eager", True)):
+        times = [_time_import_app(warmup) for _ in range(args.repeat)]
+        print(f"[BENCH] import app ({label:5s}) 최소 {min(times):.3f}s, 평균 {sum(times) / len(times):.3f}s")
+
+
+def bench_yolo(args):
+    """
+    YOLO 배치 크기별 처리량(fps) 비교. 결과가 배치 크기 1과 동일한지도 확인
+    """
+    from .object_detector import _get_model, detect_frames
+
+    frames = load_frames(args.video, max_frames=args.frames, step=args.step)
+    if not frames:
+        print("[BENCH] 프레임 없음")
+        return
+    model = _get_model(device=args.device)
+    detect_frames(model, frames[:1])  # 모델 초기화/첫 호출 비용 제외
+    print(f"[BENCH] 프레임 {len(frames)}개, 해상도 {frames[0].shape[1]}x{frames[0].shape[0]}")
+
+    baseline = None
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        outputs = []
+        for i in range(0, len(frames), batch_size):
+            outputs.extend(detect_frames(model, frames[i:i + batch_size]))
+        elapsed = time.perf_counter() - start
+
+        if baseline is None:
+            baseline = outputs
+        same = sum(1 for a, b in zip(baseline, outputs)
+                   if [(o["label"], o["bbox"]) for o in a] == [(o["label"], o["bbox"]) for o in b])
+        print(f"[BENCH] batch {batch_size:3d}: {len(frames) / elapsed:7.2f} fps, "
+              f"첫 배치 크기 결과와 일치 {same}/{len(frames)}")
+
+
+def bench_decode(args):
+    """
+    skip 간격 프레임 읽기: 모든 프레임 cap.read() (기존) vs FrameSource (grab + 백그라운드 디코딩)
+    """
+    from .frame_source import FrameSource
+
+    start = time.perf_counter()
+    cap = cv2.VideoCapture(args.video)
+    frame_id, kept = 0, 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if frame_id % args.skip == 0:
+            kept += 1
+        frame_id += 1
+    cap.release()
+    read_sec = time.perf_counter() - start
+    print(f"[BENCH] cap.read 전체   : {read_sec:7.3f}s ({kept}프레임 사용 / {frame_id}프레임)")
+
+    for max_side in (None, args.max_side):
+        start = time.perf_counter()
+        with FrameSource(args.video, skip_frames=args.skip, max_side=max_side) as source:
+            count = sum(1 for _ in source)
+        elapsed = time.perf_counter() - start
+        label = f"FrameSource{'' if max_side is None else f'({max_side}px)'}"
+        print(f"[BENCH] {label:15s}: {elapsed:7.3f}s ({count}프레임), {read_sec / elapsed:5.2f}배")
+
+
+def bench_shard(args):
+    """
+    워커 프로세스 수별 객체 탐지 wall time (워커 초기화/모델 로드 포함), 결과 동일 여부 확인
+    """
+    from .object_detector import detect_objects_in_video
+
+    baseline, base_sec = None, None
+    for num_workers in args.workers:
+        start = time.perf_counter()
+        results = detect_objects_in_video(args.video, skip_frames=args.skip, batch_size=args.batch_size,
+                                          num_workers=num_workers)
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline, base_sec = results, elapsed
+        same = results == baseline
+        print(f"[BENCH] 워커 {num_workers:2d}: {elapsed:8.2f}s, 가속 {base_sec / elapsed:5.2f}배, "
+              f"프레임 {len(results)}개, 결과 일치 {same}")
+
+
+def bench_seek(args):
+    """
+    샤드 시작 프레임 검증: 샤드처럼 seek해서 읽은 프레임이 처음부터 순차 디코딩한 프레임과 같은지 (YOLO 없이 픽셀 비교)
+    """
+    from .frame_source import FrameSource, probe_video
+    from .object_detector import _plan_shards
+
+    _, _, _, total_frames = probe_video(args.video)
+    shards = _plan_shards(list(range(0, total_frames, max(1, args.skip))), args.workers)
+    # 각 샤드 앞쪽 프레임들 (seek 직후 위치가 어긋나면 여기서 차이가 남)
+    checked = [fid for shard in shards[1:] for fid in shard[:args.frames]]
+
+    with FrameSource(args.video, frame_ids=checked, seek_gap=total_frames + 1) as source:
+        reference = {fid: frame for fid, frame in source}
+    mismatched = []
+    for shard in shards[1:]:
+        with FrameSource(args.video, frame_ids=shard[:args.frames], seek_gap=args.seek_gap) as source:
+            for fid, frame in source:
+                if fid not in reference or not np.array_equal(frame, reference[fid]):
+                    mismatched.append(fid)
+    print(f"[BENCH] 샤드 {len(shards)}개, 시작 부분 프레임 {len(checked)}개 비교: 불일치 {len(mismatched)}개"
+          + (f" (예: {mismatched[:10]})" if mismatched else ""))
+    return not mismatched
+
+
+def box_agreement(reference: List[dict], candidate: List[dict], iou_threshold: float = 0.5) -> float:
+    """
+    한 프레임의 두 객체 목록 일치도 (같은 라벨 + IoU 기준 탐욕 매칭 F1, 둘 다 비어 있으면 1)
+    """
+    if not reference and not candidate:
+        return 1.0
+    unmatched = list(candidate)
+    matched = 0
+    for ref in reference:
+        best, best_iou = None, iou_threshold
+        for cand in unmatched:
+            if cand["label"] == ref["label"]:
+                iou = bbox_iou(ref["bbox"], cand["bbox"])
+                if iou >= best_iou:
+                    best, best_iou = cand, iou
+        if best is not None:
+            unmatched.remove(best)
+            matched += 1
+    return 2.0 * matched / (len(reference) + len(candidate))
+
+
+def bench_gate(args):
+    """
+    모션 게이트 임계값별 속도/생략 수와 전체 탐지 대비 박스 일치도
+    """
+    from .object_detector import detect_objects_in_video
+
+    start = time.perf_counter()
+    full = detect_objects_in_video(args.video, skip_frames=args.skip)
+    full_sec = time.perf_counter() - start
+    print(f"[BENCH] 전체 탐지      : {full_sec:7.2f}s, 프레임 {len(full)}개")
+
+    for threshold in args.thresholds:
+        start = time.perf_counter()
+        gated = detect_objects_in_video(args.video, skip_frames=args.skip, motion_threshold=threshold,
+                                        max_reuse=args.max_reuse)
+        elapsed = time.perf_counter() - start
+        reused = [i for i, rec in enumerate(gated) if rec.get("reused")]
+        scores = [box_agreement(a["objects"], b["objects"]) for a, b in zip(full, gated)]
+        reused_scores = [scores[i] for i in reused] or [1.0]
+        print(f"[BENCH] 임계값 {threshold:5.1f}: {elapsed:7.2f}s ({full_sec / elapsed:5.2f}배), "
+              f"생략 {len(reused)}/{len(gated)}, 박스 일치도 전체 {np.mean(scores):.3f} "
+              f"/ 재사용 프레임 {np.mean(reused_scores):.3f}")
+
+
+def bench_profile(args):
+    """
+    추론 설정(imgsz, 클래스 목록, conf)별 fps와, 기본 설정 대비 구간별 집중 객체가 바뀌는 비율
+    """
+    from .object_detector import detect_objects_at_timestamps, inference_options
+    from .focus_analyzer import analyze_focus, load_emotion_logs
+
+    profiles = [(imgsz, None) for imgsz in args.imgsz]
+    if args.classes:
+        profiles += [(imgsz, args.classes) for imgsz in args.imgsz]
+
+    for video, log_path in args.fixture:
+        emotion_logs = load_emotion_logs(log_path)
+        timestamps = [e["timestamp"] for e in emotion_logs]
+        print(f"[BENCH] {os.path.basename(video)}: 감정 샘플 {len(timestamps)}개")
+
+        baseline = None
+        for imgsz, classes in [(None, None)] + profiles:
+            inference = inference_options(args.weights, imgsz, classes, args.conf)
+            start = time.perf_counter()
+            objects = detect_objects_at_timestamps(video, timestamps, inference=inference)
+            elapsed = time.perf_counter() - start
+
+            windows = analyze_focus(emotion_logs, objects, window_sec=args.window_sec, step_sec=args.step_sec,
+                                    top_k=len(emotion_logs) + 1)
+            focus = {w["start"]: w["object"] for w in windows}
+            if baseline is None:
+                baseline = focus
+            changed = sum(1 for start_t, obj in focus.items() if baseline.get(start_t) != obj)
+            label = "기본" if imgsz is None else f"imgsz={imgsz}{' +classes' if classes else ''}"
+            print(f"[BENCH]   {label:22s}: {len(objects) / elapsed:7.2f} fps, "
+                  f"집중 객체 변경 {changed}/{len(focus)} ({changed / max(len(focus), 1) * 100:.1f}%)")
+
+
+EMOTIONS = ["happy", "sad", "angry", "neutral", "surprise"]
+OBJECT_LABELS = ["person", "cup", "tv", "dog", "car", "chair", "cell phone"]
+
+
+def synthetic_session(seconds: int, fps: float = 30.0, emotion_hz: float = 2.0, max_objects: int = 5,
+                      resolution=(1280, 720), seed: int = 0):
+    """
+    길이 seconds초 세션의 가짜 (감정 로그, 프레임마다의 객체 로그) 생성 (성능 측정용)
+    """
+    rnd = random.Random(seed)
+    width, height = resolution
+    object_logs = []
+    for fid in range(int(seconds * fps)):
+        objects = []
+        for _ in range(rnd.randint(0, max_objects)):
+            x1, y1 = rnd.randint(0, width - 200), rnd.randint(0, height - 200)
+            objects.append({"label": rnd.choice(OBJECT_LABELS),
+                            "bbox": [x1, y1, x1 + rnd.randint(20, 200), y1 + rnd.randint(20, 200)],
+                            "confidence": rnd.random()})
+        object_logs.append({"frame_id": fid, "timestamp": round(fid / fps, 3), "objects": objects,
+                            "resolution": [width, height]})
+
+    emotion_logs = []
+    for i in range(int(seconds * emotion_hz)):
+        pupil = (float(rnd.randint(0, width)), float(rnd.randint(0, height))) if rnd.random() < 0.8 else None
+        emotion_logs.append({"timestamp": round(i / emotion_hz + rnd.random() * 0.2, 3),
+                             "emotion": rnd.choice(EMOTIONS), "attention": rnd.choice([0.2, 0.5, 1.0]),
+                             "pupil": pupil})
+    return emotion_logs, object_logs
+
+
+def bench_focus(args):
+    """
+    합성 세션에서 최근접 객체 프레임 탐색: 기존 선형 탐색(min) vs 정렬 색인 + 이진 탐색.
+    선형 탐색은 전부 돌리면 수 시간이 걸리므로 일부 샘플로 1회 비용을 재서 analyze_focus 전체 호출 수로 환산
+    """
+    from .focus_analyzer import analyze_focus
+    from .focus_engine import FocusSamples, nearest_object_frames
+    from .log_columns import object_records_to_columns
+
+    emotion_logs, object_logs = synthetic_session(args.minutes * 60, fps=args.fps, emotion_hz=args.emotion_hz,
+                                                  max_objects=args.max_objects)
+    timestamps = [e["timestamp"] for e in emotion_logs]
+    print(f"[BENCH] 합성 세션 {args.minutes}분: 감정 샘플 {len(emotion_logs)}개, 객체 프레임 {len(object_logs)}개")
+
+    # 기존 analyze_focus의 min() 호출 수 = 모든 윈도우에 속한 감정 샘플 수의 합
+    lookups, t = 0, min(timestamps)
+    while t < max(timestamps) - args.window_sec:
+        lookups += sum(1 for ts in timestamps if t <= ts < t + args.window_sec)
+        t += args.step_sec
+
+    sample = random.Random(1).sample(range(len(emotion_logs)), min(args.samples, len(emotion_logs)))
+    start = time.perf_counter()
+    linear = [object_logs.index(min(object_logs, key=lambda o: abs(o["timestamp"] - timestamps[i])))
+              for i in sample]
+    per_lookup = (time.perf_counter() - start) / len(sample)
+    print(f"[BENCH] 선형 탐색   : 1회 {per_lookup * 1000:8.3f}ms x {lookups}회 ≈ {per_lookup * lookups:9.2f}s (추정)")
+
+    start = time.perf_counter()
+    nearest = nearest_object_frames(object_logs, timestamps)
+    index_sec = time.perf_counter() - start
+    same = all(nearest[i] == j for i, j in zip(sample, linear))
+    print(f"[BENCH] 이진 탐색   : 전체 {len(timestamps)}개 {index_sec * 1000:8.2f}ms, "
+          f"가속 {per_lookup * lookups / index_sec:,.0f}배, 샘플 결과 일치 {same}")
+
+    start = time.perf_counter()
+    analyze_focus(emotion_logs, object_logs, window_sec=args.window_sec, step_sec=args.step_sec)
+    print(f"[BENCH] analyze_focus 전체: {time.perf_counter() - start:8.2f}s")
+
+    # 시선-박스 적중 판정: 객체 로그 컬럼(.npz)을 그대로 넘기는 경우
+    columns = object_records_to_columns(object_logs)
+    start = time.perf_counter()
+    samples = FocusSamples(emotion_logs, columns)
+    print(f"[BENCH] 샘플 배열 + 시선 적중 (컬럼 입력): {(time.perf_counter() - start) * 1000:8.2f}ms, "
+          f"적중 {int(samples.hits.sum())}회")
+
+
+def legacy_analyze_focus(emotion_logs, object_logs, window_sec: int = 10, step_sec: int = 5) -> List[dict]:
+    """
+    누적합 엔진 이전의 analyze_focus (윈도우마다 리스트를 다시 거르는 방식, 정렬 전 전체 윈도우) 비교 기준.
+    최빈 감정은 set 순서 대신 윈도우 안 첫 등장 순서 (기존은 실행마다 달랐던 유일한 부분)
+    """
+    from .focus_analyzer import is_point_in_bbox
+
+    min_time = min(log["timestamp"] for log in emotion_logs)
+    max_time = max(log["timestamp"] for log in emotion_logs)
+    results = []
+    t = min_time
+    while t < max_time - window_sec:
+        emo_window = [e for e in emotion_logs if t <= e["timestamp"] < t + window_sec]
+        if not emo_window:
+            t += step_sec
+            continue
+        obj_window = [min(object_logs, key=lambda o: abs(o["timestamp"] - e["timestamp"])) for e in emo_window]
+
+        emotions = [e["emotion"] for e in emo_window]
+        weights = {"surprise": 5, "happy": 4, "sad": 3, "angry": 2, "neutral": 1}
+        dominant_emotion = max(dict.fromkeys(emotions), key=emotions.count)
+        emotion_score = np.mean([weights.get(e, 0) for e in emotions])
+        attention_score = float(np.mean([e["attention"] for e in emo_window]))
+
+        object_counter = {}
+        for emo, nearest_obj_frame in zip(emo_window, obj_window):
+            for obj in nearest_obj_frame["objects"]:
+                if is_point_in_bbox(emo.get("pupil"), obj["bbox"]):
+                    object_counter[obj["label"]] = object_counter.get(obj["label"], 0) + 1
+        if object_counter:
+            focused_object, hits = max(object_counter.items(), key=lambda x: x[1])
+            object_score = min(10.0, hits / max(len(emo_window), 1) * 10.0)
+        else:
+            focused_object, object_score = None, 0.0
+
+        final_score = 0.4 * attention_score + 0.3 * emotion_score + 0.3 * object_score
+        results.append({
+            "start": round(t, 2),
+            "emotion": dominant_emotion,
+            "object": focused_object,
+            "score": round(float(final_score), 2),
+            "attention_avg": round(float(attention_score), 2),
+            "emotion_score": round(float(emotion_score), 2),
+            "object_score": round(float(object_score), 2),
+            "window": window_sec
+        })
+        t += step_sec
+    return results
+
+
+def bench_focus_verify(args):
+    """
+    누적합 엔진(focus_engine) 결과가 legacy_analyze_focus와 같은지 합성 세션으로 확인.
+    동률이 자주 나오도록 라벨 수를 줄이고 시각을 거칠게 반올림한 세션을, 원래 순서와 행을 뒤섞은 순서로 모두 비교
+    """
+    from .focus_analyzer import analyze_focus
+
+    mismatched = []
+    for seed in range(args.sessions):
+        emotion_logs, object_logs = synthetic_session(args.seconds, fps=args.fps, emotion_hz=args.emotion_hz,
+                                                      max_objects=args.max_objects, resolution=(320, 240),
+                                                      seed=seed)
+        rnd = random.Random(seed)
+        for obj in (obj for rec in object_logs for obj in rec["objects"]):
+            obj["label"] = rnd.choice(OBJECT_LABELS[:2])
+        for log in emotion_logs:
+            log["timestamp"] = round(log["timestamp"] * 2) / 2   # 같은 시각 샘플
+        shuffled = list(emotion_logs)
+        rnd.shuffle(shuffled)
+
+        for name, logs in (("원래 순서", emotion_logs), ("뒤섞은 순서", shuffled)):
+            expected = legacy_analyze_focus(logs, object_logs, args.window_sec, args.step_sec)
+            expected.sort(key=lambda x: x["score"], reverse=True)
+            actual = analyze_focus(logs, object_logs, args.window_sec, args.step_sec, top_k=len(expected))
+            if actual != expected:
+                diff = sum(a != b for a, b in zip(actual, expected)) + abs(len(actual) - len(expected))
+                mismatched.append((seed, name, diff))
+
+    print(f"[BENCH] 합성 세션 {args.sessions}개 x 2가지 순서: 불일치 {len(mismatched)}개"
+          + (f" (seed, 순서, 다른 구간 수: {mismatched[:10]})" if mismatched else ""))
+    return not mismatched
+
+
+def bench_emotion_parity(args):
+    """
+    감정 모델 Keras/ONNX top-1 일치 확인 (fixture 디렉토리 또는 고정 seed 합성 얼굴) + 프레임당 지연
+    """
+    from .export_emotion_model import check_parity
+
+    return check_parity(args.fixtures, args.count, args.seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shortory 분석 성능 측정")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_face = sub.add_parser("face", help="얼굴 위치 추정 방식별 프레임당 CPU 시간")
+    p_face.add_argument("--video", type=str, required=True, help="웹캠 녹화 영상 또는 이미지 디렉토리")
+    p_face.add_argument("--frames", type=int, default=200, help="측정할 최대 프레임 수")
+    p_face.add_argument("--step", type=int, default=1, help="영상에서 프레임 샘플링 간격")
+    p_face.set_defaults(func=bench_face)
+
+    p_startup = sub.add_parser("startup", help="import app 기동 시간 (지연 로드 vs 즉시 로드)")
+    p_startup.add_argument("--repeat", type=int, default=3, help="반복 횟수")
+    p_startup.set_defaults(func=bench_startup)
+
+    p_yolo = sub.add_parser("yolo", help="YOLO 배치 크기별 처리량(fps)")
+    p_yolo.add_argument("--video", type=str, required=True, help="분석할 영상 또는 이미지 디렉토리")
+    p_yolo.add_argument("--frames", type=int, default=128, help="측정할 최대 프레임 수")
+    p_yolo.add_argument("--step", type=int, default=1, help="영상에서 프레임 샘플링 간격")
+    p_yolo.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 16], help="비교할 배치 크기")
+    p_yolo.add_argument("--device", type=str, default="cpu", help="'cuda' or 'cpu'")
+    p_yolo.set_defaults(func=bench_yolo)
+
+    p_decode = sub.add_parser("decode", help="프레임 스킵 시 디코딩 비용 (cap.read vs FrameSource)")
+    p_decode.add_argument("--video", type=str, required=True, help="측정할 영상")
+    p_decode.add_argument("--skip", type=int, default=30, help="프레임 스킵 간격")
+    p_decode.add_argument("--max-side", type=int, default=640, help="축소 디코딩 시 긴 변 크기")
+    p_decode.set_defaults(func=bench_decode)
+
+    p_shard = sub.add_parser("shard", help="워커 프로세스 수별 객체 탐지 시간")
+    p_shard.add_argument("--video", type=str, required=True, help="측정할 영상")
+    p_shard.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="비교할 워커 수")
+    p_shard.add_argument("--skip", type=int, default=1, help="프레임 스킵 간격")
+    p_shard.add_argument("--batch-size", type=int, default=8, help="YOLO 배치 크기")
+    p_shard.set_defaults(func=bench_shard)
+
+    p_seek = sub.add_parser("seek", help="샤드 시작 seek 위치가 순차 디코딩과 같은 프레임인지 확인")
+    p_seek.add_argument("--video", type=str, required=True, help="확인할 영상")
+    p_seek.add_argument("--workers", type=int, default=4, help="샤딩 기준 워커 수")
+    p_seek.add_argument("--skip", type=int, default=1, help="프레임 스킵 간격")
+    p_seek.add_argument("--frames", type=int, default=5, help="샤드마다 비교할 앞쪽 프레임 수")
+    p_seek.add_argument("--seek-gap", type=int, default=90, help="이 간격보다 멀면 seek (FrameSource 기본값)")
+    p_seek.set_defaults(func=bench_seek)
+
+    p_gate = sub.add_parser("gate", help="모션 게이트 속도 및 박스 일치도")
+    p_gate.add_argument("--video", type=str, required=True, help="측정할 영상")
+    p_gate.add_argument("--skip", type=int, default=1, help="프레임 스킵 간격")
+    p_gate.add_argument("--thresholds", type=float, nargs="+", default=[2.0, 4.0, 8.0], help="비교할 임계값")
+    p_gate.add_argument("--max-reuse", type=int, default=10, help="연속 재사용 상한")
+    p_gate.set_defaults(func=bench_gate)
+
+    p_profile = sub.add_parser("profile", help="추론 설정별 fps와 집중 객체 변경 비율")
+    p_profile.add_argument("--fixture", nargs=2, action="append", required=True, metavar=("VIDEO", "EMOTION_LOG"),
+                           help="영상과 감정 로그(.csv/.npz) 쌍 (여러 번 지정 가능)")
+    p_profile.add_argument("--imgsz", type=int, nargs="+", default=[640, 480, 320], help="비교할 추론 해상도")
+    p_profile.add_argument("--classes", type=str, nargs="+", default=None, help="클래스 제한 프로필에 쓸 라벨 목록")
+    p_profile.add_argument("--conf", type=float, default=None, help="최소 confidence")
+    p_profile.add_argument("--weights", type=str, default="yolov8n.pt", help="YOLO 가중치 파일")
+    p_profile.add_argument("--window-sec", type=int, default=10, help="집중 구간 길이(초)")
+    p_profile.add_argument("--step-sec", type=int, default=5, help="슬라이딩 윈도우 스텝(초)")
+    p_profile.set_defaults(func=bench_profile)
+
+    p_focus = sub.add_parser("focus", help="합성 세션에서 집중도 분석의 최근접 객체 탐색 시간")
+    p_focus.add_argument("--minutes", type=int, default=60, help="합성 세션 길이(분)")
+    p_focus.add_argument("--fps", type=float, default=30.0, help="객체 로그 fps")
+    p_focus.add_argument("--emotion-hz", type=float, default=2.0, help="초당 감정 샘플 수")
+    p_focus.add_argument("--window-sec", type=int, default=10, help="집중 구간 길이(초)")
+    p_focus.add_argument("--step-sec", type=int, default=5, help="슬라이딩 윈도우 스텝(초)")
+    p_focus.add_argument("--samples", type=int, default=50, help="선형 탐색 비용 측정에 쓸 감정 샘플 수")
+    p_focus.add_argument("--max-objects", type=int, default=5, help="프레임당 최대 객체 수")
+    p_focus.set_defaults(func=bench_focus)
+
+    p_verify = sub.add_parser("focus-verify", help="집중도 분석 결과가 기존 구현과 같은지 합성 세션으로 확인")
+    p_verify.add_argument("--sessions", type=int, default=20, help="비교할 합성 세션 수")
+    p_verify.add_argument("--seconds", type=int, default=120, help="세션 길이(초)")
+    p_verify.add_argument("--fps", type=float, default=10.0, help="객체 로그 fps")
+    p_verify.add_argument("--emotion-hz", type=float, default=4.0, help="초당 감정 샘플 수")
+    p_verify.add_argument("--window-sec", type=int, default=10, help="집중 구간 길이(초)")
+    p_verify.add_argument("--step-sec", type=int, default=1, help="슬라이딩 윈도우 스텝(초)")
+    p_verify.add_argument("--max-objects", type=int, default=4, help="프레임당 최대 객체 수")
+    p_verify.set_defaults(func=bench_focus_verify)
+
+    p_parity = sub.add_parser("emotion-parity", help="감정 모델 Keras/ONNX top-1 일치 확인")
+    p_parity.add_argument("--fixtures", type=str, default=None,
+                          help="얼굴 crop fixture 디렉토리 (labels.json 포함 가능, 생략 시 합성 얼굴)")
+    p_parity.add_argument("--count", type=int, default=PARITY_FACES, help="합성 얼굴 수")
+    p_parity.add_argument("--seed", type=int, default=PARITY_SEED, help="합성 얼굴 seed")
+    p_parity.set_defaults(func=bench_emotion_parity)
+
+    args = parser.parse_args()
+    # 검증용 명령(seek, focus-verify, emotion-parity)은 불일치가 있으면 종료 코드 1
+    sys.exit(1 if args.func(args) is False else 0)
@@ -0,0 +1,107 @@
+# box_tracker.py
+# 키프레임에서만 YOLO를 돌리고, 키프레임 사이 프레임의 박스는 앞뒤 키프레임 박스를
+# IoU로 짝지은 뒤 선형 보간해서 채움 (보간된 프레임은 "tracked": True)
+import bisect
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+MATCH_IOU = 0.3   # 앞뒤 키프레임의 박스를 같은 객체로 볼 최소 IoU
+
+
+def bbox_iou(a, b) -> float:
+    ix = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def associate(prev_objects: List[Dict[str, Any]], next_objects: List[Dict[str, Any]],
+              min_iou: float = MATCH_IOU) -> List[Tuple[int, int]]:
+    """
+    같은 라벨끼리 IoU가 큰 쌍부터 탐욕적으로 짝지음. [(prev 인덱스, next 인덱스)]
+    """
+    pairs = []
+    for i, a in enumerate(prev_objects):
+        for j, b in enumerate(next_objects):
+            if a["label"] == b["label"]:
+                iou = bbox_iou(a["bbox"], b["bbox"])
+                if iou >= min_iou:
+                    pairs.append((iou, i, j))
+    pairs.sort(key=lambda p: -p[0])
+
+    used_prev, used_next, matches = set(), set(), []
+    for _, i, j in pairs:
+        if i not in used_prev and j not in used_next:
+            used_prev.add(i)
+            used_next.add(j)
+            matches.append((i, j))
+    return matches
+
+
+def _interpolate(prev_objects, next_objects, matches, t: float) -> List[Dict[str, Any]]:
+    objects = []
+    matched_prev = {i for i, _ in matches}
+    matched_next = {j for _, j in matches}
+    for i, j in matches:
+        a, b = prev_objects[i], next_objects[j]
+        objects.append({
+            "label": a["label"],
+            "bbox": [int(round(pa + (pb - pa) * t)) for pa, pb in zip(a["bbox"], b["bbox"])],
+            "confidence": a["confidence"] + (b["confidence"] - a["confidence"]) * t
+        })
+    # 짝이 없는 객체: 구간 앞쪽 절반은 이전 키프레임 객체 유지, 뒤쪽 절반은 다음 키프레임 객체 등장
+    if t < 0.5:
+        objects.extend(dict(obj) for k, obj in enumerate(prev_objects) if k not in matched_prev)
+    else:
+        objects.extend(dict(obj) for k, obj in enumerate(next_objects) if k not in matched_next)
+    return objects
+
+
+def interpolate_keyframes(keyframes: List[Dict[str, Any]], frame_ids: Iterable[int],
+                          fps: float) -> List[Dict[str, Any]]:
+    """
+    키프레임 탐지 결과로 frame_ids 전체의 프레임 레코드를 만듦.
+    키프레임은 그대로, 나머지는 앞뒤 키프레임 사이 보간 (마지막 키프레임 이후는 마지막 박스 유지).
+    """
+    return list(iter_interpolated(keyframes, frame_ids, fps))
+
+
+def iter_interpolated(keyframes: List[Dict[str, Any]], frame_ids: Iterable[int],
+                      fps: float) -> Iterator[Dict[str, Any]]:
+    """
+    interpolate_keyframes와 같은 레코드를 하나씩 생성 (보간 프레임을 목록으로 쌓지 않음)
+    """
+    if not keyframes:
+        return
+    keyframes = sorted(keyframes, key=lambda rec: rec["frame_id"])
+    key_ids = [rec["frame_id"] for rec in keyframes]
+    by_id = dict(zip(key_ids, keyframes))
+    resolution = keyframes[0].get("resolution", [0, 0])
+    match_cache: Dict[int, List[Tuple[int, int]]] = {}
+
+    for fid in frame_ids:
+        if fid in by_id:
+            yield by_id[fid]
+            continue
+
+        k = bisect.bisect_right(key_ids, fid) - 1
+        if k < 0:
+            # 첫 키프레임 이전 (보통 없음) → 첫 키프레임 박스 사용
+            objects = [dict(obj) for obj in keyframes[0]["objects"]]
+        elif k + 1 >= len(keyframes):
+            objects = [dict(obj) for obj in keyframes[k]["objects"]]
+        else:
+            prev_rec, next_rec = keyframes[k], keyframes[k + 1]
+            if k not in match_cache:
+                # 지나간 구간의 짝은 다시 쓰이지 않으므로 현재 구간 것만 유지
+                match_cache = {k: associate(prev_rec["objects"], next_rec["objects"])}
+            t = (fid - prev_rec["frame_id"]) / float(next_rec["frame_id"] - prev_rec["frame_id"])
+            objects = _interpolate(prev_rec["objects"], next_rec["objects"], match_cache[k], t)
+
+        yield {
+            "frame_id": fid,
+            "timestamp": round(fid / fps, 3),
+            "objects": objects,
+            "resolution": list(resolution),
+            "tracked": True
+        }
@@ -0,0 +1,229 @@
+# detection_cache.py
+# 객체 탐지 결과 캐시: 탐지 결과는 리뷰어와 무관하게 (영상 내용, 모델, 디코딩 설정)으로만 정해지므로
+# 같은 영상을 여러 리뷰어가 분석해도 YOLO는 프레임당 한 번만 실행되도록 프레임 단위로 누적 저장
+import os
+import json
+import uuid
+import heapq
+import hashlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .log_columns import load_columns, save_columns, object_records_to_columns, object_columns_to_records
+
+CACHE_VERSION = 2                        # 2: 영상 지문을 파일 전체 해시로 변경 (이전 항목은 쓰이지 않고 LRU로 정리됨)
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024   # 캐시 디렉토리 전체 크기 상한 (1GB, 오래 안 쓴 항목부터 삭제)
+FINGERPRINT_BLOCK = 1024 * 1024          # 영상 지문 계산 시 한 번에 읽는 크기
+FINGERPRINT_SUFFIX = ".sha1"             # 계산한 영상 지문을 저장해 두는 파일 (<영상 경로>.sha1)
+CACHE_CHUNK_FRAMES = 1000                # 캐시 조각 파일 하나에 담는 프레임 수 (읽기/쓰기 때 한 번에 메모리에 올라오는 단위)
+
+
+def video_fingerprint(video_path: str) -> str:
+    """
+    영상 내용 기반 지문: 파일 전체의 sha1 (task마다 파일명(uuid)이 달라도 같은 영상이면 같은 값).
+    한 번 계산하면 <영상 경로>.sha1에 (크기, inode)와 함께 저장해 두고 같은 파일이면 다시 읽지 않음.
+    영상 파일은 새로 받거나 os.replace로 통째로 바뀔 뿐 제자리에서 고쳐 쓰지 않으므로 내용이 바뀌면 inode도 바뀜
+    (mtime은 LRU용으로 갱신되므로 기준에서 제외). 유튜브 영상은 다운로드 직후 fetch_youtube_video가 미리 계산
+    """
+    st = os.stat(video_path)
+    stamp = f"{st.st_size}:{st.st_ino}"
+    sidecar = f"{video_path}{FINGERPRINT_SUFFIX}"
+    try:
+        with open(sidecar, "r", encoding="utf-8") as f:
+            saved_stamp, digest = f.read().split()
+        if saved_stamp == stamp:
+            return digest
+    except (OSError, ValueError):
+        pass
+
+    h = hashlib.sha1()
+    with open(video_path, "rb") as f:
+        for block in iter(lambda: f.read(FINGERPRINT_BLOCK), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    try:
+        tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(f"{stamp} {digest}")
+        os.replace(tmp_path, sidecar)
+    except OSError as e:
+        print(f"[CACHE] 영상 지문 저장 실패 (다음에 다시 계산): {sidecar} - {e}")
+    return digest
+
+
+def evict_lru(directory: str, max_bytes: int, keep: Optional[str] = None,
+              match: Callable[[str], bool] = lambda fname: True,
+              protect: Callable[[str], bool] = lambda fname: False) -> int:
+    """
+    directory 안에서 match되는 파일의 전체 크기가 max_bytes를 넘으면 오래 안 쓴(mtime) 파일부터 삭제.
+    keep은 방금 쓴 파일이라 삭제하지 않음. protect되는 파일은 크기에는 포함하지만 삭제하지 않음 (쓰는 중인 파일 등).
+    삭제한 파일 수 반환
+    """
+    entries = []
+    for fname in os.listdir(directory):
+        if not match(fname):
+            continue
+        path = os.path.join(directory, fname)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep or protect(os.path.basename(path)):
+            continue
+        try:
+            os.remove(path)
+            total -= size
+            removed += 1
+            print(f"[CACHE] 용량 초과로 삭제: {path}")
+        except OSError:
+            pass
+    return removed
+
+
+class DetectionCache:
+    """
+    캐시 항목 = 한 영상·설정 조합(key)의 프레임 레코드. 컬럼 형식(.npz) 조각 파일 여러 개(<key>.<id>.npz)에 나눠 저장.
+    탐지하는 대로 CACHE_CHUNK_FRAMES개씩 새 조각으로 추가만 하므로(append-only) 기존 항목을 읽어 합칠 필요가 없고,
+    읽을 때도 frame_id 순서로 필요한 조각만 열어 넘기므로 긴 영상 전체 탐지(dense)도 메모리가 영상 길이와 무관.
+    프레임 단위라서 다른 리뷰어(다른 감정 시각)가 요청한 프레임 중 없는 것만 새로 탐지해 추가할 수 있음.
+    용량을 넘으면 오래 안 쓴 조각부터 삭제 (삭제된 조각의 프레임은 다음 요청 때 다시 탐지)
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES, chunk_frames: int = CACHE_CHUNK_FRAMES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.chunk_frames = chunk_frames
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, video_path: str, **params) -> str:
+        """
+        params: 모델 가중치, 디코딩 설정 등 프레임별 탐지 결과에 영향을 주는 값
+        """
+        payload = {"v": CACHE_VERSION, "video": video_fingerprint(video_path), "params": params}
+        return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def _chunks(self, key: str) -> List[str]:
+        # <key>.npz는 조각 방식 이전의 단일 파일 항목 (같은 형식이라 조각 하나로 취급)
+        return [os.path.join(self.cache_dir, fname) for fname in sorted(os.listdir(self.cache_dir))
+                if fname.startswith(f"{key}.") and fname.endswith(".npz")]
+
+    def _index(self, key: str) -> List[Tuple[str, np.ndarray]]:
+        """
+        조각별 (경로, frame_id 배열): npz에서 frame_id 컬럼만 읽음
+        """
+        index = []
+        for path in self._chunks(key):
+            try:
+                with np.load(path, allow_pickle=False) as data:
+                    index.append((path, data["frame_id"]))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[CACHE] 손상된 캐시 조각 무시: {path} - {e}")
+        return index
+
+    def frame_ids(self, key: str) -> np.ndarray:
+        """
+        캐시에 있는 frame_id (정렬, 중복 제거)
+        """
+        index = self._index(key)
+        return np.unique(np.concatenate([fids for _, fids in index])) if index else np.zeros(0, dtype=np.int64)
+
+    def iter_frames(self, key: str, frame_ids) -> Iterator[Dict[str, Any]]:
+        """
+        frame_ids 중 캐시에 있는 프레임 레코드를 frame_id 순서로 하나씩 생성.
+        조각은 그 조각의 첫 프레임 차례가 되어서야 열고 다 넘기면 놓음 (동시에 열린 조각만 메모리에 있음)
+        """
+        wanted = np.unique(np.asarray(frame_ids, dtype=np.int64))
+        if not len(wanted):
+            return
+        free = np.ones(len(wanted), dtype=bool)   # 아직 어느 조각에도 배정되지 않은 프레임
+        plan = []
+        for path, fids in self._index(key):
+            pos = np.searchsorted(wanted, fids)
+            pos = pos[(pos < len(wanted)) & (wanted[np.minimum(pos, len(wanted) - 1)] == fids)]
+            pos = np.unique(pos[free[pos]])
+            if len(pos):
+                free[pos] = False
+                plan.append((int(wanted[pos[0]]), path, wanted[pos]))
+                try:
+                    os.utime(path)   # 최근 사용 시각 갱신 (LRU, 읽는 도중 삭제될 가능성도 낮춤)
+                except OSError:
+                    pass
+        plan.sort(key=lambda item: item[0])
+
+        heap: List[Tuple[int, int, Dict[str, Any], Iterator[Dict[str, Any]]]] = []
+        i = 0
+        while heap or i < len(plan):
+            # 다음에 넘길 프레임보다 앞에서 시작하는 조각을 열어 둠
+            while i < len(plan) and (not heap or plan[i][0] < heap[0][0]):
+                _, path, fids = plan[i]
+                i += 1
+                chunk = self._iter_chunk(path, fids)
+                rec = next(chunk, None)
+                if rec is not None:
+                    heapq.heappush(heap, (rec["frame_id"], i, rec, chunk))
+            if not heap:
+                continue
+            _, n, rec, chunk = heapq.heappop(heap)
+            yield rec
+            rec = next(chunk, None)
+            if rec is not None:
+                heapq.heappush(heap, (rec["frame_id"], n, rec, chunk))
+
+    def _iter_chunk(self, path: str, fids: np.ndarray) -> Iterator[Dict[str, Any]]:
+        try:
+            records = object_columns_to_records(load_columns(path))
+        except (OSError, ValueError, KeyError) as e:
+            # 다른 프로세스가 용량 초과로 방금 삭제한 경우 등: 이 프레임들은 캐시에 없는 것으로 넘어감
+            print(f"[CACHE] 캐시 조각 읽기 실패: {path} - {e}")
+            return
+        wanted = set(fids.tolist())
+        for rec in sorted(records, key=lambda rec: rec["frame_id"]):
+            if rec["frame_id"] in wanted:
+                wanted.discard(rec["frame_id"])
+                yield rec
+
+    def load(self, key: str) -> Dict[int, Dict[str, Any]]:
+        """
+        항목 전체를 {frame_id: 레코드}로 읽음 (sparse 탐지/실시간 분석처럼 항목이 작은 경우용)
+        """
+        return {rec["frame_id"]: rec for rec in self.iter_frames(key, self.frame_ids(key))}
+
+    def tee(self, key: str, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        records를 그대로 넘기면서 chunk_frames개가 모일 때마다 새 조각으로 저장
+        (중간에 멈춰도 그때까지 탐지한 프레임은 저장)
+        """
+        chunk: List[Dict[str, Any]] = []
+        try:
+            for rec in records:
+                chunk.append(rec)
+                if len(chunk) >= self.chunk_frames:
+                    self._write_chunk(key, chunk)
+                    chunk = []
+                yield rec
+        finally:
+            if chunk:
+                self._write_chunk(key, chunk)
+
+    def store(self, key: str, records: Iterable[Dict[str, Any]]):
+        """
+        새로 탐지한 프레임 레코드를 항목에 추가
+        """
+        for _ in self.tee(key, sorted(records, key=lambda rec: rec["frame_id"])):
+            pass
+
+    def _write_chunk(self, key: str, records: List[Dict[str, Any]]):
+        # 조각 이름이 프로세스/호출마다 달라서 여러 워커가 같은 항목에 동시에 추가해도 잠금 없이 서로 덮어쓰지 않음
+        path = os.path.join(self.cache_dir, f"{key}.{uuid.uuid4().hex}.npz")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        save_columns(tmp_path, object_records_to_columns(records))
+        os.replace(tmp_path, path)
+        evict_lru(self.cache_dir, self.max_bytes, keep=path, match=lambda fname: fname.endswith(".npz"))
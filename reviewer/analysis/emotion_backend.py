@@ -0,0 +1,74 @@
+# emotion_backend.py
+import os
+import numpy as np
+
+# 경로 설정 (emotion_gaze.py 와 동일한 models 디렉토리)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..'))
+MODEL_DIR = os.path.join(ROOT_DIR, 'models')
+
+KERAS_MODEL_PATH = os.path.join(MODEL_DIR, 'emotion_tl2_model.h5')
+ONNX_MODEL_PATH = os.path.join(MODEL_DIR, 'emotion_tl2_model.onnx')
+
+
+class KerasEmotionBackend:
+    """
+    기존 TensorFlow/Keras 모델 (fallback 용)
+    """
+    name = "keras"
+
+    def __init__(self, model_path: str = KERAS_MODEL_PATH):
+        from tensorflow.keras.models import load_model
+        self.model = load_model(model_path, compile=False)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        # 작은 배치에서는 model.predict 보다 직접 호출이 훨씬 가벼움
+        return np.asarray(self.model(batch, training=False))
+
+
+class OnnxEmotionBackend:
+    """
+    export_emotion_model.py 로 변환한 ONNX 모델을 onnxruntime(CPU)으로 실행.
+    TensorFlow를 import하지 않으므로 메모리/로딩 시간이 크게 줄어듦.
+    """
+    name = "onnx"
+
+    def __init__(self, model_path: str = ONNX_MODEL_PATH, num_threads: int = None):
+        import onnxruntime as ort
+
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"ONNX 모델 없음: {model_path} (export_emotion_model.py 로 먼저 변환하세요)")
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_path, sess_options=options,
+                                            providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+def load_emotion_backend(name: str = "auto"):
+    """
+    감정 추론 백엔드 로드.
+      - "onnx":  ONNX 모델 필수
+      - "keras": 기존 .h5 모델
+      - "auto":  ONNX 모델과 onnxruntime이 있으면 ONNX, 아니면 Keras로 fallback
+    """
+    if name == "onnx":
+        return OnnxEmotionBackend()
+    if name == "keras":
+        return KerasEmotionBackend()
+    if name != "auto":
+        raise ValueError(f"알 수 없는 감정 추론 백엔드: {name}")
+
+    try:
+        backend = OnnxEmotionBackend()
+        print(f"[INFO] 감정 추론 백엔드: onnx ({ONNX_MODEL_PATH})")
+        return backend
+    except (ImportError, FileNotFoundError) as e:
+        print(f"[INFO] ONNX 백엔드 사용 불가 → Keras fallback: {e}")
+        return KerasEmotionBackend()
@@ -0,0 +1,88 @@
+# emotion_batcher.py
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+class EmotionBatcher:
+    """
+    여러 요청(리뷰어 세션)에서 들어온 얼굴 crop을 짧은 시간 동안 모아
+    한 번의 batched forward pass로 감정 추론을 수행.
+
+    - 각 요청은 자신의 예측 벡터만 돌려받음
+    - max_wait_ms: 첫 요청이 들어온 뒤 배치를 모으는 최대 대기 시간 (지연 상한)
+    - max_batch_size: 배치가 이 크기에 도달하면 대기 없이 즉시 실행
+    - timeout_sec: 호출자가 결과를 기다리는 최대 시간
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        timeout_sec: float = 2.0
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self.timeout_sec = timeout_sec
+
+        self._pending: List[Tuple[np.ndarray, Future]] = []
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+
+    def predict(self, face_img: np.ndarray) -> np.ndarray:
+        """
+        (1, H, W, 3) 또는 (H, W, 3) 얼굴 입력 하나를 받아 해당 샘플의 예측 벡터를 반환.
+        """
+        if face_img.ndim == 3:
+            face_img = face_img[np.newaxis]
+
+        future: Future = Future()
+        with self._cond:
+            self._ensure_worker()
+            self._pending.append((face_img, future))
+            self._cond.notify()
+        return future.result(timeout=self.timeout_sec)
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="emotion-batcher", daemon=True)
+            self._worker.start()
+
+    def _collect_batch(self) -> List[Tuple[np.ndarray, Future]]:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+
+            # 첫 요청 기준으로 max_wait_ms 동안만 추가 요청을 모음
+            deadline = time.monotonic() + self.max_wait_ms / 1000.0
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[Tuple[np.ndarray, Future]]):
+        try:
+            inputs = np.concatenate([img for img, _ in batch], axis=0)
+            preds = self.predict_fn(inputs)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), pred in zip(batch, preds):
+            future.set_result(pred)
@@ -1,10 +1,13 @@
 import os
 import csv
+import threading
 import cv2
 import numpy as np
-from tensorflow.keras.models import load_model
 import mediapipe as mp
 from typing import Tuple
+from .emotion_batcher import EmotionBatcher
+from .emotion_backend import load_emotion_backend
+from .gaze_session import FaceMeshPool, GazeSessionRegistry
 
 # 경로 설정
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,22 +15,63 @@ ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..'))
 MODEL_DIR = os.path.join(ROOT_DIR, 'models')
 LOG_DIR = os.path.join(ROOT_DIR, 'logs')
 
-# 모델 불러오기
-MODEL_PATH = os.path.join(MODEL_DIR, 'emotion_tl2_model.h5')
-model = load_model(MODEL_PATH, compile=False)
+# 모델 불러오기 ("auto": ONNX 모델이 있으면 onnxruntime, 없으면 Keras fallback)
+EMOTION_BACKEND = "auto"
+backend = load_emotion_backend(EMOTION_BACKEND)
 
 # 파라미터 설정
 shape_x, shape_y = 96, 96
 emotion_weights = {"surprise": 5, "happy": 4, "sad": 3, "angry": 2, "neutral": 1}
 mapped_emotions = ["angry", "happy", "neutral", "sad", "surprise"]
 
-# 얼굴 인식
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+# 배치 추론 설정 (동시에 들어온 리뷰어 프레임을 모아 한 번에 predict)
+BATCH_MAX_SIZE = 16       # 한 번에 추론할 최대 얼굴 수
+BATCH_MAX_WAIT_MS = 10    # 배치를 모으는 최대 대기 시간 (프레임당 추가 지연 상한)
+BATCH_TIMEOUT_SEC = 2.0   # 결과 대기 제한 시간
+
+emotion_batcher = EmotionBatcher(
+    backend.predict,
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+    timeout_sec=BATCH_TIMEOUT_SEC
+)
+
+# 얼굴 인식 (CascadeClassifier는 스레드 간 공유가 안전하지 않아 스레드별로 로드)
+_thread_local = threading.local()
 mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1, refine_landmarks=True)
 
-# 이전 프레임 중심 저장용
-prev_pupil = None
+
+def get_face_cascade():
+    cascade = getattr(_thread_local, "face_cascade", None)
+    if cascade is None:
+        cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        _thread_local.face_cascade = cascade
+    return cascade
+
+
+def create_face_mesh():
+    return mp_face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1, refine_landmarks=True)
+
+
+# 세션(task_id)별 시선 추적 상태: 이전 동공 위치 + 전용 FaceMesh (풀에서 할당)
+FACE_MESH_POOL_SIZE = 8   # 동시에 분석 가능한 세션 수 상한
+SESSION_IDLE_SEC = 120    # 이 시간 동안 프레임이 없으면 세션 정리
+DEFAULT_SESSION_ID = "default"
+
+# 얼굴 위치 추정 방식
+#  - "cascade": Haar cascade로 얼굴 crop + 전체 프레임 FaceMesh (기존 방식, 검출기 2개)
+#  - "mesh":    FaceMesh 랜드마크에서 얼굴 박스를 계산 (검출기 1개, 얼굴 영역 추적은 FaceMesh 내부에 맡김)
+FACE_LOCALIZER = "cascade"
+FACE_BOX_PAD = 0.1   # 랜드마크 박스 대비 감정 crop 여유 비율
+
+gaze_sessions = GazeSessionRegistry(
+    FaceMeshPool(create_face_mesh, max_size=FACE_MESH_POOL_SIZE),
+    idle_sec=SESSION_IDLE_SEC
+)
+
+
+def close_session(task_id):
+    gaze_sessions.close(task_id)
 
 
 def get_pupil_center(landmarks, image_shape):
@@ -71,76 +115,151 @@ def extract_face_rgb(frame, faces):
     return None
 
 
-def analyze_frame_np(frame):
-    global prev_pupil
+def analyze_frame_np(frame, task_id=None, localizer=None):
     if frame is None:
         return {"emotion": "Error", "attention": 0, "movement": "UNKNOWN", "pupil": None}
 
-    try:
-        frame = cv2.flip(frame, 1)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    localize = _localize_mesh if (localizer or FACE_LOCALIZER) == "mesh" else _localize_cascade
 
-        faces = face_cascade.detectMultiScale(gray, 1.05, 3, minSize=(60, 60))
-        if len(faces) == 0:
-            return {"emotion": "Unknown", "attention": 0, "movement": "UNKNOWN", "pupil": None}
+    try:
+        session = gaze_sessions.get(task_id or DEFAULT_SESSION_ID)
+        while True:
+            with session.lock:
+                if not session.closed:
+                    return _analyze_session_frame(frame, session, localize)
+            # 처리 직전에 세션이 정리된 경우 새 세션으로 다시 시도
+            session = gaze_sessions.get(session.task_id)
 
-        face_img = extract_face_rgb(frame, faces)
-        if face_img is None:
-            return {"emotion": "Unknown", "attention": 0, "movement": "UNKNOWN", "pupil": None}
+    except Exception as e:
+        print(f"[ERROR] 분석 실패: {e}")
+        return {"emotion": "Error", "attention": 0, "movement": "UNKNOWN", "pupil": None}
 
-        pred = model.predict(face_img, verbose=0)[0]
-        idx_em = np.argmax(pred)
-        emotion = mapped_emotions[idx_em]
-        conf = float(pred[idx_em])
 
-        conf_score = 2 if conf > 0.7 else 1 if conf > 0.5 else 0
-        emotion_score = min(10, conf_score + emotion_weight(emotion))
+def _analyze_session_frame(frame, session, localize):
+    face_img, pupil = localize(frame, session)
+    if face_img is None:
+        return {"emotion": "Unknown", "attention": 0, "movement": "UNKNOWN", "pupil": None}
 
-        results = face_mesh.process(rgb)
-        pupil = None
-        if results.multi_face_landmarks:
-            landmarks = results.multi_face_landmarks[0].landmark
-            pupil = get_pupil_center(landmarks, frame.shape)
+    pred = emotion_batcher.predict(face_img)
+    idx_em = np.argmax(pred)
+    emotion = mapped_emotions[idx_em]
+    conf = float(pred[idx_em])
 
-        movement = classify_movement(prev_pupil, pupil)
-        prev_pupil = pupil
+    conf_score = 2 if conf > 0.7 else 1 if conf > 0.5 else 0
+    emotion_score = min(10, conf_score + emotion_weight(emotion))
 
-        attention = calculate_attention_score(movement, emotion_score)
+    movement = classify_movement(session.prev_pupil, pupil)
+    session.prev_pupil = pupil
 
-        return {
-            "emotion": emotion,
-            "confidence": conf,
-            "movement": movement,
-            "attention": attention,
-            "pupil": pupil
-        }
+    attention = calculate_attention_score(movement, emotion_score)
 
-    except Exception as e:
-        print(f"[ERROR] 분석 실패: {e}")
-        return {"emotion": "Error", "attention": 0, "movement": "UNKNOWN", "pupil": None}
+    return {
+        "emotion": emotion,
+        "confidence": conf,
+        "movement": movement,
+        "attention": attention,
+        "pupil": pupil
+    }
 
 
-def analyze_image(image_data: bytes) -> Tuple[str, str]:
+def _localize_cascade(frame, session):
     """
-    base64 이미지 데이터를 받아 emotion, attention 분석 결과 반환
+    기존 방식: 좌우 반전 프레임에서 Haar cascade로 얼굴 crop, FaceMesh로 동공 위치
     """
-    nparr = np.frombuffer(image_data, np.uint8)
-    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    frame = cv2.flip(frame, 1)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    faces = get_face_cascade().detectMultiScale(gray, 1.05, 3, minSize=(60, 60))
+    if len(faces) == 0:
+        return None, None
+
+    face_img = extract_face_rgb(frame, faces)
+    if face_img is None:
+        return None, None
+
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    results = session.face_mesh.process(rgb)
+    pupil = None
+    if results.multi_face_landmarks:
+        landmarks = results.multi_face_landmarks[0].landmark
+        pupil = get_pupil_center(landmarks, frame.shape)
+    return face_img, pupil
+
+
+def _mesh_landmarks_px(frame, session):
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    results = session.face_mesh.process(rgb)
+    if not results.multi_face_landmarks:
+        return None
+    h, w = frame.shape[:2]
+    points = np.array([(lm.x, lm.y) for lm in results.multi_face_landmarks[0].landmark], dtype=np.float32)
+    points[:, 0] *= w
+    points[:, 1] *= h
+    return points
 
-    result = analyze_frame_np(frame)
-    emotion = result.get("emotion", "Unknown")
-    attention_score = result.get("attention", 0)
 
+def _localize_mesh(frame, session):
+    """
+    FaceMesh 한 번으로 얼굴 crop과 동공 위치를 모두 계산.
+    반전/흑백 변환 없이 원본 프레임에서 처리하고, 결과 좌표만 반전 프레임 기준으로 변환 (cascade 방식과 같은 좌표계).
+    FaceMesh(static_image_mode=False)가 프레임 사이 얼굴 영역을 자체 추적하므로 항상 전체 프레임을 넣음
+    (바깥에서 잘라 넣으면 추적기가 보는 정규화 좌표계가 프레임마다 바뀜)
+    """
+    h, w = frame.shape[:2]
+    points = _mesh_landmarks_px(frame, session)
+    if points is None:
+        return None, None
+
+    # 랜드마크 범위를 감싸는 정사각형 얼굴 박스
+    (min_x, min_y), (max_x, max_y) = points[:468].min(axis=0), points[:468].max(axis=0)
+    cx, cy = (min_x + max_x) * 0.5, (min_y + max_y) * 0.5
+    half = max(max_x - min_x, max_y - min_y) * (1 + FACE_BOX_PAD) * 0.5
+    fx1, fy1 = max(0, int(cx - half)), max(0, int(cy - half))
+    fx2, fy2 = min(w, int(cx + half)), min(h, int(cy + half))
+    if fx2 - fx1 < 2 or fy2 - fy1 < 2:
+        return None, None
+
+    # 작은 crop만 반전 (전체 프레임 반전과 동일한 입력)
+    resized = cv2.resize(frame[fy1:fy2, fx1:fx2], (shape_x, shape_y))
+    face_img = cv2.flip(resized, 1).astype(np.float32) / 255.0
+    face_img = np.reshape(face_img, (1, shape_x, shape_y, 3))
+
+    pupil = None
+    if len(points) > 473:
+        px = (points[468, 0] + points[473, 0]) * 0.5
+        py = (points[468, 1] + points[473, 1]) * 0.5
+        pupil = (int(w - px), int(py))
+    return face_img, pupil
+
+
+def attention_level(attention_score) -> str:
     # 정성적 attention 레벨 분류
     if attention_score >= 8:
-        attention = "High"
+        return "High"
     elif attention_score >= 4:
-        attention = "Medium"
-    else:
-        attention = "Low"
+        return "Medium"
+    return "Low"
+
+
+def analyze_image_result(image_data: bytes, task_id: str = None) -> dict:
+    """
+    이미지 바이트를 디코딩해 analyze_frame_np 결과 전체(동공 위치 포함)와 attention 레벨을 반환
+    """
+    nparr = np.frombuffer(image_data, np.uint8)
+    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+    result = analyze_frame_np(frame, task_id)
+    result["attention_level"] = attention_level(result.get("attention", 0))
+    return result
 
-    return emotion, attention
+
+def analyze_image(image_data: bytes, task_id: str = None) -> Tuple[str, str]:
+    """
+    base64 이미지 데이터를 받아 emotion, attention 분석 결과 반환
+    task_id가 주어지면 해당 세션의 시선 추적 상태를 사용
+    """
+    result = analyze_image_result(image_data, task_id)
+    return result.get("emotion", "Unknown"), result["attention_level"]
 
 
 def load_emotion_logs(video_id="sample"):
@@ -0,0 +1,196 @@
+# export_emotion_model.py
+# emotion_tl2_model.h5 → ONNX 변환 및 Keras/ONNX top-1 일치 여부 확인
+#
+#   python -m reviewer.analysis.export_emotion_model
+#   python -m reviewer.analysis.export_emotion_model --check                        (고정 seed 합성 얼굴)
+#   python -m reviewer.analysis.export_emotion_model --check path/to/face_fixtures
+#   python -m reviewer.analysis.export_emotion_model --write-fixtures path/to/face_fixtures
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import cv2
+import numpy as np
+
+from .emotion_backend import KERAS_MODEL_PATH, ONNX_MODEL_PATH, KerasEmotionBackend, OnnxEmotionBackend
+
+shape_x, shape_y = 96, 96
+mapped_emotions = ["angry", "happy", "neutral", "sad", "surprise"]
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+LABELS_FILE = "labels.json"   # fixture 디렉토리의 {파일명: Keras top-1 감정} (있으면 Keras 없이도 비교 가능)
+PARITY_SEED = 0
+PARITY_FACES = 64
+
+
+def export_onnx(keras_path: str = KERAS_MODEL_PATH, output_path: str = ONNX_MODEL_PATH, opset: int = 13) -> str:
+    import tensorflow as tf
+    import tf2onnx
+    from tensorflow.keras.models import load_model
+
+    model = load_model(keras_path, compile=False)
+    # 배치 크기는 가변(None)으로 두어 배치 추론(EmotionBatcher)에 그대로 사용
+    spec = (tf.TensorSpec((None, shape_x, shape_y, 3), tf.float32, name="input"),)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=opset, output_path=output_path)
+    print(f"[EXPORT] ONNX 저장 완료: {output_path}")
+    return output_path
+
+
+def _preprocess(img: np.ndarray) -> np.ndarray:
+    # emotion_gaze와 동일한 전처리 (BGR, 96x96, 0~1)
+    return cv2.resize(img, (shape_x, shape_y)).astype(np.float32) / 255.0
+
+
+def synthetic_faces(count: int = PARITY_FACES, seed: int = PARITY_SEED):
+    """
+    고정 seed로 그린 얼굴 crop (BGR uint8). 눈/눈썹/입 모양과 밝기, 노이즈를 바꿔 여러 감정 출력이 나오도록 함.
+    실제 얼굴은 아니지만 같은 입력에 대한 Keras/ONNX 출력 비교에는 충분하고, 파일 없이도 어디서나 같은 입력을 재현
+    """
+    rnd = random.Random(seed)
+    noise = np.random.default_rng(seed)
+    names, images = [], []
+    for i in range(count):
+        size = 128
+        img = np.full((size, size, 3), rnd.randint(20, 90), np.uint8)
+        skin = (rnd.randint(110, 170), rnd.randint(140, 200), rnd.randint(180, 240))   # BGR 피부색 범위
+        center = (size // 2 + rnd.randint(-6, 6), size // 2 + rnd.randint(-6, 6))
+        cv2.ellipse(img, center, (rnd.randint(38, 50), rnd.randint(48, 60)), 0, 0, 360, skin, -1)
+
+        cx, cy = center
+        eye_dx, eye_y, eye_r = rnd.randint(14, 20), cy - rnd.randint(10, 18), rnd.randint(3, 8)
+        brow = rnd.randint(-6, 6)   # 눈썹 기울기 (찡그림 ~ 놀람)
+        for side in (-1, 1):
+            ex = cx + side * eye_dx
+            cv2.circle(img, (ex, eye_y), eye_r, (30, 30, 30), -1)
+            cv2.line(img, (ex - 8, eye_y - 10 - side * brow), (ex + 8, eye_y - 10 + side * brow), (40, 40, 40), 2)
+
+        mouth_y, mouth_w = cy + rnd.randint(16, 26), rnd.randint(10, 22)
+        open_h = rnd.randint(0, 14)
+        if open_h > 8:   # 벌린 입 (놀람)
+            cv2.ellipse(img, (cx, mouth_y), (mouth_w // 2, open_h // 2), 0, 0, 360, (40, 20, 60), -1)
+        else:            # 웃음(아래로 볼록) ~ 찡그림(위로 볼록)
+            start, end = (0, 180) if rnd.random() < 0.5 else (180, 360)
+            cv2.ellipse(img, (cx, mouth_y), (mouth_w, max(1, open_h)), 0, start, end, (40, 20, 60), 2)
+
+        img = np.clip(img + noise.normal(0, rnd.uniform(0, 12), img.shape), 0, 255).astype(np.uint8)
+        names.append(f"synthetic_{seed}_{i:03d}.png")
+        images.append(img)
+    return names, images
+
+
+def load_fixture_faces(fixture_dir: str):
+    """
+    fixture 디렉토리의 얼굴 crop 이미지를 emotion_gaze와 동일하게 전처리.
+    """
+    names, faces = [], []
+    for fname in sorted(os.listdir(fixture_dir)):
+        if not fname.lower().endswith(IMAGE_EXTS):
+            continue
+        img = cv2.imread(os.path.join(fixture_dir, fname), cv2.IMREAD_COLOR)
+        if img is None:
+            continue
+        names.append(fname)
+        faces.append(_preprocess(img))
+    if not faces:
+        return names, np.zeros((0, shape_x, shape_y, 3), np.float32)
+    return names, np.stack(faces)
+
+
+def load_fixture_labels(fixture_dir: str):
+    path = os.path.join(fixture_dir, LABELS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_fixtures(fixture_dir: str, count: int = PARITY_FACES, seed: int = PARITY_SEED) -> str:
+    """
+    합성 얼굴 crop을 PNG로 저장하고 Keras top-1 감정을 labels.json에 기록 (Keras 필요)
+    """
+    os.makedirs(fixture_dir, exist_ok=True)
+    names, images = synthetic_faces(count, seed)
+    for name, img in zip(names, images):
+        cv2.imwrite(os.path.join(fixture_dir, name), img)
+
+    names, faces = load_fixture_faces(fixture_dir)
+    keras_pred = KerasEmotionBackend().predict(faces)
+    labels = {name: mapped_emotions[int(np.argmax(p))] for name, p in zip(names, keras_pred)}
+    with open(os.path.join(fixture_dir, LABELS_FILE), "w", encoding="utf-8") as f:
+        json.dump(labels, f, indent=2, ensure_ascii=False)
+    print(f"[FIXTURE] {len(labels)}개 저장: {fixture_dir} (Keras top-1 분포 "
+          f"{ {em: list(labels.values()).count(em) for em in mapped_emotions} })")
+    return fixture_dir
+
+
+def _time_per_frame(backend, faces: np.ndarray, repeat: int = 3) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for face in faces:
+            backend.predict(face[np.newaxis])
+    return (time.perf_counter() - start) / (repeat * len(faces)) * 1000.0
+
+
+def check_parity(fixture_dir: str = None, count: int = PARITY_FACES, seed: int = PARITY_SEED) -> bool:
+    """
+    fixture 이미지 전체에 대해 Keras/ONNX top-1 감정이 같은지 확인.
+    fixture_dir가 없으면 고정 seed 합성 얼굴을 사용. fixture에 labels.json이 있으면 Keras 기준은 기록된 라벨
+    (TensorFlow 없이 ONNX만으로 확인 가능), 없으면 Keras 모델을 직접 실행
+    """
+    labels = None
+    if fixture_dir:
+        names, faces = load_fixture_faces(fixture_dir)
+        labels = load_fixture_labels(fixture_dir)
+    else:
+        names, images = synthetic_faces(count, seed)
+        faces = np.stack([_preprocess(img) for img in images])
+    if not names:
+        print(f"[CHECK] fixture 이미지 없음: {fixture_dir}")
+        return False
+
+    onnx_backend = OnnxEmotionBackend()
+    onnx_pred = onnx_backend.predict(faces)
+    keras_backend = None
+    if labels is None:
+        keras_backend = KerasEmotionBackend()
+        keras_pred = keras_backend.predict(faces)
+        labels = {name: mapped_emotions[int(np.argmax(p))] for name, p in zip(names, keras_pred)}
+
+    mismatches = 0
+    onnx_labels = [mapped_emotions[int(np.argmax(p))] for p in onnx_pred]
+    for name, o_em in zip(names, onnx_labels):
+        k_em = labels.get(name)
+        if k_em != o_em:
+            mismatches += 1
+            print(f"[MISMATCH] {name}: keras={k_em}, onnx={o_em}")
+
+    spread = {em: onnx_labels.count(em) for em in mapped_emotions}
+    print(f"[CHECK] {len(names)}개 중 top-1 불일치 {mismatches}개 (ONNX top-1 분포 {spread})")
+    if keras_backend is not None:
+        print(f"[CHECK] 최대 확률 오차 {float(np.max(np.abs(keras_pred - onnx_pred))):.6f}")
+        print(f"[CHECK] 프레임당 지연: keras {_time_per_frame(keras_backend, faces):.2f}ms, "
+              f"onnx {_time_per_frame(onnx_backend, faces):.2f}ms")
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="감정 인식 모델 ONNX 변환 / parity 확인")
+    parser.add_argument("--keras_path", type=str, default=KERAS_MODEL_PATH, help="원본 .h5 모델 경로")
+    parser.add_argument("--output", type=str, default=ONNX_MODEL_PATH, help="저장할 .onnx 경로")
+    parser.add_argument("--opset", type=int, default=13, help="ONNX opset 버전")
+    parser.add_argument("--check", type=str, nargs="?", const="", default=None,
+                        help="parity 확인만 수행 (디렉토리 생략 시 고정 seed 합성 얼굴 사용)")
+    parser.add_argument("--write-fixtures", type=str, default=None,
+                        help="합성 얼굴 fixture와 Keras top-1 라벨(labels.json)을 저장할 디렉토리")
+    parser.add_argument("--count", type=int, default=PARITY_FACES, help="합성 얼굴 수")
+    parser.add_argument("--seed", type=int, default=PARITY_SEED, help="합성 얼굴 seed")
+    args = parser.parse_args()
+
+    if args.write_fixtures:
+        write_fixtures(args.write_fixtures, args.count, args.seed)
+    elif args.check is not None:
+        sys.exit(0 if check_parity(args.check or None, args.count, args.seed) else 1)
+    else:
+        export_onnx(args.keras_path, args.output, args.opset)
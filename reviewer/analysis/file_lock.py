@@ -0,0 +1,28 @@
+# file_lock.py
+# 여러 워커 프로세스가 같은 파일을 읽고-합치고-쓰는 구간을 직렬화하는 파일 잠금 (fcntl.flock)
+# threading.Lock은 프로세스 안에서만 유효하므로 gunicorn 워커 여러 개가 같은 캐시/타임라인을 갱신하면 서로의 결과를 덮어씀
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:   # Windows 개발 환경: 프로세스 간 잠금 없이 동작 (단일 프로세스 개발 서버 기준)
+    fcntl = None
+
+
+@contextmanager
+def locked(path: str) -> Iterator[None]:
+    """
+    path 옆의 .lock 파일에 배타 잠금을 잡고 블록 실행 (다른 프로세스의 같은 path 잠금이 풀릴 때까지 대기)
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
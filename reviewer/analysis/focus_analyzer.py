@@ -1,9 +1,10 @@
 # focus_analyzer.py
 import os
-import json
 import csv
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 import numpy as np
+from .log_columns import load_columns, emotion_columns_to_records
+from .focus_engine import FocusSamples, score_windows, window_starts, num_object_frames
 
 def is_point_in_bbox(pupil: Optional[Tuple[float, float]], bbox, margin: int = 10) -> bool:
     if pupil is None:
@@ -21,73 +22,27 @@ def attention_str_to_float(att_str):
 
 def analyze_focus(
     emotion_logs: List[Dict[str, Any]],
-    object_logs: List[Dict[str, Any]],
+    object_logs,
     window_sec: int = 10,
     step_sec: int = 5,
     top_k: int = 3,
     debug: bool = False
 ) -> List[Dict[str, Any]]:
-    if not emotion_logs or not object_logs:
+    """
+    window_sec 길이 윈도우를 step_sec씩 옮기며 집중도/감정/시선-객체 점수를 매기고 상위 top_k개 반환
+    (감정 샘플별 배열을 한 번 만들고 윈도우 값은 누적합으로 계산, focus_engine 참고)
+    object_logs: 프레임 레코드 목록 또는 객체 로그 컬럼 (.npz를 load_columns로 읽은 dict)
+    """
+    if not emotion_logs or not num_object_frames(object_logs):
         if debug:
             print("[DEBUG] emotion_logs 또는 object_logs가 비어 있음.")
         return []
 
     min_time = min(log["timestamp"] for log in emotion_logs)
     max_time = max(log["timestamp"] for log in emotion_logs)
-    results: List[Dict[str, Any]] = []
-
-    t = min_time
-    while t < max_time - window_sec:
-        emo_window = [e for e in emotion_logs if t <= e["timestamp"] < t + window_sec]
-        if not emo_window:
-            t += step_sec
-            continue
-
-        obj_window = [
-            min(object_logs, key=lambda o: abs(o["timestamp"] - e["timestamp"]))
-            for e in emo_window
-        ]
-
-        emotions = [e["emotion"] for e in emo_window]
-        emotion_weights = {"surprise": 5, "happy": 4, "sad": 3, "angry": 2, "neutral": 1}
-        dominant_emotion = max(set(emotions), key=emotions.count)
-        emotion_score = np.mean([emotion_weights.get(e, 0) for e in emotions])
-        attention_score = float(np.mean([e["attention"] for e in emo_window]))
-
-        object_counter = {}
-        for emo, nearest_obj_frame in zip(emo_window, obj_window):
-            pupil = emo.get("pupil")
-            for obj in nearest_obj_frame["objects"]:
-                if is_point_in_bbox(pupil, obj["bbox"]):
-                    label = obj["label"]
-                    object_counter[label] = object_counter.get(label, 0) + 1
-
-        if object_counter:
-            focused_object, hits = max(object_counter.items(), key=lambda x: x[1])
-            object_score = min(10.0, hits / max(len(emo_window), 1) * 10.0)
-        else:
-            focused_object = None
-            object_score = 0.0
-
-        final_score = 0.4 * attention_score + 0.3 * emotion_score + 0.3 * object_score
-
-        if debug:
-            print(f"[DEBUG] t={t:.2f}s | emo={dominant_emotion}, att={attention_score:.2f}, "
-                  f"emo_score={emotion_score:.2f}, obj_score={object_score:.2f}, final={final_score:.2f}, "
-                  f"focused_obj={focused_object}")
-
-        results.append({
-            "start": round(t, 2),
-            "emotion": dominant_emotion,
-            "object": focused_object,
-            "score": round(float(final_score), 2),
-            "attention_avg": round(float(attention_score), 2),
-            "emotion_score": round(float(emotion_score), 2),
-            "object_score": round(float(object_score), 2),
-            "window": window_sec
-        })
-
-        t += step_sec
+    samples = FocusSamples(emotion_logs, object_logs)
+    results = score_windows(samples, window_starts(min_time, max_time, window_sec, step_sec), window_sec,
+                            debug=debug)
 
     results.sort(key=lambda x: x["score"], reverse=True)
     return results[:top_k]
@@ -117,36 +72,46 @@ def _load_emotion_logs_from_csv(log_path: str) -> List[Dict[str, Any]]:
                 continue
     return logs
 
-def _load_object_logs_from_json(object_path: str) -> List[Dict[str, Any]]:
-    if not os.path.exists(object_path):
-        raise FileNotFoundError(f"object log not found: {object_path}")
-    with open(object_path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def analyze_focus_from_logs(
-    video_path: str,
-    log_path: str,
-    object_path: str,
-    save_path: Optional[str] = None,
-    window_sec: int = 10,
-    step_sec: int = 5,
-    top_k: int = 3
-) -> List[Dict[str, Any]]:
-    emotion_logs = _load_emotion_logs_from_csv(log_path)
-    object_logs = _load_object_logs_from_json(object_path)
-
-    segments = analyze_focus(
-        emotion_logs,
-        object_logs,
-        window_sec=window_sec,
-        step_sec=step_sec,
-        top_k=top_k,
-        debug=True  # 꼭 True로 두세요 (디버깅)
-    )
-
-    if save_path:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        with open(save_path, "w", encoding="utf-8") as f:
-            json.dump(segments, f, indent=2, ensure_ascii=False)
-
-    return segments
+def _load_emotion_logs_from_npz(log_path: str) -> Dict[str, np.ndarray]:
+    if not os.path.exists(log_path):
+        raise FileNotFoundError(f"emotion log not found: {log_path}")
+    return load_columns(log_path)
+
+def load_emotion_logs(log_path: str) -> List[Dict[str, Any]]:
+    if log_path.endswith(".npz"):
+        return emotion_columns_to_records(_load_emotion_logs_from_npz(log_path))
+    return _load_emotion_logs_from_csv(log_path)
+
+def select_nearest_frames(records: Iterable[Dict[str, Any]], timestamps) -> List[Dict[str, Any]]:
+    """
+    시간 순 객체 레코드 스트림에서 각 감정 시각에 가장 가까운 프레임만 남김.
+    analyze_focus는 감정 샘플마다 가장 가까운 프레임만 쓰므로 결과는 전체를 읽었을 때와 같고,
+    메모리는 영상 길이가 아니라 감정 샘플 수에 비례함. (거리가 같으면 앞 프레임 = min과 동일한 선택)
+    """
+    targets = sorted({float(t) for t in timestamps})
+    kept: Dict[int, Dict[str, Any]] = {}
+    prev = None
+    i = 0
+    for rec in records:
+        t = rec["timestamp"]
+        if prev is not None and t < prev["timestamp"]:
+            raise ValueError("object log is not sorted by timestamp")
+        # prev와 rec 사이(또는 첫 프레임 이전)의 감정 시각은 둘 중 가까운 쪽이 최근접 프레임
+        while i < len(targets) and targets[i] < t:
+            if prev is None or abs(targets[i] - t) < abs(targets[i] - prev["timestamp"]):
+                kept[rec["frame_id"]] = rec
+            else:
+                kept[prev["frame_id"]] = prev
+            i += 1
+        prev = rec
+    if prev is not None and i < len(targets):
+        kept[prev["frame_id"]] = prev
+    return sorted(kept.values(), key=lambda rec: rec["timestamp"])
+
+def load_emotion_timestamps(log_path: str) -> np.ndarray:
+    """
+    감정 로그의 video_time(초) 값만 읽음 (감정 시각 기준 객체 탐지용)
+    """
+    if log_path.endswith(".npz"):
+        return np.asarray(_load_emotion_logs_from_npz(log_path)["timestamp"], dtype=np.float64)
+    return np.array([log["timestamp"] for log in _load_emotion_logs_from_csv(log_path)], dtype=np.float64)
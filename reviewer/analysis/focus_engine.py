@@ -0,0 +1,264 @@
+# focus_engine.py
+# 집중 구간 점수 엔진: 감정 샘플별 값을 배열로 한 번 만들어 두고, 윈도우별 합계/개수는
+# 누적합(prefix sum)의 차로 계산 → 윈도우 수(step_sec)와 겹침 정도에 관계없이 샘플 수에 비례하는 시간
+#
+# 결과는 윈도우마다 리스트를 다시 걸러 평균을 내던 기존 analyze_focus와 같음
+#   - 감정/객체 점수는 정수 합이라 누적합으로도 정확히 같은 값
+#   - 집중도 평균은 누적합 오차가 반올림(소수 둘째 자리) 경계를 넘을 수 있는 윈도우만 기존 방식(np.mean)으로 다시 계산
+#   - 최빈 감정/집중 객체 동률은 윈도우 안에서 원래 로그 순서로 먼저 나온 쪽 (기존 객체 선택과 같은 규칙,
+#     감정은 set 순서라 실행마다 달랐음). 시각 순 정렬 위치가 아니라 원래 행 번호(order)로 비교하므로
+#     시각이 뒤섞인 로그에서도 기존 결과와 같음
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+EMOTION_WEIGHTS = {"surprise": 5, "happy": 4, "sad": 3, "angry": 2, "neutral": 1}
+BBOX_MARGIN = 10     # 동공 위치가 박스 밖이어도 이 픽셀 이내면 적중으로 봄 (is_point_in_bbox 기본값)
+
+_NO_HIT = np.iinfo(np.int64).max
+_EPS = float(np.finfo(np.float64).eps)
+
+
+def nearest_object_frames(object_logs: List[Dict[str, Any]], timestamps) -> np.ndarray:
+    """
+    각 시각에 가장 가까운 객체 프레임의 인덱스 (object_logs 기준) 를 한 번에 계산.
+    timestamp로 정렬한 색인에서 이진 탐색하고 앞뒤 후보 중 가까운 쪽을 고름.
+    거리가 같으면 object_logs에서 먼저 나오는 프레임 (min(object_logs, key=...)와 같은 선택)
+    """
+    frame_ts = np.fromiter((o["timestamp"] for o in object_logs), dtype=np.float64, count=len(object_logs))
+    return nearest_frame_index(frame_ts, timestamps)
+
+
+def nearest_frame_index(frame_ts: np.ndarray, timestamps) -> np.ndarray:
+    """
+    nearest_object_frames와 같고 프레임 시각 배열을 직접 받음 (객체 로그 컬럼의 timestamp)
+    """
+    queries = np.asarray(timestamps, dtype=np.float64)
+    frame_ts = np.asarray(frame_ts, dtype=np.float64)
+    order = np.argsort(frame_ts, kind="stable")   # 같은 시각끼리는 원래 순서 유지
+    sorted_ts = frame_ts[order]
+
+    right = np.searchsorted(sorted_ts, queries, side="left")   # 시각 >= 쿼리인 첫 프레임
+    left = np.maximum(right - 1, 0)
+    right = np.minimum(right, len(sorted_ts) - 1)
+    # 같은 시각의 프레임이 여러 개면 그중 원래 순서가 가장 앞선 것 (정렬 블록의 첫 원소)
+    left = np.searchsorted(sorted_ts, sorted_ts[left], side="left")
+
+    left_idx, right_idx = order[left], order[right]
+    left_dist = np.abs(sorted_ts[left] - queries)
+    right_dist = np.abs(sorted_ts[right] - queries)
+    pick_left = (left_dist < right_dist) | ((left_dist == right_dist) & (left_idx < right_idx))
+    return np.where(pick_left, left_idx, right_idx)
+
+
+def window_starts(min_time: float, max_time: float, window_sec, step_sec) -> List[float]:
+    """
+    기존 루프와 똑같이 t += step_sec를 누적해서 만든 윈도우 시작 시각 (부동소수 오차까지 동일)
+    """
+    starts = []
+    t = min_time
+    while t < max_time - window_sec:
+        starts.append(t)
+        t += step_sec
+    return starts
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    """
+    맨 앞에 0 행을 붙인 누적합: 구간 [lo, hi)의 합 = out[hi] - out[lo]
+    """
+    out = np.zeros((len(values) + 1,) + values.shape[1:], dtype=values.dtype)
+    np.cumsum(values, axis=0, out=out[1:])
+    return out
+
+
+def _window_min(values: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """
+    구간 [lo, hi)별 0번 축 최솟값 (구간은 비어 있지 않아야 함). 겹치는 구간도 reduceat 한 번으로 계산
+    """
+    padded = np.concatenate([values, np.full((1,) + values.shape[1:], _NO_HIT, dtype=values.dtype)])
+    return np.minimum.reduceat(padded, np.stack([lo, hi], axis=1).ravel(), axis=0)[::2]
+
+
+def _near_round_half(values: np.ndarray, tol: float) -> np.ndarray:
+    """
+    round(x, 2)의 경계(소수 셋째 자리 5) 근처 값: 오차 tol만큼 흔들리면 반올림 결과가 바뀔 수 있음
+    """
+    scaled = values * 100.0
+    return np.abs(scaled - np.floor(scaled) - 0.5) <= tol * 100.0 + 1e-9 * np.maximum(1.0, np.abs(scaled))
+
+
+class FocusSamples:
+    """
+    감정 샘플별 배열 (시간 순 정렬)
+
+    timestamp / attention / weight: 시각, 집중도, 감정 가중치 (N,)
+    emotion: emotions 사전 인덱스 (N,)
+    hits: 샘플의 최근접 객체 프레임에서 동공이 들어간 박스 수 (N, labels 수)
+    first_hit: 그 프레임에서 라벨이 처음 적중한 객체 순번 (N, labels 수), 없으면 매우 큰 값
+    order: 정렬된 행 → 원래 emotion_logs 인덱스
+    """
+
+    def __init__(self, emotion_logs: List[Dict[str, Any]], object_logs, margin: int = BBOX_MARGIN):
+        """
+        object_logs: 프레임 레코드 목록 또는 객체 로그 컬럼 (log_columns 형식 dict, 변환 없이 그대로 사용)
+        """
+        n = len(emotion_logs)
+        raw_ts = np.fromiter((log["timestamp"] for log in emotion_logs), dtype=np.float64, count=n)
+        self.order = np.argsort(raw_ts, kind="stable")
+        self.timestamp = raw_ts[self.order]
+        self.raw_attention = np.fromiter((log["attention"] for log in emotion_logs), dtype=np.float64, count=n)
+        self.attention = self.raw_attention[self.order]
+
+        vocab: Dict[str, int] = {}
+        codes = np.fromiter((vocab.setdefault(log["emotion"], len(vocab)) for log in emotion_logs),
+                            dtype=np.int64, count=n)
+        self.emotions = list(vocab)
+        self.emotion = codes[self.order]
+        self.weight = np.array([EMOTION_WEIGHTS.get(e, 0) for e in self.emotions], dtype=np.int64)[self.emotion] \
+            if self.emotions else np.zeros(0, dtype=np.int64)
+
+        self.labels, self.hits, self.first_hit = self._gaze_hits(emotion_logs, object_logs, margin)
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def _gaze_hits(self, emotion_logs, object_logs, margin):
+        """
+        샘플마다 최근접 프레임의 모든 박스와 동공 위치를 한 번에 비교 (샘플 x 박스 쌍을 평탄화해 브로드캐스팅)
+        """
+        n = len(emotion_logs)
+        if not num_object_frames(object_logs) or not n:
+            return [], np.zeros((n, 0), dtype=np.int64), np.zeros((n, 0), dtype=np.int64)
+
+        pupil = np.array([log["pupil"] if log.get("pupil") is not None else (np.nan, np.nan)
+                          for log in emotion_logs], dtype=np.float64).reshape(-1, 2)[self.order]
+        if isinstance(object_logs, dict):
+            frame_of_row = nearest_frame_index(object_logs["timestamp"], self.timestamp)
+            offsets, bbox, codes = object_logs["offsets"], object_logs["bbox"], object_logs["label"]
+            labels = object_logs["labels"].tolist()
+        else:
+            # 레코드 목록이면 최근접으로 뽑힌 프레임의 박스만 배열로 변환
+            nearest = nearest_object_frames(object_logs, self.timestamp)
+            frames, frame_of_row = np.unique(nearest, return_inverse=True)
+            offsets, bbox, codes, labels = frame_boxes([object_logs[i] for i in frames.tolist()])
+
+        # (샘플 행, 그 행의 최근접 프레임 안 객체 순번) 쌍 전체
+        rows = np.flatnonzero(~np.isnan(pupil).any(axis=1))
+        start = offsets[frame_of_row[rows]]
+        num = offsets[frame_of_row[rows] + 1] - start
+        pair_row = np.repeat(rows, num)
+        pair_pos = np.arange(int(num.sum())) - np.repeat(np.cumsum(num) - num, num)
+        pair_obj = np.repeat(start, num) + pair_pos
+        pair_box = bbox[pair_obj]
+
+        p = pupil[pair_row]
+        inside = ((pair_box[:, :2] - margin <= p) & (p <= pair_box[:, 2:] + margin)).all(axis=1)
+        hit_row, hit_pos = pair_row[inside], pair_pos[inside]
+        used, hit_label = np.unique(codes[pair_obj[inside]], return_inverse=True)
+        num_labels = len(used)
+
+        # 라벨별 적중 수, 행 안에서 라벨이 처음 적중한 객체 순번 (쌍은 행 → 객체 순번 순서로 나열돼 있음)
+        key = hit_row * num_labels + hit_label
+        hits = np.bincount(key, minlength=n * num_labels).reshape(n, num_labels)
+        first_hit = np.full(n * num_labels, _NO_HIT, dtype=np.int64)
+        uniq, first = np.unique(key, return_index=True)
+        first_hit[uniq] = hit_pos[first]
+        return [labels[u] for u in used.tolist()], hits.astype(np.int64), first_hit.reshape(n, num_labels)
+
+
+def num_object_frames(object_logs) -> int:
+    if isinstance(object_logs, dict):
+        return len(object_logs["timestamp"])
+    return len(object_logs) if object_logs else 0
+
+
+def frame_boxes(frames: List[Dict[str, Any]]):
+    """
+    프레임 레코드들의 박스를 객체 로그 컬럼(log_columns)과 같은 배치로 변환:
+    offsets (F+1,), bbox float64 (M, 4), label (M,) 라벨 사전 인덱스, labels 사전
+    (bbox를 int32로 줄이지 않아 원래 값과 같은 비교 결과)
+    """
+    offsets = np.zeros(len(frames) + 1, dtype=np.int64)
+    np.cumsum([len(rec["objects"]) for rec in frames], out=offsets[1:])
+    objects = [obj for rec in frames for obj in rec["objects"]]
+    label_ids: Dict[str, int] = {}
+    codes = np.fromiter((label_ids.setdefault(obj["label"], len(label_ids)) for obj in objects),
+                        dtype=np.int64, count=len(objects))
+    bbox = np.array([obj["bbox"] for obj in objects], dtype=np.float64).reshape(-1, 4)
+    return offsets, bbox, codes, list(label_ids)
+
+
+def score_windows(samples: FocusSamples, starts: Sequence[float], window_sec,
+                  debug: bool = False) -> List[Dict[str, Any]]:
+    """
+    윈도우 [t, t + window_sec)별 점수 dict 목록 (시작 시각 순, 샘플이 없는 윈도우는 제외)
+    """
+    if not len(samples) or not len(starts):
+        return []
+    starts_arr = np.asarray(starts, dtype=np.float64)
+    lo = np.searchsorted(samples.timestamp, starts_arr, side="left")
+    hi = np.searchsorted(samples.timestamp, starts_arr + window_sec, side="left")
+    keep = np.flatnonzero(hi > lo)
+    lo, hi = lo[keep], hi[keep]
+    count = hi - lo
+
+    # 집중도 / 감정 점수: 평균 = 구간 합 / 개수
+    att_prefix = _prefix(samples.attention)
+    attention = (att_prefix[hi] - att_prefix[lo]) / count
+    weight_prefix = _prefix(samples.weight)
+    emotion_score = (weight_prefix[hi] - weight_prefix[lo]) / count
+
+    # 최빈 감정 (동률이면 윈도우 안에서 원래 로그 순서로 먼저 나온 감정)
+    onehot = samples.emotion[:, None] == np.arange(len(samples.emotions))[None, :]
+    emo_counts = _prefix(onehot.astype(np.int64))
+    emo_counts = emo_counts[hi] - emo_counts[lo]
+    emo_first = _window_min(np.where(onehot, samples.order[:, None], _NO_HIT), lo, hi)
+    is_max = emo_counts == emo_counts.max(axis=1, keepdims=True)
+    dominant = np.argmin(np.where(is_max, emo_first, _NO_HIT), axis=1)
+
+    # 집중 객체: 라벨별 적중 수 (동률이면 윈도우 안에서 원래 로그 순서 → 프레임 안 객체 순서로 먼저 적중한 라벨)
+    num_labels = len(samples.labels)
+    if num_labels:
+        hit_counts = _prefix(samples.hits)
+        hit_counts = hit_counts[hi] - hit_counts[lo]
+        best_hits = hit_counts.max(axis=1)
+        max_pos = int(samples.first_hit[samples.first_hit != _NO_HIT].max(initial=0)) + 1
+        hit_pos = np.minimum(samples.first_hit, max_pos - 1)
+        hit_key = np.where(samples.hits > 0, samples.order[:, None] * max_pos + hit_pos, _NO_HIT)
+        hit_first = _window_min(hit_key, lo, hi)
+        focused = np.argmin(np.where(hit_counts == best_hits[:, None], hit_first, _NO_HIT), axis=1)
+    else:
+        best_hits = np.zeros(len(keep), dtype=np.int64)
+        focused = np.zeros(len(keep), dtype=np.int64)
+    object_score = np.minimum(10.0, best_hits / np.maximum(count, 1) * 10.0)
+
+    final = 0.4 * attention + 0.3 * emotion_score + 0.3 * object_score
+
+    # 누적합 오차가 반올림 결과를 바꿀 수 있는 윈도우만 기존 방식(원래 순서의 np.mean)으로 다시 계산
+    tol = 4.0 * len(samples) * _EPS * (float(np.abs(samples.attention).sum()) + 1.0)
+    for w in np.flatnonzero(_near_round_half(attention, tol) | _near_round_half(final, tol)).tolist():
+        members = np.sort(samples.order[lo[w]:hi[w]])
+        attention[w] = float(np.mean(samples.raw_attention[members]))
+        final[w] = 0.4 * attention[w] + 0.3 * emotion_score[w] + 0.3 * object_score[w]
+
+    results: List[Dict[str, Any]] = []
+    for w, idx in enumerate(keep.tolist()):
+        t = starts[idx]
+        dominant_emotion = samples.emotions[dominant[w]]
+        focused_object = samples.labels[focused[w]] if best_hits[w] > 0 else None
+        if debug:
+            print(f"[DEBUG] t={t:.2f}s | emo={dominant_emotion}, att={attention[w]:.2f}, "
+                  f"emo_score={emotion_score[w]:.2f}, obj_score={object_score[w]:.2f}, final={final[w]:.2f}, "
+                  f"focused_obj={focused_object}")
+        results.append({
+            "start": round(t, 2),
+            "emotion": dominant_emotion,
+            "object": focused_object,
+            "score": round(float(final[w]), 2),
+            "attention_avg": round(float(attention[w]), 2),
+            "emotion_score": round(float(emotion_score[w]), 2),
+            "object_score": round(float(object_score[w]), 2),
+            "window": window_sec
+        })
+    return results
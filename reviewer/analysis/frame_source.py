@@ -0,0 +1,171 @@
+# frame_source.py
+# 객체 인식용 프레임 공급기: 필요 없는 프레임은 grab만 하고(retrieve 생략), 필요한 프레임은
+# 백그라운드 스레드에서 디코딩해 크기 제한 큐에 넣음 → 디코딩과 추론이 겹쳐서 실행됨
+import queue
+import threading
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+SEEK_GAP_FRAMES = 90     # 다음 대상 프레임이 이보다 멀면 grab으로 넘기지 않고 seek
+QUEUE_SIZE = 32          # 디코딩된 프레임 대기열 크기 (메모리 상한)
+
+_END = object()
+
+
+def fit_size(width: int, height: int, max_side: int) -> Tuple[int, int]:
+    """
+    비율을 유지하면서 긴 변이 max_side 이하가 되는 (width, height)
+    """
+    scale = max_side / float(max(width, height))
+    if scale >= 1.0:
+        return width, height
+    return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+
+def probe_video(video_path: str) -> Tuple[float, int, int, int]:
+    """
+    (fps, width, height, 전체 프레임 수)
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"영상 열기 실패: {video_path}")
+    try:
+        return (cap.get(cv2.CAP_PROP_FPS) or 30.0,
+                int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+    finally:
+        cap.release()
+
+
+class FrameSource:
+    """
+    비디오에서 원하는 프레임만 (frame_id, BGR 프레임) 순서로 공급.
+
+    - frame_ids가 주어지면 그 프레임들만 (정렬된 순서), 아니면 skip_frames 간격으로 영상 끝까지
+      (total_frames는 추정치이므로 진행률 표시용)
+    - 건너뛰는 프레임은 cap.grab()만 호출 (색 변환/복사 없음), 간격이 크면 seek
+    - max_side가 주어지면 디코딩 스레드에서 긴 변이 max_side가 되도록 축소
+      (박스 좌표를 원본 해상도로 되돌릴 때는 scale 사용)
+    """
+
+    def __init__(self, video_path: str, frame_ids: Optional[Sequence[int]] = None, skip_frames: int = 1,
+                 max_side: Optional[int] = None, queue_size: int = QUEUE_SIZE, seek_gap: int = SEEK_GAP_FRAMES):
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise IOError(f"영상 열기 실패: {video_path}")
+
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        self.frame_ids: Optional[List[int]] = sorted(frame_ids) if frame_ids is not None else None
+        self.skip_frames = max(1, int(skip_frames))
+        self.seek_gap = seek_gap
+
+        self.decode_size: Optional[Tuple[int, int]] = None
+        if max_side and self.width and self.height:
+            size = fit_size(self.width, self.height, max_side)
+            if size != (self.width, self.height):
+                self.decode_size = size
+        # 공급되는 프레임 좌표 → 원본 좌표 배율 (x, y)
+        if self.decode_size:
+            self.scale = (self.width / self.decode_size[0], self.height / self.decode_size[1])
+        else:
+            self.scale = None
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._decode_loop, name="frame-decode", daemon=True)
+            self._thread.start()
+        while True:
+            item = self._queue.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            # 큐가 가득 차서 디코딩 스레드가 멈춰 있으면 풀어줌
+            while self._thread.is_alive():
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    self._thread.join(timeout=0.05)
+        self.cap.release()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _wanted(self) -> Iterator[int]:
+        if self.frame_ids is not None:
+            yield from self.frame_ids
+            return
+        # CAP_PROP_FRAME_COUNT는 컨테이너 메타데이터 기반 추정치라 실제보다 적을 수 있음
+        # → 전체 프레임 수는 진행률 표시에만 쓰고, grab()이 실패할 때까지 읽음 (_decode_loop에서 종료)
+        frame_id = 0
+        while True:
+            yield frame_id
+            frame_id += self.skip_frames
+
+    def _seek(self, fid: int) -> int:
+        """
+        fid 이하 위치로 seek하고 실제 위치(다음에 읽힐 프레임 번호) 반환 → 호출한 쪽에서 fid까지 grab으로 진행.
+        CAP_PROP_POS_FRAMES seek는 H.264/VP9 등에서 요청한 프레임에 정확히 멈추지 않을 수 있으므로
+        설정 후 실제 위치를 다시 읽고, 목표를 지나쳤으면 seek_gap만큼 앞으로 다시 seek
+        """
+        for target in (fid, max(0, fid - self.seek_gap)):
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+            actual = int(round(self.cap.get(cv2.CAP_PROP_POS_FRAMES)))
+            if 0 <= actual <= fid:
+                return actual
+        # 계속 지나치면 처음부터 grab (느리지만 순차 디코딩과 같은 프레임)
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return 0
+
+    def _decode_loop(self):
+        try:
+            pos = 0  # 다음에 읽힐 프레임 번호
+            for fid in self._wanted():
+                if self._stop.is_set():
+                    break
+                if self.frame_ids is not None and fid - pos > self.seek_gap:
+                    pos = self._seek(fid)
+                while pos < fid and self.cap.grab():
+                    pos += 1
+                if pos < fid or not self.cap.grab():
+                    break
+                pos += 1
+                ret, frame = self.cap.retrieve()
+                if not ret:
+                    break
+                if self.decode_size:
+                    frame = cv2.resize(frame, self.decode_size, interpolation=cv2.INTER_AREA)
+                if not self._put((fid, frame)):
+                    return
+        except Exception as e:
+            self._put(e)
+            return
+        self._put(_END)
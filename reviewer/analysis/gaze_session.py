@@ -0,0 +1,144 @@
+# gaze_session.py
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class FaceMeshPool:
+    """
+    FaceMesh 인스턴스를 최대 max_size 개까지만 만들어 재사용하는 풀.
+    (FaceMesh(static_image_mode=False)는 내부 추적 상태를 가지므로 세션끼리 공유하면 안 됨)
+    """
+
+    def __init__(self, factory: Callable[[], object], max_size: int = 8):
+        self.factory = factory
+        self.max_size = max(1, int(max_size))
+        self._idle: List[object] = []
+        self._created = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._idle and self._created >= self.max_size:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("사용 가능한 FaceMesh 인스턴스가 없습니다.")
+                self._cond.wait(remaining)
+
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+
+        try:
+            return self.factory()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, face_mesh):
+        """
+        반납된 인스턴스는 이전 세션의 추적 상태를 지운 뒤에만 풀에 넣음 (초기화할 수 없으면 닫고 폐기)
+        """
+        try:
+            face_mesh.reset()   # mediapipe SolutionBase.reset(): 그래프를 다시 시작해 추적 상태 초기화
+            reusable = True
+        except Exception as e:
+            print(f"[SESSION] FaceMesh 초기화 실패, 폐기: {e}")
+            reusable = False
+            try:
+                face_mesh.close()
+            except Exception:
+                pass
+
+        with self._cond:
+            if reusable:
+                self._idle.append(face_mesh)
+            else:
+                self._created -= 1
+            self._cond.notify()
+
+
+class GazeSession:
+    """
+    task_id(리뷰어 분석 세션) 하나의 시선 추적 상태.
+    이전 프레임 동공 위치와 전용 FaceMesh 인스턴스를 가짐.
+    """
+
+    def __init__(self, task_id: str, face_mesh):
+        self.task_id = task_id
+        self.face_mesh = face_mesh
+        self.prev_pupil: Optional[Tuple[int, int]] = None
+        self.last_used = time.monotonic()
+        self.closed = False
+        # 같은 세션의 프레임은 FaceMesh 추적 순서를 지키기 위해 직렬 처리
+        self.lock = threading.Lock()
+
+    def touch(self):
+        self.last_used = time.monotonic()
+
+
+class GazeSessionRegistry:
+    """
+    task_id → GazeSession 관리. 오래 사용되지 않은 세션은 정리하고 FaceMesh를 풀에 반납.
+    """
+
+    def __init__(self, pool: FaceMeshPool, idle_sec: float = 120.0, acquire_timeout: float = 5.0):
+        self.pool = pool
+        self.idle_sec = idle_sec
+        self.acquire_timeout = acquire_timeout
+        self._sessions: Dict[str, GazeSession] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def get(self, task_id: str) -> GazeSession:
+        self._maybe_sweep()
+        with self._lock:
+            session = self._sessions.get(task_id)
+            if session is not None:
+                session.touch()
+                return session
+
+        try:
+            face_mesh = self.pool.acquire(timeout=0)
+        except TimeoutError:
+            # 풀이 가득 찼으면 유휴 세션부터 정리한 뒤 대기
+            self.evict_idle()
+            face_mesh = self.pool.acquire(timeout=self.acquire_timeout)
+
+        with self._lock:
+            session = self._sessions.get(task_id)
+            if session is not None:
+                # 그 사이 다른 스레드가 같은 세션을 만든 경우
+                self.pool.release(face_mesh)
+            else:
+                session = GazeSession(task_id, face_mesh)
+                self._sessions[task_id] = session
+            session.touch()
+            return session
+
+    def close(self, task_id: str):
+        with self._lock:
+            session = self._sessions.pop(task_id, None)
+        if session is not None:
+            with session.lock:
+                session.closed = True
+                self.pool.release(session.face_mesh)
+            print(f"[SESSION] 시선 추적 세션 종료: {task_id}")
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            expired = [tid for tid, s in self._sessions.items() if now - s.last_used > self.idle_sec]
+        for task_id in expired:
+            self.close(task_id)
+        return len(expired)
+
+    def _maybe_sweep(self):
+        now = time.monotonic()
+        if now - self._last_sweep < min(self.idle_sec, 10.0):
+            return
+        self._last_sweep = now
+        self.evict_idle(now)
@@ -0,0 +1,168 @@
+# log_columns.py
+# 감정/객체 로그의 컬럼 기반(.npz) 저장 형식
+#
+# 감정 로그 (샘플 N개)
+#   timestamp   float64 (N,)     영상 기준 시각(video_time)
+#   emotion     int16   (N,)     emotions 사전의 인덱스
+#   emotions    str     (E,)     감정 문자열 사전
+#   attention   float64 (N,)     집중도 (attention_str_to_float 기준 수치)
+#   pupil       float64 (N, 2)   동공 위치, 없으면 NaN
+#
+# 객체 로그 (프레임 F개, 객체 M개)
+#   frame_id    int64   (F,)
+#   timestamp   float64 (F,)
+#   offsets     int64   (F+1,)   프레임 i의 객체 = [offsets[i], offsets[i+1])
+#   bbox        int32   (M, 4)   x1, y1, x2, y2
+#   label       int16   (M,)     labels 사전의 인덱스
+#   labels      str     (L,)     라벨 문자열 사전
+#   confidence  float32 (M,)
+#   resolution  int32   (2,)     width, height (모든 프레임 공통이라 한 번만 저장)
+#   reused      bool    (F,)     추론 없이 이전 추론 결과를 재사용한 프레임 (모션 게이트, 없으면 모두 False)
+#   tracked     bool    (F,)     키프레임 사이를 보간해서 채운 프레임 (없으면 모두 False)
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def _encode(values: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    vocab: Dict[str, int] = {}
+    codes = np.fromiter((vocab.setdefault(v, len(vocab)) for v in values), dtype=np.int16, count=len(values))
+    return codes, np.array(list(vocab), dtype=str)
+
+
+def save_columns(path: str, columns: Dict[str, np.ndarray]) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # np.savez는 확장자가 없으면 .npz를 붙이므로 경로를 그대로 쓰도록 파일 객체로 저장
+    with open(path, "wb") as f:
+        np.savez(f, **columns)
+    return path
+
+
+def load_columns(path: str) -> Dict[str, np.ndarray]:
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
+
+
+# ----------------------------------------------------------------------
+# 감정 로그
+# ----------------------------------------------------------------------
+def emotion_records_to_columns(logs: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    codes, vocab = _encode([log["emotion"] for log in logs])
+    pupil = np.full((len(logs), 2), np.nan, dtype=np.float64)
+    for i, log in enumerate(logs):
+        if log.get("pupil") is not None:
+            pupil[i] = log["pupil"]
+    return {
+        "timestamp": np.array([log["timestamp"] for log in logs], dtype=np.float64),
+        "emotion": codes,
+        "emotions": vocab,
+        "attention": np.array([log["attention"] for log in logs], dtype=np.float64),
+        "pupil": pupil,
+    }
+
+
+def emotion_columns_to_records(columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    emotions = columns["emotions"].tolist()
+    pupils = columns["pupil"].tolist()
+    return [
+        {
+            "timestamp": ts,
+            "emotion": emotions[code],
+            "attention": att,
+            "pupil": None if px != px or py != py else (px, py),  # NaN 체크
+        }
+        for ts, code, att, (px, py) in zip(
+            columns["timestamp"].tolist(), columns["emotion"].tolist(), columns["attention"].tolist(), pupils
+        )
+    ]
+
+
+class EmotionColumnBuilder:
+    """
+    분석 세션 동안 감정 샘플을 컬럼 형태로 누적 (스레드 안전)
+    """
+
+    def __init__(self):
+        self._timestamp: List[float] = []
+        self._emotion: List[str] = []
+        self._attention: List[float] = []
+        self._pupil: List[Tuple[float, float]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._timestamp)
+
+    def append(self, timestamp: float, emotion: str, attention: float, pupil: Optional[Tuple[float, float]] = None):
+        with self._lock:
+            self._timestamp.append(float(timestamp))
+            self._emotion.append(emotion)
+            self._attention.append(float(attention))
+            self._pupil.append(tuple(pupil) if pupil is not None else (np.nan, np.nan))
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        with self._lock:
+            codes, vocab = _encode(self._emotion)
+            return {
+                "timestamp": np.array(self._timestamp, dtype=np.float64),
+                "emotion": codes,
+                "emotions": vocab,
+                "attention": np.array(self._attention, dtype=np.float64),
+                "pupil": np.array(self._pupil, dtype=np.float64).reshape(-1, 2),
+            }
+
+
+# ----------------------------------------------------------------------
+# 객체 로그
+# ----------------------------------------------------------------------
+def object_records_to_columns(records: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    counts = [len(rec["objects"]) for rec in records]
+    offsets = np.zeros(len(records) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    objects = [obj for rec in records for obj in rec["objects"]]
+    codes, vocab = _encode([obj["label"] for obj in objects])
+    resolution = records[0].get("resolution", [0, 0]) if records else [0, 0]
+    return {
+        "frame_id": np.array([rec["frame_id"] for rec in records], dtype=np.int64),
+        "timestamp": np.array([rec["timestamp"] for rec in records], dtype=np.float64),
+        "offsets": offsets,
+        "bbox": np.array([obj["bbox"] for obj in objects], dtype=np.int32).reshape(-1, 4),
+        "label": codes,
+        "labels": vocab,
+        "confidence": np.array([obj["confidence"] for obj in objects], dtype=np.float32),
+        "resolution": np.array(resolution, dtype=np.int32),
+        "reused": np.array([bool(rec.get("reused")) for rec in records], dtype=bool),
+        "tracked": np.array([bool(rec.get("tracked")) for rec in records], dtype=bool),
+    }
+
+
+def object_columns_to_records(columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    labels = columns["labels"].tolist()
+    offsets = columns["offsets"].tolist()
+    bboxes = columns["bbox"].tolist()
+    codes = columns["label"].tolist()
+    confs = columns["confidence"].tolist()
+    resolution = columns["resolution"].tolist()
+    no_flags = [False] * len(columns["frame_id"])
+    reused = columns["reused"].tolist() if "reused" in columns else no_flags
+    tracked = columns["tracked"].tolist() if "tracked" in columns else no_flags
+
+    records = []
+    for i, (frame_id, ts) in enumerate(zip(columns["frame_id"].tolist(), columns["timestamp"].tolist())):
+        start, end = offsets[i], offsets[i + 1]
+        records.append({
+            "frame_id": frame_id,
+            "timestamp": ts,
+            "objects": [
+                {"label": labels[codes[j]], "bbox": bboxes[j], "confidence": confs[j]}
+                for j in range(start, end)
+            ],
+            "resolution": resolution,
+        })
+        if reused[i]:
+            records[-1]["reused"] = True
+        if tracked[i]:
+            records[-1]["tracked"] = True
+    return records
@@ -0,0 +1,40 @@
+# motion_gate.py
+# 장면 변화가 거의 없는 프레임은 YOLO를 다시 돌리지 않고 직전 추론 결과를 재사용하기 위한 판정기
+from typing import Optional
+
+import cv2
+import numpy as np
+
+THUMB_SIZE = (64, 36)      # 비교용 축소 크기 (width, height)
+DEFAULT_MAX_REUSE = 10     # 연속 재사용 상한: 이 횟수마다 강제로 다시 추론 (박스가 오래 고정되지 않도록)
+
+
+def frame_thumbnail(frame: np.ndarray) -> np.ndarray:
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    return cv2.resize(gray, THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+class MotionGate:
+    """
+    마지막으로 추론한 프레임과의 차이(축소 흑백 이미지의 평균 절대 차, 0~255)가 threshold 미만이면 재사용.
+    직전 프레임이 아니라 마지막 추론 프레임과 비교하므로 느린 변화도 누적되어 결국 다시 추론됨.
+    """
+
+    def __init__(self, threshold: float, max_reuse: int = DEFAULT_MAX_REUSE):
+        self.threshold = threshold
+        self.max_reuse = max(0, int(max_reuse))
+        self.skipped = 0
+        self._reference: Optional[np.ndarray] = None
+        self._reused_in_row = 0
+
+    def should_reuse(self, frame: np.ndarray) -> bool:
+        thumb = frame_thumbnail(frame)
+        if (self._reference is not None and self._reused_in_row < self.max_reuse
+                and float(np.abs(thumb - self._reference).mean()) < self.threshold):
+            self._reused_in_row += 1
+            self.skipped += 1
+            return True
+        # 이 프레임을 추론하고 새 기준으로 사용
+        self._reference = thumb
+        self._reused_in_row = 0
+        return False
@@ -1,39 +1,227 @@
 # object_detector.py
 import os
 import json
-import cv2
-from typing import List, Dict, Any, Optional, Tuple
+import collections
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple, Callable
 from ultralytics import YOLO
+from .log_columns import object_records_to_columns, save_columns
+from .object_log import write_object_log
+from .frame_source import FrameSource, probe_video
+from .motion_gate import MotionGate, DEFAULT_MAX_REUSE
+from .box_tracker import iter_interpolated
 
 
-# 전역에서 한 번만 로드 (필요시 device 선택 가능)
-_yolo_model = None
+# 가중치 파일별로 한 번만 로드 (필요시 device 선택 가능)
+_yolo_models: Dict[str, YOLO] = {}
+# YOLO 모델은 스레드 안전하지 않음: 파이프라인 작업 스레드와 실시간 분석 스레드가 같은 모델을 쓰므로
+# 로드와 predict 호출을 프로세스 안에서 직렬화 (샤드 워커 프로세스는 각자 모델/잠금을 가짐)
+_model_lock = threading.Lock()
 
+MODEL_WEIGHTS = "yolov8n.pt"
 
-def _get_model(device: Optional[str] = None) -> YOLO:
-    global _yolo_model
-    if _yolo_model is None:
-        _yolo_model = YOLO("yolov8n.pt")
-        if device:
-            _yolo_model.to(device)
-    return _yolo_model
+DEFAULT_BATCH_SIZE = 8   # 프레임 묶음 크기 (predict 호출당 전처리/파이썬 오버헤드 분산)
+SHARDS_PER_WORKER = 2   # 워커당 샤드 수 (샤드별 처리 시간 편차를 줄이기 위해 워커 수보다 잘게 나눔)
+SHARD_MAX_FRAMES = 600  # 샤드 하나의 최대 프레임 수 (샤드 결과가 통째로 메모리에 올라오므로 긴 영상은 더 잘게 나눔)
+MODEL_INPUT_SIZE = 640   # YOLO 입력 해상도 (decode_to_model=True일 때 이 크기로 줄여서 디코딩)
+
+
+def _get_model(device: Optional[str] = None, weights: str = MODEL_WEIGHTS) -> YOLO:
+    with _model_lock:
+        model = _yolo_models.get(weights)
+        if model is None:
+            model = YOLO(weights)
+            if device:
+                model.to(device)
+            _yolo_models[weights] = model
+        return model
+
+
+def inference_options(model_weights: str = MODEL_WEIGHTS, imgsz: Optional[int] = None,
+                      classes: Optional[Sequence[str]] = None, conf: Optional[float] = None) -> Dict[str, Any]:
+    """
+    추론 설정 묶음 (None이면 ultralytics 기본값: imgsz 640, 전체 80개 클래스, conf 0.25)
+
+    Args:
+        model_weights: YOLO 가중치 파일 (예: yolov8n.pt, yolov8s.pt)
+        imgsz: 추론 입력 해상도 (32의 배수, 작을수록 빠름)
+        classes: 탐지할 라벨 이름 목록 (예: ["person", "cell phone"])
+        conf: 최소 confidence
+    """
+    return {
+        "weights": model_weights,
+        "imgsz": imgsz,
+        "classes": sorted(set(classes)) if classes else None,
+        "conf": conf,
+    }
+
+
+DEFAULT_INFERENCE = inference_options()
+
+
+def _predict_kwargs(model: YOLO, inference: Dict[str, Any]) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {"verbose": False}
+    if inference.get("imgsz"):
+        kwargs["imgsz"] = inference["imgsz"]
+    if inference.get("conf") is not None:
+        kwargs["conf"] = inference["conf"]
+    if inference.get("classes"):
+        names = model.names.items() if isinstance(model.names, dict) else enumerate(model.names)
+        name_to_id = {name: cls_id for cls_id, name in names}
+        unknown = [name for name in inference["classes"] if name not in name_to_id]
+        if unknown:
+            raise ValueError(f"모델에 없는 클래스: {unknown}")
+        kwargs["classes"] = [name_to_id[name] for name in inference["classes"]]
+    return kwargs
+
+
+def _decode_max_side(inference: Dict[str, Any], decode_to_model: bool) -> Optional[int]:
+    if not decode_to_model:
+        return None
+    return inference.get("imgsz") or MODEL_INPUT_SIZE
+
+
+def _boxes_to_objects(model: YOLO, yolo_result, scale: Optional[Tuple[float, float]] = None) -> List[Dict[str, Any]]:
+    """
+    YOLO 결과 하나를 객체 목록으로 변환 (박스별 .item() 호출 대신 텐서 전체를 한 번에 numpy로 변환)
+    scale: 축소된 프레임에서 탐지한 경우 원본 좌표로 되돌릴 (x, y) 배율
+    """
+    boxes = yolo_result.boxes
+    if len(boxes) == 0:
+        return []
+    xyxy = boxes.xyxy.cpu().numpy()
+    if scale is not None:
+        xyxy = xyxy * (scale[0], scale[1], scale[0], scale[1])
+    xyxy = xyxy.astype(int).tolist()
+    cls_ids = boxes.cls.cpu().numpy().astype(int).tolist()
+    confs = boxes.conf.cpu().numpy().tolist()
+    # 최신 ultralytics에서는 model.names 로 접근
+    names = model.names
+    return [
+        {"label": names[cls_id], "bbox": bbox, "confidence": conf}
+        for bbox, cls_id, conf in zip(xyxy, cls_ids, confs)
+    ]
+
+
+def detect_frames(model: YOLO, frames: List[Any], scale: Optional[Tuple[float, float]] = None,
+                  predict_kwargs: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+    """
+    프레임 묶음을 한 번의 predict 호출로 처리해 프레임별 객체 목록 반환
+    predict_kwargs: model.predict에 넘길 설정 (_predict_kwargs로 생성, 없으면 기본값)
+    """
+    if not frames:
+        return []
+    with _model_lock:
+        results = model.predict(frames, **(predict_kwargs or {"verbose": False}))
+        return [_boxes_to_objects(model, r, scale) for r in results]
+
+
+class _BatchDetector:
+    """
+    프레임을 batch_size개씩 모아 탐지하고, 묶음이 찰 때마다 완성된 프레임 레코드를 반환 (누적하지 않음).
+    gate가 있으면 장면 변화가 작은 프레임은 추론하지 않고 마지막 추론 결과를 재사용 ("reused": True)
+    """
+
+    def __init__(self, model: YOLO, fps: float, resolution: List[int], batch_size: int,
+                 scale: Optional[Tuple[float, float]] = None, gate: Optional[MotionGate] = None,
+                 predict_kwargs: Optional[Dict[str, Any]] = None):
+        self.model = model
+        self.predict_kwargs = predict_kwargs
+        self.fps = fps
+        self.resolution = resolution
+        self.scale = scale
+        self.gate = gate
+        self.batch_size = max(1, int(batch_size))
+        self.count = 0   # 지금까지 내보낸 프레임 수
+        self._pending: List[Tuple[int, Any]] = []   # (frame_id, 프레임 또는 재사용이면 None)
+        self._num_frames = 0
+        self._last_objects: List[Dict[str, Any]] = []
+
+    def add(self, frame_id: int, frame) -> List[Dict[str, Any]]:
+        if self.gate is not None and self.gate.should_reuse(frame):
+            frame = None
+        else:
+            self._num_frames += 1
+        self._pending.append((frame_id, frame))
+        if self._num_frames >= self.batch_size:
+            return self.flush()
+        return []
+
+    def flush(self) -> List[Dict[str, Any]]:
+        frames = [frame for _, frame in self._pending if frame is not None]
+        detected = iter(detect_frames(self.model, frames, self.scale, self.predict_kwargs))
+        records = []
+        for fid, frame in self._pending:
+            record = {
+                "frame_id": fid,
+                "timestamp": round(fid / self.fps, 3),
+                "objects": None,
+                "resolution": list(self.resolution)
+            }
+            if frame is None:
+                record["objects"] = [dict(obj) for obj in self._last_objects]
+                record["reused"] = True
+            else:
+                record["objects"] = self._last_objects = next(detected)
+            records.append(record)
+        self._pending.clear()
+        self._num_frames = 0
+        self.count += len(records)
+        return records
+
+
+def save_results(results: Iterable[Dict[str, Any]], save_path: Optional[str]):
+    """
+    .jsonl이면 한 줄씩 스트리밍 기록 (results가 이터레이터여도 전체를 메모리에 두지 않음),
+    .npz면 컬럼 형식, 그 외에는 JSON
+    """
+    if save_path and save_path.endswith(".jsonl"):
+        write_object_log(save_path, results)
+    elif save_path and save_path.endswith(".npz"):
+        save_columns(save_path, object_records_to_columns(list(results)))
+    elif save_path:
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        with open(save_path, "w", encoding="utf-8") as f:
+            json.dump(list(results), f, indent=2, ensure_ascii=False)
 
 
 def detect_objects_in_video(
     video_path: str,
     skip_frames: int = 1,
     save_path: Optional[str] = None,
-    device: Optional[str] = None
+    device: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    decode_to_model: bool = False,
+    num_workers: int = 1,
+    motion_threshold: Optional[float] = None,
+    max_reuse: int = DEFAULT_MAX_REUSE,
+    keyframe_interval: int = 1,
+    inference: Optional[Dict[str, Any]] = None
 ) -> List[Dict[str, Any]]:
     """
     비디오에서 객체 탐지 결과를 프레임 단위로 추출.
-    결과는 메모리로 반환하고, save_path가 주어지면 JSON으로 저장.
+    결과는 메모리로 반환하고, save_path가 주어지면 저장.
+    (.jsonl이면 스트리밍 로그, .npz면 컬럼 형식, 그 외에는 JSON)
+    긴 영상을 결과 목록 없이 파일로만 남기려면 iter_objects_in_video + write_object_log 사용
 
     Args:
         video_path: 분석할 비디오 경로
         skip_frames: 프레임 스킵 간격 (1이면 모든 프레임 처리)
-        save_path: 결과를 JSON으로 저장할 경로
+        save_path: 결과를 저장할 경로 (.jsonl, .npz 또는 .json)
         device: 'cuda', 'cpu' 등 (None이면 기본값)
+        progress_callback: (처리한 프레임 수, 전체 프레임 수)를 받는 콜백 (약 1% 단위로 호출)
+        batch_size: 한 번의 predict 호출로 처리할 프레임 수 (1이면 프레임마다 호출)
+        decode_to_model: True면 디코딩 스레드에서 모델 입력 크기로 줄여서 넘김 (박스는 원본 좌표로 복원)
+        num_workers: 2 이상이면 영상을 시간 구간으로 나눠 워커 프로세스들에서 병렬 탐지
+        motion_threshold: 주어지면 마지막 추론 프레임과의 차이(축소 흑백 평균 절대 차, 0~255)가
+                          이 값 미만인 프레임은 추론 없이 결과 재사용 ("reused": True)
+        max_reuse: 연속 재사용 상한 (이 횟수마다 강제로 다시 추론)
+        keyframe_interval: 2 이상이면 샘플 프레임 N개마다 한 번만 탐지하고, 사이 프레임은
+                           앞뒤 키프레임 박스를 보간해서 채움 ("tracked": True)
+        inference: 추론 설정 (inference_options로 생성: 가중치, imgsz, 클래스 목록, conf)
 
     Returns:
         [
@@ -45,62 +233,277 @@ def detect_objects_in_video(
           }, ...
         ]
     """
-    model = _get_model(device=device)
-
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise IOError(f"영상 열기 실패: {video_path}")
-
-    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
-    print("[DEBUG] FPS:", fps)  # 추가
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-
-    results: List[Dict[str, Any]] = []
-    frame_id = 0
-
-    try:
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            if frame_id % skip_frames != 0:
-                frame_id += 1
-                continue
-
-            yolo_result = model.predict(frame, verbose=False)[0]
-            frame_objects = []
-            for box in yolo_result.boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
-                cls_id = int(box.cls[0].item())
-                # 최신 ultralytics에서는 model.names 로 접근
-                label = model.names[cls_id]
-                conf = float(box.conf[0].item())
-
-                frame_objects.append({
-                    "label": label,
-                    "bbox": [x1, y1, x2, y2],
-                    "confidence": conf
-                })
-
-            timestamp = frame_id / fps
-            # === 이 줄 바로 아래에 추가 ===
-            print(f"[DEBUG] frame_id={frame_id}, timestamp={timestamp}")
-            results.append({
-                "frame_id": frame_id,
-                "timestamp": round(timestamp, 3),
-                "objects": frame_objects,
-                "resolution": [width, height]
-            })
-
-            frame_id += 1
-    finally:
-        cap.release()
-
-    if save_path:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        with open(save_path, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+    results = list(iter_objects_in_video(video_path, skip_frames=skip_frames, device=device,
+                                         progress_callback=progress_callback, batch_size=batch_size,
+                                         decode_to_model=decode_to_model, num_workers=num_workers,
+                                         motion_threshold=motion_threshold, max_reuse=max_reuse,
+                                         keyframe_interval=keyframe_interval, inference=inference))
+    save_results(results, save_path)
+    return results
+
+
+def iter_objects_in_video(
+    video_path: str,
+    skip_frames: int = 1,
+    device: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    decode_to_model: bool = False,
+    num_workers: int = 1,
+    motion_threshold: Optional[float] = None,
+    max_reuse: int = DEFAULT_MAX_REUSE,
+    keyframe_interval: int = 1,
+    inference: Optional[Dict[str, Any]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    detect_objects_in_video와 같은 레코드를 frame_id 순서로 하나씩 생성 (인자도 동일).
+    배치 하나(샤딩이면 최대 워커 수 + 1개 샤드, 샤드당 SHARD_MAX_FRAMES 이하)만 메모리에 두므로
+    영상 길이와 무관하게 메모리 사용량이 일정함.
+    (keyframe_interval을 쓰면 보간을 위해 키프레임 레코드만 유지)
+    """
+    if keyframe_interval > 1:
+        step = max(1, skip_frames)
+        keyframes = list(iter_objects_in_video(video_path, skip_frames=step * keyframe_interval, device=device,
+                                               progress_callback=progress_callback, batch_size=batch_size,
+                                               decode_to_model=decode_to_model, num_workers=num_workers,
+                                               motion_threshold=motion_threshold, max_reuse=max_reuse,
+                                               inference=inference))
+        yield from fill_between_keyframes(video_path, keyframes, step)
+        return
+
+    if num_workers > 1:
+        _, _, _, total_frames = probe_video(video_path)
+        if total_frames > 0:
+            yield from iter_object_frames(video_path, list(range(0, total_frames, max(1, skip_frames))),
+                                          device=device, progress_callback=progress_callback,
+                                          batch_size=batch_size, decode_to_model=decode_to_model,
+                                          num_workers=num_workers, motion_threshold=motion_threshold,
+                                          max_reuse=max_reuse, inference=inference)
+            return
+
+    inference = inference or DEFAULT_INFERENCE
+    model = _get_model(device=device, weights=inference["weights"])
+    source = FrameSource(video_path, skip_frames=skip_frames, max_side=_decode_max_side(inference, decode_to_model))
+    print(f"[INFO] 전체 프레임 탐지: {source.fps:.2f}fps, 프레임 {source.total_frames}개 (스킵 {skip_frames})")
+    yield from _iter_from_source(model, source, source.total_frames, progress_callback, batch_size,
+                                 motion_threshold=motion_threshold, max_reuse=max_reuse,
+                                 predict_kwargs=_predict_kwargs(model, inference))
+
+
+def fill_between_keyframes(video_path: str, keyframes: List[Dict[str, Any]], step: int) -> Iterator[Dict[str, Any]]:
+    """
+    키프레임 탐지 결과를 step 간격의 모든 프레임으로 확장 (사이 프레임은 보간, 디코딩 없음)
+    보간 프레임은 하나씩 생성되므로 메모리에는 키프레임만 유지됨
+    """
+    fps, _, _, total_frames = probe_video(video_path)
+    if total_frames <= 0:
+        total_frames = keyframes[-1]["frame_id"] + 1 if keyframes else 0
+    frame_ids = range(0, total_frames, step)
+    print(f"[INFO] 키프레임 탐지: 키프레임 {len(keyframes)}개 → 프레임 {len(frame_ids) if keyframes else 0}개")
+    return iter_interpolated(keyframes, frame_ids, fps)
+
 
+def timestamps_to_frame_ids(timestamps, fps: float, total_frames: int = 0, pad_frames: int = 0) -> List[int]:
+    """
+    초 단위 시각들을 가장 가까운 프레임 번호로 변환 (앞뒤 pad_frames 포함, 중복 제거 후 정렬)
+    """
+    frame_ids = set()
+    for t in timestamps:
+        center = max(0, int(round(float(t) * fps)))
+        if total_frames > 0:
+            center = min(center, total_frames - 1)
+        for fid in range(center - pad_frames, center + pad_frames + 1):
+            if fid >= 0 and (total_frames <= 0 or fid < total_frames):
+                frame_ids.add(fid)
+    return sorted(frame_ids)
+
+
+def detect_objects_at_timestamps(
+    video_path: str,
+    timestamps,
+    pad_frames: int = 0,
+    save_path: Optional[str] = None,
+    device: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    decode_to_model: bool = False,
+    num_workers: int = 1,
+    motion_threshold: Optional[float] = None,
+    max_reuse: int = DEFAULT_MAX_REUSE,
+    inference: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    감정 로그의 video_time 시각에 해당하는 프레임만 디코딩해 객체 탐지.
+    집중도 분석은 감정 샘플마다 가장 가까운 객체 프레임만 쓰므로, 결과 형식은
+    detect_objects_in_video와 같고 탐지 횟수는 감정 샘플 수(x (2*pad_frames+1)) 수준으로 줄어듦.
+
+    Args:
+        timestamps: 감정 로그의 video_time 값들 (초)
+        pad_frames: 각 시각 앞뒤로 함께 탐지할 프레임 수
+        progress_callback: (처리한 대상 프레임 수, 전체 대상 프레임 수)를 받는 콜백
+    """
+    fps, _, _, total_frames = probe_video(video_path)
+    frame_ids = timestamps_to_frame_ids(timestamps, fps, total_frames, pad_frames)
+    print(f"[INFO] 감정 시각 기준 탐지 대상 프레임 {len(frame_ids)}개 (전체 {total_frames}개)")
+    return detect_object_frames(video_path, frame_ids, save_path=save_path, device=device,
+                                progress_callback=progress_callback, batch_size=batch_size,
+                                decode_to_model=decode_to_model, num_workers=num_workers,
+                                motion_threshold=motion_threshold, max_reuse=max_reuse, inference=inference)
+
+
+def detect_object_frames(
+    video_path: str,
+    frame_ids: List[int],
+    save_path: Optional[str] = None,
+    device: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    decode_to_model: bool = False,
+    num_workers: int = 1,
+    motion_threshold: Optional[float] = None,
+    max_reuse: int = DEFAULT_MAX_REUSE,
+    inference: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    지정한 프레임 번호들만 디코딩해 객체 탐지 (결과 형식은 detect_objects_in_video와 동일)
+    progress_callback: (처리한 대상 프레임 수, 전체 대상 프레임 수)를 받는 콜백
+    num_workers: 2 이상이면 프레임 구간을 나눠 워커 프로세스들에서 병렬 탐지
+    """
+    results = list(iter_object_frames(video_path, frame_ids, device=device, progress_callback=progress_callback,
+                                      batch_size=batch_size, decode_to_model=decode_to_model,
+                                      num_workers=num_workers, motion_threshold=motion_threshold,
+                                      max_reuse=max_reuse, inference=inference))
+    save_results(results, save_path)
     return results
+
+
+def iter_object_frames(
+    video_path: str,
+    frame_ids: List[int],
+    device: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    decode_to_model: bool = False,
+    num_workers: int = 1,
+    motion_threshold: Optional[float] = None,
+    max_reuse: int = DEFAULT_MAX_REUSE,
+    inference: Optional[Dict[str, Any]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    detect_object_frames의 레코드를 frame_id 순서로 하나씩 생성
+    """
+    inference = inference or DEFAULT_INFERENCE
+    if num_workers > 1 and len(frame_ids) > 1:
+        yield from _iter_sharded(video_path, sorted(frame_ids), device, progress_callback, batch_size,
+                                 decode_to_model, num_workers, inference,
+                                 motion_threshold=motion_threshold, max_reuse=max_reuse)
+        return
+
+    model = _get_model(device=device, weights=inference["weights"])
+    source = FrameSource(video_path, frame_ids=frame_ids, max_side=_decode_max_side(inference, decode_to_model))
+
+    # 진행률은 대상 프레임 기준 (frame_id → 대상 목록 내 순번)
+    order = {fid: i for i, fid in enumerate(source.frame_ids)}
+    yield from _iter_from_source(model, source, len(source.frame_ids), progress_callback, batch_size,
+                                 position=order.get, motion_threshold=motion_threshold, max_reuse=max_reuse,
+                                 predict_kwargs=_predict_kwargs(model, inference))
+
+
+def _iter_from_source(model: YOLO, source: FrameSource, total: int, progress_callback, batch_size: int,
+                      position=None, motion_threshold: Optional[float] = None,
+                      max_reuse: int = DEFAULT_MAX_REUSE,
+                      predict_kwargs: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    FrameSource가 디코딩하는 동안 배치 추론하고, 배치가 끝날 때마다 프레임 레코드를 내보냄
+    (디코딩은 백그라운드 스레드에서 진행, 소비자가 멈추면 크기 제한 큐 때문에 디코딩도 멈춤)
+    position: frame_id → 진행률 계산용 순번 (None이면 frame_id 그대로)
+    """
+    gate = MotionGate(motion_threshold, max_reuse) if motion_threshold is not None else None
+    detector = _BatchDetector(model, source.fps, [source.width, source.height], batch_size, source.scale, gate,
+                              predict_kwargs)
+    report_every = max(1, total // 100)
+    reported = -1
+
+    with source:
+        for frame_id, frame in source:
+            yield from detector.add(frame_id, frame)
+            done = position(frame_id) if position else frame_id
+            if progress_callback and total > 0 and done // report_every != reported:
+                reported = done // report_every
+                progress_callback(done, total)
+        yield from detector.flush()
+
+    if progress_callback and total > 0:
+        progress_callback(total, total)
+    if gate is not None:
+        print(f"[INFO] 모션 게이트: 프레임 {detector.count}개 중 추론 {gate.skipped}회 생략")
+
+
+# ----------------------------------------------------------------------
+# 멀티 프로세스 샤딩: 워커마다 VideoCapture와 모델을 따로 가짐 (모델은 워커당 한 번만 로드)
+# ----------------------------------------------------------------------
+def _init_shard_worker(device: Optional[str], num_threads: int, weights: str):
+    import torch
+
+    # 워커들이 코어를 나눠 쓰도록 스레드 수 제한 (과다 구독 방지)
+    torch.set_num_threads(num_threads)
+    _get_model(device=device, weights=weights)
+
+
+def _detect_shard(video_path: str, frame_ids: List[int], batch_size: int, decode_to_model: bool,
+                  inference: Dict[str, Any], gate_kwargs):
+    model = _get_model(weights=inference["weights"])
+    source = FrameSource(video_path, frame_ids=frame_ids, max_side=_decode_max_side(inference, decode_to_model))
+    return list(_iter_from_source(model, source, len(frame_ids), None, batch_size,
+                                  predict_kwargs=_predict_kwargs(model, inference), **gate_kwargs))
+
+
+def _split_shards(frame_ids: List[int], num_shards: int) -> List[List[int]]:
+    """
+    정렬된 프레임 번호를 연속된 구간(시간 범위) num_shards개로 균등 분할
+    """
+    num_shards = max(1, min(num_shards, len(frame_ids)))
+    size, extra = divmod(len(frame_ids), num_shards)
+    shards, start = [], 0
+    for i in range(num_shards):
+        end = start + size + (1 if i < extra else 0)
+        shards.append(frame_ids[start:end])
+        start = end
+    return shards
+
+
+def _plan_shards(frame_ids: List[int], num_workers: int) -> List[List[int]]:
+    """
+    워커당 SHARDS_PER_WORKER개 이상, 샤드당 SHARD_MAX_FRAMES개 이하가 되도록 분할
+    """
+    return _split_shards(frame_ids, max(num_workers * SHARDS_PER_WORKER, -(-len(frame_ids) // SHARD_MAX_FRAMES)))
+
+
+def _iter_sharded(video_path: str, frame_ids: List[int], device: Optional[str], progress_callback,
+                  batch_size: int, decode_to_model: bool, num_workers: int, inference: Dict[str, Any],
+                  **gate_kwargs) -> Iterator[Dict[str, Any]]:
+    shards = _plan_shards(frame_ids, num_workers)
+    num_workers = min(num_workers, len(shards))
+    num_threads = max(1, (os.cpu_count() or 1) // num_workers)
+    print(f"[INFO] 샤딩 탐지: 프레임 {len(frame_ids)}개 → 샤드 {len(shards)}개, 워커 {num_workers}개")
+
+    done = 0
+    # fork는 torch/OpenCV 스레드 상태를 물려받아 멈출 수 있으므로 spawn 사용
+    with ProcessPoolExecutor(max_workers=num_workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_shard_worker,
+                             initargs=(device, num_threads, inference["weights"])) as pool:
+        # 샤드는 연속된 시간 구간이므로 제출 순서대로 꺼내면 frame_id 순서가 유지됨.
+        # 끝난 Future는 소비될 때까지 샤드 결과 전체를 들고 있으므로, 동시에 제출하는 샤드는
+        # 워커 수 + 1개로 제한 (샤드 크기도 SHARD_MAX_FRAMES 이하라 영상 길이와 무관하게 메모리 사용량이 일정함)
+        pending = collections.deque()
+        next_shard = 0
+        while pending or next_shard < len(shards):
+            while next_shard < len(shards) and len(pending) <= num_workers:
+                pending.append(pool.submit(_detect_shard, video_path, shards[next_shard], batch_size,
+                                           decode_to_model, inference, gate_kwargs))
+                next_shard += 1
+            shard_index = next_shard - len(pending)
+            yield from pending.popleft().result()
+            done += len(shards[shard_index])
+            if progress_callback:
+                progress_callback(done, len(frame_ids))
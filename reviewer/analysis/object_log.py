@@ -0,0 +1,62 @@
+# object_log.py
+# 객체 로그 스트리밍 형식 (.jsonl): 첫 줄은 헤더, 이후 한 줄에 프레임 레코드 하나.
+# 프레임을 탐지하는 대로 바로 기록하고 읽을 때도 한 줄씩 처리하므로 영상 길이와 무관하게 메모리 사용량이 일정함.
+#
+#   {"format": "shortory-object-log", "version": 1}
+#   {"frame_id": 0, "timestamp": 0.0, "objects": [...], "resolution": [1280, 720]}
+#   ...
+import os
+import json
+from typing import Any, Dict, Iterable, Iterator
+
+OBJECT_LOG_FORMAT = "shortory-object-log"
+OBJECT_LOG_VERSION = 1
+
+
+class ObjectLogWriter:
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+        self._write_line({"format": OBJECT_LOG_FORMAT, "version": OBJECT_LOG_VERSION})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_line(self, obj: Dict[str, Any]):
+        self._file.write(json.dumps(obj, ensure_ascii=False, separators=(",", ":")))
+        self._file.write("\n")
+
+    def write(self, record: Dict[str, Any]):
+        self._write_line(record)
+        self.count += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def write_object_log(path: str, records: Iterable[Dict[str, Any]]) -> int:
+    """
+    레코드 이터러블을 순서대로 기록하고 기록한 프레임 수 반환
+    """
+    with ObjectLogWriter(path) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
+
+
+def iter_object_log(path: str) -> Iterator[Dict[str, Any]]:
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"object log not found: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != OBJECT_LOG_FORMAT:
+            raise ValueError(f"객체 로그 형식이 아닙니다: {path}")
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
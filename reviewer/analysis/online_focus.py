@@ -0,0 +1,225 @@
+# online_focus.py
+# 리뷰 세션 중 실시간 집중도 분석: 감정 샘플을 받는 대로 누적하고, 백그라운드 스레드가 그 시각의 프레임을
+# 객체 탐지한 뒤 더 이상 바뀔 수 없는 윈도우부터 점수를 매겨 상위 top_k 후보만 힙으로 유지.
+# stop 시점에는 마지막 몇 초만 계산하면 되므로 집중 구간이 바로 나오고, 파이프라인에는 숏폼 생성만 남음.
+#
+# 결과는 같은 감정 로그로 run_pipeline(sparse 탐지) + analyze_focus를 돌린 것과 같음.
+# 되감기 등으로 샘플 시각이 거꾸로 들어오면 윈도우를 미리 닫을 수 없으므로 None → 기존 일괄 분석으로 대체
+import os
+import time
+import heapq
+import bisect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .focus_engine import FocusSamples, score_windows
+
+WINDOW_CLOSE_LAG_SEC = 1.0    # 윈도우 끝 + 이 시간까지 샘플과 객체 탐지가 들어와야 닫음
+                              # (이후 샘플의 프레임이 윈도우 안 샘플에 더 가까운 프레임이 될 수 없도록)
+DETECT_INTERVAL_SEC = 2.0     # 새 샘플 시각의 프레임을 모아서 탐지하는 주기
+IDLE_TIMEOUT_SEC = 3600.0     # 이 시간 동안 샘플이 없으면 stop 없이 버려진 세션으로 보고 종료
+
+# 모든 실시간 세션의 객체 탐지를 처리하는 단일 워커: 동시 리뷰 세션 수와 관계없이
+# 실시간 탐지(디코딩 + YOLO)는 한 번에 하나만 돌고 나머지 세션은 차례를 기다림
+_detect_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="online-detect")
+
+
+class OnlineFocusAnalyzer:
+    """
+    감정 샘플(시간 순)과 객체 프레임 레코드를 받아 윈도우를 닫히는 대로 점수 매김 (스레드 안전)
+    윈도우 [t, t + window_sec)는 샘플과 객체 탐지가 t + window_sec + lag_sec까지 들어오면 닫힘
+    """
+
+    def __init__(self, window_sec: int = 10, step_sec: int = 5, top_k: int = 3,
+                 lag_sec: float = WINDOW_CLOSE_LAG_SEC):
+        self.window_sec = window_sec
+        self.step_sec = step_sec
+        self.top_k = top_k
+        self.lag_sec = lag_sec
+        self.in_order = True
+
+        self._samples: List[Dict[str, Any]] = []
+        self._ts: List[float] = []
+        self._requested = 0                      # 탐지 요청으로 넘겨준 샘플 수
+        self._covered_until = float("-inf")      # 이 시각까지의 샘플은 프레임 탐지 완료
+        self._frames: Dict[int, Dict[str, Any]] = {}
+        self._frame_ids: List[int] = []          # 정렬된 frame_id
+        self._frame_ts: List[float] = []         # _frame_ids와 같은 순서의 시각
+
+        self._next_t: Optional[float] = None     # 아직 닫히지 않은 첫 윈도우의 시작 시각
+        self._heap: List[Tuple[float, int, Dict[str, Any]]] = []   # (score, -순번, 구간)
+        self._closed = 0
+        self._lock = threading.Lock()
+
+    def add_sample(self, timestamp: float, emotion: str, attention: float, pupil=None):
+        with self._lock:
+            timestamp = float(timestamp)
+            if self._ts and timestamp < self._ts[-1]:
+                self.in_order = False
+            if self._next_t is None:
+                self._next_t = timestamp
+            self._ts.append(timestamp)
+            self._samples.append({
+                "timestamp": timestamp,
+                "emotion": emotion,
+                "attention": float(attention),
+                "pupil": (float(pupil[0]), float(pupil[1])) if pupil is not None else None
+            })
+
+    def take_pending(self) -> Tuple[List[float], Optional[float]]:
+        """
+        아직 탐지를 요청하지 않은 샘플 시각들과, 그 탐지가 끝나면 커버되는 시각
+        """
+        with self._lock:
+            timestamps = self._ts[self._requested:]
+            self._requested = len(self._ts)
+            return timestamps, (self._ts[-1] if self._ts else None)
+
+    def add_objects(self, records: List[Dict[str, Any]], covered_until: float):
+        """
+        take_pending으로 받은 시각들의 프레임 탐지 결과를 추가하고 닫을 수 있는 윈도우 점수 계산
+        """
+        with self._lock:
+            for rec in records:
+                fid = rec["frame_id"]
+                if fid in self._frames:
+                    continue
+                pos = bisect.bisect_left(self._frame_ids, fid)
+                self._frame_ids.insert(pos, fid)
+                self._frame_ts.insert(pos, rec["timestamp"])
+                self._frames[fid] = rec
+            self._covered_until = max(self._covered_until, covered_until)
+            self._close_windows(final=False)
+
+    def finalize(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        남은 윈도우를 모두 닫고 상위 top_k 구간 반환 (analyze_focus와 같은 형식/순서).
+        순서가 어긋난 샘플이 있었거나 탐지가 끝나지 않은 샘플이 있으면 None
+        """
+        with self._lock:
+            if not self.in_order:
+                return None
+            if not self._samples or not self._frames:
+                return []
+            if self._covered_until < self._ts[-1]:
+                return None
+            self._close_windows(final=True)
+            ordered = sorted(self._heap, key=lambda item: (-item[0], -item[1]))
+            return [segment for _, _, segment in ordered]
+
+    def focus_samples(self) -> FocusSamples:
+        """
+        세션 전체 샘플과 그 최근접 프레임의 시선 적중 (게시글 통합 타임라인용)
+        """
+        with self._lock:
+            return FocusSamples(self._samples, [self._frames[fid] for fid in self._frame_ids])
+
+    def _close_windows(self, final: bool):
+        if not self.in_order or self._next_t is None:
+            return
+        max_time = self._ts[-1]
+        ready_until = min(max_time, self._covered_until)
+
+        # 시작 시각은 analyze_focus와 같이 t += step_sec 누적 (부동소수 오차까지 동일)
+        starts = []
+        t = self._next_t
+        while t < max_time - self.window_sec and (final or t + self.window_sec + self.lag_sec <= ready_until):
+            starts.append(t)
+            t += self.step_sec
+        if not starts:
+            return
+        self._next_t = t
+        self._score(starts)
+
+    def _score(self, starts: List[float]):
+        end = starts[-1] + self.window_sec
+        lo = bisect.bisect_left(self._ts, starts[0])
+        hi = bisect.bisect_left(self._ts, end)
+        # 윈도우 샘플의 최근접 프레임은 샘플 시각 ± lag_sec 안에 있음
+        f_lo = bisect.bisect_left(self._frame_ts, starts[0] - self.lag_sec)
+        f_hi = bisect.bisect_right(self._frame_ts, end + self.lag_sec)
+        frames = [self._frames[fid] for fid in self._frame_ids[f_lo:f_hi]]
+
+        for segment in score_windows(FocusSamples(self._samples[lo:hi], frames), starts, self.window_sec):
+            self._closed += 1
+            if self.top_k <= 0:
+                continue
+            item = (segment["score"], -self._closed, segment)
+            if len(self._heap) < self.top_k:
+                heapq.heappush(self._heap, item)
+            else:
+                # 점수가 같으면 먼저 닫힌(앞선) 윈도우를 남김 = analyze_focus의 안정 정렬과 같은 선택
+                heapq.heappushpop(self._heap, item)
+
+
+class OnlineFocusSession:
+    """
+    task 하나의 실시간 분석. 요청 스레드는 add_sample만 호출하고,
+    윈도우 점수 계산은 세션별 백그라운드 스레드, 객체 탐지는 모든 세션이 공유하는 _detect_worker에서 진행.
+    탐지 설정/캐시는 run_pipeline 기본값(sparse, pad_frames=0)과 같아서 일괄 분석으로 대체되어도 탐지를 다시 하지 않음
+    """
+
+    def __init__(self, video_id: str, window_sec: int = 10, step_sec: int = 5, top_k: int = 3,
+                 interval_sec: float = DETECT_INTERVAL_SEC):
+        self.video_id = video_id
+        self.analyzer = OnlineFocusAnalyzer(window_sec, step_sec, top_k)
+        self.interval_sec = interval_sec
+        self.failed = False
+        self._stop = threading.Event()
+        self._last_sample_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name=f"online-focus-{video_id}", daemon=True)
+        self._thread.start()
+
+    def add_sample(self, timestamp: float, emotion: str, attention: float, pupil=None):
+        self._last_sample_at = time.monotonic()
+        self.analyzer.add_sample(timestamp, emotion, attention, pupil)
+
+    def stop(self):
+        self._stop.set()
+
+    def finish(self, timeout: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        남은 샘플을 탐지하고 상위 집중 구간 반환. 실시간 분석을 쓸 수 없으면 None (일괄 분석 필요)
+        """
+        self.stop()
+        self._thread.join(timeout)
+        if self._thread.is_alive() or self.failed:
+            return None
+        return self.analyzer.finalize()
+
+    def _run(self):
+        try:
+            # YOLO와 파이프라인 설정은 첫 탐지 시점에 로드
+            from . import run_pipeline as pipeline
+            from .frame_source import probe_video
+            from .object_detector import DEFAULT_INFERENCE, detect_object_frames, timestamps_to_frame_ids
+
+            video_path = os.path.join(pipeline.VIDEO_DIR, f"{self.video_id}.mp4")
+            fps, _, _, total_frames = probe_video(video_path)
+            cache_key = pipeline.detection_cache_key(video_path, DEFAULT_INFERENCE)
+            known = pipeline.detection_cache.load(cache_key)
+            detected: Dict[int, Dict[str, Any]] = {}
+
+            while True:
+                stopping = self._stop.wait(self.interval_sec)
+                if not stopping and time.monotonic() - self._last_sample_at > IDLE_TIMEOUT_SEC:
+                    raise TimeoutError("샘플이 오래 들어오지 않음")
+                timestamps, covered_until = self.analyzer.take_pending()
+                if timestamps:
+                    frame_ids = timestamps_to_frame_ids(timestamps, fps, total_frames)
+                    missing = [fid for fid in frame_ids if fid not in known]
+                    found = _detect_worker.submit(detect_object_frames, video_path, missing).result() \
+                        if missing else []
+                    for rec in found:
+                        known[rec["frame_id"]] = detected[rec["frame_id"]] = rec
+                    self.analyzer.add_objects([known[fid] for fid in frame_ids if fid in known], covered_until)
+                if stopping:
+                    break
+
+            # 세션 중 새로 탐지한 프레임은 한 번에 캐시에 저장 (다른 리뷰어/일괄 분석에서 재사용)
+            if detected:
+                pipeline.detection_cache.store(cache_key, detected.values())
+        except Exception as e:
+            self.failed = True
+            print(f"[ONLINE] {self.video_id} 실시간 분석 중단 (stop 후 일괄 분석으로 대체): {e}")
@@ -5,8 +5,8 @@ import csv
 import time
 import threading
 import numpy as np
-from tensorflow.keras.models import load_model
 import mediapipe as mp
+from .emotion_backend import load_emotion_backend
 
 # 경로 설정
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -19,7 +19,7 @@ os.makedirs(LOG_DIR, exist_ok=True)
 shape_x, shape_y = 96, 96
 emotion_weights = {"surprise": 5, "happy": 4, "sad": 3, "angry": 2, "neutral": 1}
 mapped_emotions = ["angry", "happy", "neutral", "sad", "surprise"]
-model = load_model(os.path.join(MODEL_DIR, "emotion_tl2_model.h5"), compile=False)
+backend = load_emotion_backend("auto")
 
 # 얼굴 인식 & 시선 추적 설정
 face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
@@ -85,7 +85,7 @@ def analyze_frame(frame):
     face_resized = cv2.resize(face, (shape_x, shape_y)).astype(np.float32) / 255.0
     face_input = np.reshape(face_resized, (1, shape_x, shape_y, 3))
 
-    pred = model.predict(face_input, verbose=0)[0]
+    pred = backend.predict(face_input)[0]
     idx_em = np.argmax(pred)
     emotion = mapped_emotions[idx_em]
     conf = pred[idx_em]
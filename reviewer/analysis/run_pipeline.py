@@ -1,8 +1,18 @@
 import os
+import heapq
 import argparse
-from .object_detector import detect_objects_in_video
-from .focus_analyzer import analyze_focus_from_logs
-from .shorts_generator import generate_highlight_shorts
+import numpy as np
+from .object_detector import (
+    iter_objects_in_video, iter_object_frames, fill_between_keyframes, timestamps_to_frame_ids,
+    inference_options, DEFAULT_BATCH_SIZE, MODEL_WEIGHTS
+)
+from .frame_source import probe_video
+from .motion_gate import DEFAULT_MAX_REUSE
+from .detection_cache import DetectionCache
+from .focus_analyzer import analyze_focus, load_emotion_logs, select_nearest_frames
+from .focus_engine import FocusSamples
+from .shorts_generator import generate_shorts
+from .background_writer import AsyncObjectLog, save_json_async
 
 # ✅ .flaskroot 기준으로 Flask 프로젝트 루트를 찾는 함수
 def find_project_root():
@@ -23,6 +33,7 @@ VIDEO_DIR = os.path.join(ROOT_DIR, 'reviewer', 'emotion_uploads')
 LOG_DIR = os.path.join(ROOT_DIR, 'logs')
 OBJECT_DIR = os.path.join(ROOT_DIR, 'object_detection_results')
 FOCUS_DIR = os.path.join(ROOT_DIR, 'focus_analysis_results')
+DETECTION_CACHE_DIR = os.path.join(ROOT_DIR, 'object_detection_cache')
 
 # ▶ 디렉토리 생성
 os.makedirs(VIDEO_DIR, exist_ok=True)
@@ -30,6 +41,129 @@ os.makedirs(OBJECT_DIR, exist_ok=True)
 os.makedirs(FOCUS_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# ▶ 객체 탐지 결과 캐시 (같은 영상을 여러 리뷰어가 분석할 때 재사용)
+detection_cache = DetectionCache(DETECTION_CACHE_DIR)
+
+def _stage_progress(progress_callback, start, end, stage):
+    """
+    단계 내부 진행 (done, total)을 전체 진행률 start~end 구간으로 변환하는 콜백 생성
+    """
+    if progress_callback is None:
+        return None
+
+    def callback(done, total):
+        if total > 0:
+            progress_callback(start + (end - start) * min(done, total) / total, stage)
+    return callback
+
+
+def _detect_objects(video_path, emotion_timestamps, object_path, detection_mode, skip_frames, pad_frames,
+                    device, batch_size, decode_to_model, use_cache, num_workers, motion_threshold, max_reuse,
+                    keyframe_interval, inference, progress_callback):
+    """
+    탐지 대상 프레임을 정하고, 캐시에 없는 프레임만 YOLO로 탐지해 합친 뒤
+    집중도 분석에 쓰이는 프레임(감정 시각마다 가장 가까운 프레임)만 메모리로 반환.
+    object_path가 주어지면 전체 프레임 레코드를 백그라운드 스레드에서 .jsonl로 기록
+    """
+    fps, _, _, total_frames = probe_video(video_path)
+    if detection_mode == "sparse":
+        frame_ids = timestamps_to_frame_ids(emotion_timestamps, fps, total_frames, pad_frames)
+    elif detection_mode == "dense":
+        frame_ids = None
+        if total_frames > 0:
+            # 키프레임 모드면 키프레임만 탐지 대상 (사이 프레임은 아래에서 보간)
+            frame_ids = list(range(0, total_frames, max(1, skip_frames) * max(1, keyframe_interval)))
+    else:
+        raise ValueError(f"unknown detection_mode: {detection_mode}")
+
+    if frame_ids is None:
+        # 전체 프레임 수를 알 수 없는 영상은 대상 프레임 목록을 만들 수 없으므로 캐시 없이 순차 탐지
+        records = iter_objects_in_video(video_path=video_path, skip_frames=skip_frames, device=device,
+                                        progress_callback=progress_callback, batch_size=batch_size,
+                                        decode_to_model=decode_to_model, num_workers=num_workers,
+                                        motion_threshold=motion_threshold, max_reuse=max_reuse,
+                                        keyframe_interval=keyframe_interval, inference=inference)
+    else:
+        records = _detect_frames_cached(video_path, frame_ids, device, batch_size, decode_to_model, use_cache,
+                                        num_workers, motion_threshold, max_reuse, inference, progress_callback)
+        if detection_mode == "dense" and keyframe_interval > 1:
+            records = fill_between_keyframes(video_path, list(records), max(1, skip_frames))
+
+    if object_path:
+        records = AsyncObjectLog(object_path).tee(records)
+    return select_nearest_frames(records, emotion_timestamps)
+
+
+def detection_cache_key(video_path, inference, decode_to_model=False, motion_threshold=None,
+                        max_reuse=DEFAULT_MAX_REUSE):
+    """
+    프레임별 탐지 결과에 영향을 주는 값만 키에 포함 (어떤 프레임을 뽑는지는 프레임 단위로 처리)
+    (모션 게이트를 쓰면 재사용된 프레임이 섞이므로 게이트 설정도 포함)
+    """
+    return detection_cache.key(video_path, inference=inference, decode_to_model=decode_to_model,
+                               motion_threshold=motion_threshold,
+                               max_reuse=max_reuse if motion_threshold is not None else None)
+
+
+def _detect_frames_cached(video_path, frame_ids, device, batch_size, decode_to_model, use_cache, num_workers,
+                          motion_threshold, max_reuse, inference, progress_callback):
+    """
+    frame_ids(오름차순) 순서대로 프레임 레코드 생성 (캐시에 있는 프레임은 캐시에서, 없는 프레임만 새로 탐지).
+    캐시 조각과 새 탐지 결과를 frame_id 순으로 이어 붙이며 넘기고, 새 탐지는 조각 단위로 바로 캐시에 추가하므로
+    캐시를 써도 영상 길이와 무관하게 메모리 일정
+    """
+    detect_kwargs = dict(device=device, progress_callback=progress_callback, batch_size=batch_size,
+                         decode_to_model=decode_to_model, num_workers=num_workers,
+                         motion_threshold=motion_threshold, max_reuse=max_reuse, inference=inference)
+    if not use_cache:
+        return iter_object_frames(video_path, frame_ids, **detect_kwargs) if frame_ids else iter(())
+
+    cache_key = detection_cache_key(video_path, inference, decode_to_model, motion_threshold, max_reuse)
+    wanted = np.asarray(frame_ids, dtype=np.int64)
+    is_cached = np.isin(wanted, detection_cache.frame_ids(cache_key))
+    missing = wanted[~is_cached].tolist()
+    print(f"[INFO] 탐지 대상 프레임 {len(frame_ids)}개 (캐시 {len(frame_ids) - len(missing)}개, 새로 탐지 {len(missing)}개)")
+
+    detected = detection_cache.tee(cache_key, iter_object_frames(video_path, missing, **detect_kwargs)) \
+        if missing else iter(())
+    cached = detection_cache.iter_frames(cache_key, wanted[is_cached])
+    return heapq.merge(cached, detected, key=lambda rec: rec["frame_id"])
+
+
+def _analyze_focus_segments(video_path, log_path, object_path, window_sec, step_sec, top_k, progress_callback,
+                            samples_callback=None, **detect_kwargs):
+    """
+    Step 1 (객체 인식) + Step 2 (집중도 분석): 상위 집중 구간 목록 반환
+    """
+    emotion_logs = load_emotion_logs(log_path)
+
+    # Step 1: 객체 인식
+    print("[STEP 1] 객체 인식 시작")
+    if progress_callback: progress_callback(10, "detect")
+    object_logs = _detect_objects(
+        video_path=video_path,
+        emotion_timestamps=[log["timestamp"] for log in emotion_logs],
+        object_path=object_path,
+        progress_callback=_stage_progress(progress_callback, 10, 30, "detect"),
+        **detect_kwargs
+    )
+    if progress_callback: progress_callback(30, "detect")
+
+    # Step 2: 집중도 분석
+    print("[STEP 2] 집중도 분석 시작")
+    if progress_callback: progress_callback(40, "focus")
+    if samples_callback:
+        samples_callback(FocusSamples(emotion_logs, object_logs))
+    return analyze_focus(
+        emotion_logs,
+        object_logs,
+        window_sec=window_sec,
+        step_sec=step_sec,
+        top_k=top_k,
+        debug=True
+    )
+
+
 def run_pipeline(
     video_id: str,
     log_path: str = None,
@@ -38,14 +172,46 @@ def run_pipeline(
     step_sec: int = 5,
     top_k: int = 3,
     device: str = None,
-    progress_callback=None
+    progress_callback=None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    detection_mode: str = "sparse",
+    pad_frames: int = 0,
+    decode_to_model: bool = False,
+    use_cache: bool = True,
+    num_workers: int = 1,
+    motion_threshold: float = None,
+    max_reuse: int = DEFAULT_MAX_REUSE,
+    keyframe_interval: int = 1,
+    model_weights: str = MODEL_WEIGHTS,
+    imgsz: int = None,
+    classes=None,
+    conf: float = None,
+    persist_logs: bool = True,
+    segments=None,
+    samples_callback=None
 ):
+    """
+    progress_callback: (진행률 0~100, 단계 이름)을 받는 콜백
+    detection_mode: "sparse"면 감정 로그 시각의 프레임(앞뒤 pad_frames 포함)만 객체 탐지,
+                    "dense"면 skip_frames 간격으로 전체 영상 탐지
+    decode_to_model: True면 프레임을 모델 입력 크기로 줄여서 디코딩 (박스 좌표는 원본 기준으로 복원)
+    use_cache: 객체 탐지 결과 캐시 사용 여부 (영상 내용 + 모델 + 디코딩 설정 기준)
+    num_workers: 객체 탐지 워커 프로세스 수 (2 이상이면 시간 구간별로 나눠 병렬 탐지)
+    motion_threshold: 주어지면 장면 변화가 이 값 미만인 프레임은 이전 탐지 결과 재사용 (max_reuse마다 강제 갱신)
+    keyframe_interval: dense 모드에서 샘플 프레임 N개마다 한 번만 탐지하고 사이 프레임은 박스 보간
+    model_weights / imgsz / classes / conf: YOLO 가중치, 추론 해상도, 탐지할 라벨 목록, 최소 confidence
+                                            (None이면 ultralytics 기본값)
+    persist_logs: 객체 로그(.jsonl)와 집중 구간(JSON)을 감사/디버깅용으로 저장할지 여부
+                  (단계 사이는 메모리로 넘기므로 저장은 백그라운드에서 진행되고 결과를 기다리지 않음)
+    segments: 리뷰 세션 중에 이미 계산된 집중 구간 (online_focus). 주어지면 객체 인식/집중도 분석을 건너뜀
+    samples_callback: 집중도 분석에 쓴 감정 샘플과 시선 적중(FocusSamples)을 받는 콜백 (게시글 통합 타임라인용)
+    """
     print(f"[INFO] 유튜브 영상 ID: {video_id}")
 
     video_path = os.path.join(VIDEO_DIR, f"{video_id}.mp4")
     if log_path is None:
         log_path = os.path.join(LOG_DIR, f"{video_id}_emotion_log.csv")
-    object_path = os.path.join(OBJECT_DIR, f"{video_id}_objects.json")
+    object_path = os.path.join(OBJECT_DIR, f"{video_id}_objects.jsonl")
     focus_path = os.path.join(FOCUS_DIR, f"{video_id}_focus.json")
 
     # ✅ Flask static 디렉토리 (사용자에게 보여지는 숏폼들)
@@ -57,64 +223,74 @@ def run_pipeline(
     if not os.path.exists(log_path):
         raise FileNotFoundError(f"emotion log not found: {log_path}")
 
-    # Step 1: 객체 인식
-    print("[STEP 1] 객체 인식 시작")
-    if progress_callback: progress_callback(10)
-    detect_objects_in_video(
-        video_path=video_path,
-        skip_frames=skip_frames,
-        save_path=object_path,
-        device=device
-    )
-    if progress_callback: progress_callback(30)
-
-    # Step 2: 집중도 분석
-    print("[STEP 2] 집중도 분석 시작")
-    if progress_callback: progress_callback(40)
-    analyze_focus_from_logs(
-        video_path=video_path,
-        log_path=log_path,
-        object_path=object_path,
-        save_path=focus_path,
-        window_sec=window_sec,
-        step_sec=step_sec,
-        top_k=top_k
-    )
-    if progress_callback: progress_callback(70)
+    if segments is not None:
+        print(f"[STEP 1-2] 세션 중 계산된 집중 구간 {len(segments)}개 사용 (객체 인식/집중도 분석 생략)")
+    else:
+        segments = _analyze_focus_segments(video_path, log_path, object_path if persist_logs else None, window_sec,
+                                           step_sec, top_k, progress_callback, samples_callback,
+                                           detection_mode=detection_mode,
+                                           skip_frames=skip_frames, pad_frames=pad_frames, device=device,
+                                           batch_size=batch_size, decode_to_model=decode_to_model,
+                                           use_cache=use_cache, num_workers=num_workers,
+                                           motion_threshold=motion_threshold, max_reuse=max_reuse,
+                                           keyframe_interval=keyframe_interval,
+                                           inference=inference_options(model_weights, imgsz, classes, conf))
+    if persist_logs:
+        save_json_async(focus_path, segments)
+    if progress_callback: progress_callback(70, "focus")
 
     # Step 3: 숏폼 생성
     print("[STEP 3] 숏폼 생성 시작")
-    if progress_callback: progress_callback(80)
-    generate_highlight_shorts(
+    if progress_callback: progress_callback(80, "shorts")
+    generate_shorts(
         video_path=video_path,
-        focus_path=focus_path,
         output_dir=output_path,
-        default_window_sec=window_sec
+        segments=segments,
+        window_sec=window_sec,
+        progress_callback=_stage_progress(progress_callback, 80, 99, "shorts")
     )
-    if progress_callback: progress_callback(100)
 
     # ✅ done.flag 파일 생성 위치 (Flask가 접근 가능한 위치 하나만 사용)
     done_flag_path = os.path.join(output_path, "done.flag")  # 💡
     with open(done_flag_path, "w") as f:
         f.write("completed")
+    if progress_callback: progress_callback(100, "done")
 
     print(f"[COMPLETE] 전체 파이프라인 완료. 결과 디렉토리: {output_path}")
     print(f"[COMPLETE] done.flag 생성 위치:\n- {done_flag_path}")
 
 
 # 🔹 stop_analysis()에서 호출하는 wrapper
-def run(task_id, log_path=None):
-    run_pipeline(video_id=task_id, log_path=log_path)
+def run(task_id, log_path=None, progress_callback=None, segments=None, samples_callback=None):
+    run_pipeline(video_id=task_id, log_path=log_path, progress_callback=progress_callback, segments=segments,
+                 samples_callback=samples_callback)
 
 # 🔹 CLI 실행용
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="유튜브 영상 기반 숏폼 생성 파이프라인")
     parser.add_argument("video_id", type=str, help="분석할 유튜브 영상 ID (파일명과 동일)")
-    parser.add_argument("--skip_frames", type=int, default=1, help="객체 인식 시 프레임 스킵 간격")
+    parser.add_argument("--skip_frames", type=int, default=1, help="객체 인식 시 프레임 스킵 간격 (dense 모드)")
     parser.add_argument("--window_sec", type=int, default=10, help="집중 구간 길이(초)")
     parser.add_argument("--step_sec", type=int, default=5, help="슬라이딩 윈도우 스텝(초)")
     parser.add_argument("--top_k", type=int, default=3, help="최종 상위 구간 개수")
     parser.add_argument("--device", type=str, default=None, help="'cuda' or 'cpu'")
+    parser.add_argument("--detection_mode", type=str, default="sparse", choices=["sparse", "dense"],
+                        help="sparse: 감정 로그 시각의 프레임만 탐지, dense: skip_frames 간격으로 전체 탐지")
+    parser.add_argument("--pad_frames", type=int, default=0, help="sparse 모드에서 각 시각 앞뒤로 함께 탐지할 프레임 수")
+    parser.add_argument("--decode_to_model", action="store_true", help="프레임을 모델 입력 크기로 줄여서 디코딩")
+    parser.add_argument("--no_cache", action="store_true", help="객체 탐지 결과 캐시를 사용하지 않음")
+    parser.add_argument("--num_workers", type=int, default=1, help="객체 탐지 워커 프로세스 수")
+    parser.add_argument("--motion_threshold", type=float, default=None,
+                        help="장면 변화(축소 흑백 평균 절대 차, 0~255)가 이 값 미만이면 이전 탐지 결과 재사용")
+    parser.add_argument("--max_reuse", type=int, default=DEFAULT_MAX_REUSE, help="연속 재사용 상한 (강제 갱신 주기)")
+    parser.add_argument("--keyframe_interval", type=int, default=1,
+                        help="dense 모드에서 N 샘플 프레임마다 탐지하고 사이 프레임은 박스 보간")
+    parser.add_argument("--model_weights", type=str, default=MODEL_WEIGHTS, help="YOLO 가중치 파일")
+    parser.add_argument("--imgsz", type=int, default=None, help="객체 인식 추론 해상도 (기본 640)")
+    parser.add_argument("--classes", type=str, nargs="+", default=None, help="탐지할 라벨 목록 (예: person 'cell phone')")
+    parser.add_argument("--conf", type=float, default=None, help="최소 confidence (기본 0.25)")
+    parser.add_argument("--batch_size", type=int, default=DEFAULT_BATCH_SIZE, help="객체 인식 배치 크기")
+    parser.add_argument("--no_persist", action="store_true", help="객체 로그/집중 구간 중간 결과 파일을 저장하지 않음")
     args = parser.parse_args()
 
     run_pipeline(
@@ -123,5 +299,19 @@ if __name__ == "__main__":
         window_sec=args.window_sec,
         step_sec=args.step_sec,
         top_k=args.top_k,
-        device=args.device
+        device=args.device,
+        batch_size=args.batch_size,
+        detection_mode=args.detection_mode,
+        pad_frames=args.pad_frames,
+        decode_to_model=args.decode_to_model,
+        use_cache=not args.no_cache,
+        num_workers=args.num_workers,
+        motion_threshold=args.motion_threshold,
+        max_reuse=args.max_reuse,
+        keyframe_interval=args.keyframe_interval,
+        model_weights=args.model_weights,
+        imgsz=args.imgsz,
+        classes=args.classes,
+        conf=args.conf,
+        persist_logs=not args.no_persist
     )
@@ -2,7 +2,7 @@ import os
 import json
 import subprocess
 import cv2
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 
 
 def format_drawtext(emotion: Optional[str], obj: Optional[str], score: Optional[float] = None) -> str:
@@ -22,11 +22,13 @@ def generate_shorts(
     video_path: str,
     output_dir: str,
     segments: List[Dict[str, Any]],
-    window_sec: int = 10
+    window_sec: int = 10,
+    progress_callback: Optional[Callable[[int, int], None]] = None
 ) -> List[str]:
     """
     상위 집중 구간 리스트를 기반으로 숏폼 생성
     영상이 짧을 경우 해당 길이만큼 생성되도록 보완
+    progress_callback: 클립 하나를 처리할 때마다 (처리한 클립 수, 전체 클립 수)로 호출
     """
     os.makedirs(output_dir, exist_ok=True)
     output_files: List[str] = []
@@ -38,6 +40,10 @@ def generate_shorts(
     video_duration = total_frames / fps if fps > 0 else 0
     cap.release()
 
+    def report(done):
+        if progress_callback and segments:
+            progress_callback(done, len(segments))
+
     for idx, seg in enumerate(segments, start=1):
         start_time = float(seg["start"])
         emotion = seg.get("emotion", "neutral")
@@ -52,6 +58,7 @@ def generate_shorts(
 
         if win <= 0:
             print(f"[SKIP] 영상 너무 짧아 클립 생성 생략 (start: {start_time}s)")
+            report(idx)
             continue
 
         output_filename = f"short_{idx:02d}_{emotion}_{obj}_{int(start_time)}s_{score:.2f}.mp4"
@@ -74,10 +81,12 @@ def generate_shorts(
         if result.returncode != 0:
             print(f"[FFMPEG ERROR] Failed to create {output_filename}")
             print(result.stderr)
+            report(idx)
             continue
 
         print(f"[FFMPEG OK] Created: {output_filename}")
         output_files.append(output_path)
+        report(idx)
 
     return output_files
 
@@ -86,7 +95,8 @@ def generate_highlight_shorts(
     video_path: str,
     focus_path: str,
     output_dir: str,
-    default_window_sec: int = 10
+    default_window_sec: int = 10,
+    progress_callback: Optional[Callable[[int, int], None]] = None
 ) -> List[str]:
     """
     저장된 focus 결과(JSON)를 읽어 generate_shorts를 호출하는 래퍼 함수
@@ -98,5 +108,6 @@ def generate_highlight_shorts(
         video_path=video_path,
         output_dir=output_dir,
         segments=segments,
-        window_sec=default_window_sec
+        window_sec=default_window_sec,
+        progress_callback=progress_callback
     )
@@ -1,15 +1,19 @@
 # result_routes.py
 # 결과/진행률 관련 라우트
 
-from flask import Blueprint, render_template, jsonify, session, redirect, url_for, current_app, request
+from flask import Blueprint, render_template, jsonify, session, redirect, url_for, current_app, request, Response
 import os
-from reviewer.services.result_service import get_progress, is_analysis_completed, get_result_clips
+import json
+from reviewer.services.result_service import get_progress, get_analysis_status, get_result_clips
+from reviewer.services.progress_store import pipeline_progress
 from MySQLdb.cursors import DictCursor
 
 
 # ✅ 이 파일에서는 result_bp만 사용 (reviewer_bp 선언/사용 금지)
 result_bp = Blueprint('result', __name__, url_prefix='/reviewer')
 
+SSE_KEEPALIVE_SEC = 15   # 진행률 변화가 없을 때 keep-alive 전송 간격 (프록시 타임아웃 방지)
+
 
 # 1) 분석 종료 직후 대기 페이지
 @result_bp.route('/waiting_analysis/<int:post_id>/<string:task_id>')
@@ -26,30 +30,34 @@ def progress(task_id):
     return jsonify({"progress": get_progress(task_id)})
 
 
-# 3) 완료 여부 폴링 (done.flag 확인)
+# 3) 완료 여부 폴링 (SSE를 쓸 수 없는 브라우저용)
 @result_bp.route('/check_analysis_status/<task_id>')
 def check_analysis_status(task_id):
-    # ✅ Flask 루트 디렉토리 (.flaskroot) 탐색
-    cur = os.path.abspath(os.path.dirname(__file__))
-    root_dir = None
-    while cur != os.path.dirname(cur):
-        if '.flaskroot' in os.listdir(cur):
-            root_dir = cur
-            break
-        cur = os.path.dirname(cur)
-
-    if not root_dir:
-        return jsonify({'status': 'error', 'message': 'Flask 루트(.flaskroot) 못 찾음'})
-
-    done_flag_path = os.path.join(root_dir, 'static', 'shorts_output', task_id, 'done.flag')
-    print(f"[CHECK] done.flag 경로 확인: {done_flag_path}")
-
-    if os.path.exists(done_flag_path):
-        print(f"[CHECK] 완료된 분석 결과 확인됨: {done_flag_path}")
-        return jsonify({'status': 'completed'})
-
-    print(f"[CHECK] 진행 중...: {done_flag_path} 존재하지 않음")
-    return jsonify({'status': 'processing'})
+    return jsonify(get_analysis_status(task_id))
+
+
+# 3-1) 진행률 푸시 (Server-Sent Events)
+#      진행률이 바뀔 때마다 이벤트 전송, 변화가 없으면 주기적으로 keep-alive 주석 전송
+@result_bp.route('/progress_stream/<task_id>')
+def progress_stream(task_id):
+    def events():
+        version = -1
+        last_sent = None
+        while True:
+            state = pipeline_progress.wait(task_id, version, timeout=SSE_KEEPALIVE_SEC)
+            if state is not None:
+                version = state["version"]
+            status = get_analysis_status(task_id)
+            if status != last_sent:
+                last_sent = status
+                yield f"data: {json.dumps(status, ensure_ascii=False)}\n\n"
+            else:
+                yield ": keep-alive\n\n"
+            if status["status"] in ("completed", "failed"):
+                return
+
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 # 4) 결과 페이지
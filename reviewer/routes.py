@@ -4,14 +4,124 @@ from flask_mysqldb import MySQL
 import uuid
 from MySQLdb.cursors import DictCursor
 import os
+import re
 import csv
+import shutil
+import time
 from datetime import datetime
 from urllib.parse import urlparse, parse_qs
-from reviewer.services.analysis_service import start_analysis, analyze_frame, stop_analysis
-import yt_dlp  # ✅ 유튜브 영상 다운로드용
+import json
+from reviewer.analysis.detection_cache import evict_lru, video_fingerprint, FINGERPRINT_SUFFIX
+from reviewer.services.analysis_service import (
+    start_analysis, analyze_frame, analyze_frame_bytes, parse_frame_message, stop_analysis
+)
+
+try:
+    from flask_sock import Sock  # ✅ 프레임 스트리밍(WebSocket)용, 미설치 시 HTTP 경로만 사용
+except ImportError:
+    Sock = None
 
 reviewer_bp = Blueprint('reviewer', __name__, url_prefix='/reviewer')
 mysql = MySQL()
+sock = Sock() if Sock else None
+
+def download_youtube(youtube_url: str, save_path: str):
+    # ✅ 유튜브 영상 다운로드 (yt_dlp는 무거워서 실제 다운로드 시점에 import)
+    import yt_dlp
+
+    ydl_opts = {
+        'outtmpl': save_path,
+        'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/mp4',
+        'quiet': True,
+        'merge_output_format': 'mp4'
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        ydl.download([youtube_url])
+
+
+# 유튜브 영상은 youtube_id별로 한 번만 다운로드해 두고 task별 경로에는 하드링크(불가하면 복사)
+YOUTUBE_CACHE_DIR = os.path.join("reviewer", "emotion_uploads", "youtube")
+YOUTUBE_CACHE_MAX_BYTES = 5 * 1024 * 1024 * 1024   # 다운로드 캐시 전체 크기 상한 (5GB, 오래 안 쓴 영상부터 삭제)
+YOUTUBE_STALE_DOWNLOAD_SEC = 6 * 3600              # 이보다 오래 안 바뀐 임시 파일은 중단된 다운로드의 잔여물로 봄
+YOUTUBE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def _is_cached_youtube_video(fname: str) -> bool:
+    return fname.endswith(".mp4") and fname.count(".") == 1
+
+
+def _evict_youtube_cache(keep: str):
+    """
+    다운로드 캐시 크기 제한. 받는 중이거나 실패로 남은 임시 파일(<id>.<hex>.mp4.part, 포맷별 조각 등)도 크기에 포함하고,
+    최근에 바뀐 임시 파일(다른 요청이 받는 중일 수 있음)만 삭제하지 않음
+    """
+    now = time.time()
+
+    def protected(fname):
+        if fname.endswith(FINGERPRINT_SUFFIX):
+            return True   # 지문 파일은 영상과 함께 아래에서 정리
+        if _is_cached_youtube_video(fname):
+            return False
+        # 임시 파일: 최근에 바뀐 것은 다른 요청이 받는 중일 수 있음
+        try:
+            return now - os.path.getmtime(os.path.join(YOUTUBE_CACHE_DIR, fname)) < YOUTUBE_STALE_DOWNLOAD_SEC
+        except OSError:
+            return False
+
+    # 캐시에서 지워도 이미 하드링크/복사된 task별 영상은 그대로 남음
+    evict_lru(YOUTUBE_CACHE_DIR, YOUTUBE_CACHE_MAX_BYTES, keep=keep, protect=protected)
+    for fname in os.listdir(YOUTUBE_CACHE_DIR):
+        if fname.endswith(FINGERPRINT_SUFFIX) and \
+                not os.path.exists(os.path.join(YOUTUBE_CACHE_DIR, fname[:-len(FINGERPRINT_SUFFIX)])):
+            try:
+                os.remove(os.path.join(YOUTUBE_CACHE_DIR, fname))
+            except OSError:
+                pass
+
+
+def fetch_youtube_video(youtube_url: str, youtube_id: str, save_path: str):
+    if not YOUTUBE_ID_PATTERN.match(youtube_id or ""):
+        download_youtube(youtube_url, save_path)
+        return
+
+    os.makedirs(YOUTUBE_CACHE_DIR, exist_ok=True)
+    cached_path = os.path.join(YOUTUBE_CACHE_DIR, f"{youtube_id}.mp4")
+    if not os.path.exists(cached_path):
+        # 동시에 같은 영상을 받는 경우를 위해 임시 파일에 받은 뒤 교체
+        tmp_prefix = f"{youtube_id}.{uuid.uuid4().hex}."
+        tmp_path = os.path.join(YOUTUBE_CACHE_DIR, f"{tmp_prefix}mp4")
+        try:
+            download_youtube(youtube_url, tmp_path)
+            os.replace(tmp_path, cached_path)
+            # 탐지 캐시 키에 쓰이는 전체 파일 해시는 다운로드 직후 한 번만 계산 (task별 하드링크가 그대로 공유)
+            video_fingerprint(cached_path)
+        finally:
+            # 실패/중단 시 yt_dlp가 남기는 .part, .ytdl, 포맷별 조각(<id>.<hex>.f137.mp4 등)까지 정리
+            for fname in os.listdir(YOUTUBE_CACHE_DIR):
+                if fname.startswith(tmp_prefix):
+                    try:
+                        os.remove(os.path.join(YOUTUBE_CACHE_DIR, fname))
+                    except OSError:
+                        pass
+        _evict_youtube_cache(keep=cached_path)
+    else:
+        print(f"[CACHE] 다운로드된 유튜브 영상 재사용: {youtube_id}")
+        try:
+            os.utime(cached_path)   # 최근 사용 시각 갱신 (LRU)
+        except OSError:
+            pass
+
+    try:
+        os.link(cached_path, save_path)
+    except OSError:
+        # 복사본은 inode가 달라서 지문은 파이프라인에서 한 번 다시 계산됨
+        shutil.copyfile(cached_path, save_path)
+        return
+    try:
+        shutil.copyfile(cached_path + FINGERPRINT_SUFFIX, save_path + FINGERPRINT_SUFFIX)
+    except OSError:
+        pass
+
 
 def extract_video_id(url: str):
     parsed = urlparse(url or "")
@@ -148,14 +258,7 @@ def handle_analyze_url():
     save_path = os.path.join(save_dir, f"{task_id}.mp4")
 
     try:
-        ydl_opts = {
-            'outtmpl': save_path,
-            'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/mp4',
-            'quiet': True,
-            'merge_output_format': 'mp4'
-        }
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([youtube_url])
+        fetch_youtube_video(youtube_url, youtube_id, save_path)
     except Exception as e:
         return f"유튜브 영상 다운로드 실패: {e}", 500
 
@@ -218,6 +321,54 @@ def analyze_frame_route():
     return jsonify(result)
 
 
+# ----------------------------------------------------------------------
+# 프레임 분석 API (바이너리) - body: [video_time float64 LE][JPEG 바이트]
+# ----------------------------------------------------------------------
+@reviewer_bp.route('/analyze_frame_raw/<task_id>', methods=['POST'])
+def analyze_frame_raw_route(task_id):
+    if 'loggedin' not in session or session.get('role') != 'reviewer':
+        return jsonify({"status": "unauthorized"}), 403
+
+    try:
+        video_time, image_data = parse_frame_message(request.get_data(cache=False))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    result = analyze_frame_bytes(image_data, task_id, video_time)
+    return jsonify(result)
+
+
+# ----------------------------------------------------------------------
+# 프레임 스트리밍 (WebSocket) - task 당 연결 하나, 메시지 형식은 analyze_frame_raw 와 동일
+# ----------------------------------------------------------------------
+def stream_frames(ws, task_id):
+    if 'loggedin' not in session or session.get('role') != 'reviewer':
+        ws.close(reason=1008, message="unauthorized")
+        return
+
+    while True:
+        message = ws.receive()
+        if message is None:
+            break
+        if isinstance(message, str):
+            continue
+
+        try:
+            video_time, image_data = parse_frame_message(message)
+        except ValueError as e:
+            ws.send(json.dumps({"status": "error", "message": str(e)}))
+            continue
+
+        result = analyze_frame_bytes(image_data, task_id, video_time)
+        # 성공 응답은 생략하고 오류만 알려 트래픽을 줄임
+        if result.get("status") != "success":
+            ws.send(json.dumps(result))
+
+
+if sock:
+    sock.route('/stream/<task_id>', bp=reviewer_bp)(stream_frames)
+
+
 # ----------------------------------------------------------------------
 # 분석 종료 및 파이프라인 실행
 # ----------------------------------------------------------------------
@@ -231,7 +382,21 @@ def stop_analysis_route():
     if not task_id:
         return jsonify({"status": "error", "message": "task_id is required"}), 400
 
-    result = stop_analysis(task_id)
+    # post_id가 있으면 파이프라인 완료 후 게시글 통합 타임라인에 이 세션을 합침
+    try:
+        post_id = int(data['post_id']) if data.get('post_id') else None
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "잘못된 post_id입니다."}), 400
+    if post_id is not None:
+        # 리뷰를 신청한 게시글일 때만 타임라인에 반영
+        cursor = current_app.mysql.connection.cursor()
+        cursor.execute("SELECT 1 FROM reviewer_post WHERE reviewer_id = %s AND post_id = %s",
+                       (session.get('user_id'), post_id))
+        if not cursor.fetchone():
+            post_id = None
+        cursor.close()
+
+    result = stop_analysis(task_id, post_id=post_id)
     return jsonify(result)
 
 
@@ -469,14 +634,7 @@ def start_analysis_from_post(post_id):
 
     # 3) 유튜브 다운로드 (기존 /analyze_url 과 동일)
     try:
-        ydl_opts = {
-            'outtmpl': save_path,
-            'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/mp4',
-            'quiet': True,
-            'merge_output_format': 'mp4'
-        }
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([youtube_url])
+        fetch_youtube_video(youtube_url, youtube_id, save_path)
     except Exception as e:
         return f"유튜브 영상 다운로드 실패: {e}", 500
 
@@ -1,35 +1,150 @@
 # analysis_service.py
 import os
+import sys
 import base64
-import shutil
+import struct
+import threading
 from datetime import datetime
-from reviewer.analysis import emotion_gaze, run_pipeline
+from reviewer.analysis.focus_analyzer import attention_str_to_float
+from reviewer.analysis.online_focus import OnlineFocusSession
+from reviewer.services.log_buffer import EmotionLogBuffer
+from reviewer.services.job_service import pipeline_jobs, FAILED as JOB_FAILED
+from reviewer.services.progress_store import pipeline_progress, DONE, FAILED
+from reviewer.services.timeline_store import post_timelines
 
-# 로그 저장 디렉토리
-LOG_DIR = "analysis_logs"
+# 로그 저장 디렉토리 (run_pipeline이 읽는 위치에 바로 기록)
 PIPELINE_LOG_DIR = os.path.join("logs")  # static 기준 루트에 logs 디렉토리
-os.makedirs(LOG_DIR, exist_ok=True)
 os.makedirs(PIPELINE_LOG_DIR, exist_ok=True)
 
+# task별 감정 로그 버퍼 (30행 또는 5초마다 파일에 기록)
+emotion_logs = EmotionLogBuffer(
+    PIPELINE_LOG_DIR,
+    header="timestamp,video_time,emotion,attention\n",
+    flush_rows=30,
+    flush_interval_sec=5.0
+)
+
+# task별 실시간 집중도 분석 (세션 중에 객체 탐지/윈도우 점수를 미리 계산 → stop 후 숏폼 생성만 남음)
+ONLINE_FINISH_TIMEOUT_SEC = 60.0
+_online_sessions = {}
+_online_lock = threading.Lock()
+
+
+def _online_start(task_id):
+    with _online_lock:
+        if task_id not in _online_sessions:
+            _online_sessions[task_id] = OnlineFocusSession(task_id)
+
+
+def _online_add_sample(task_id, video_time, emotion, attention):
+    # 세션은 start_analysis에서만 만듦 (stop 이후 늦게 도착한 프레임이 세션/스레드를 새로 만들지 않도록)
+    with _online_lock:
+        session = _online_sessions.get(task_id)
+    if session is not None:
+        session.add_sample(video_time, emotion, attention)
+
+
+def _emotion_gaze():
+    # 무거운 ML 모듈(감정 모델, mediapipe)은 첫 분석 요청 때 로드 → 로그인/상점 등 다른 라우트의 기동이 빨라짐
+    from reviewer.analysis import emotion_gaze
+    return emotion_gaze
+
+
+def _run_pipeline():
+    # ultralytics(YOLO)는 파이프라인 실행 시점에 로드
+    from reviewer.analysis import run_pipeline
+    return run_pipeline
+
+
+def _run_pipeline_job(task_id, log_path, online_session=None, post_id=None):
+    def on_progress(percent, stage=None):
+        pipeline_progress.update(task_id, progress=percent, stage=stage)
+
+    focus_samples = []
+
+    try:
+        # 세션 중 계산된 집중 구간이 있으면 사용, 없으면(None) 파이프라인이 일괄 분석
+        segments = online_session.finish(ONLINE_FINISH_TIMEOUT_SEC) if online_session else None
+        if online_session and segments is None:
+            print(f"[ONLINE] {task_id} 실시간 분석 결과 없음 → 일괄 분석")
+        elif segments is not None and post_id is not None:
+            focus_samples.append(online_session.analyzer.focus_samples())
+        _run_pipeline().run(task_id, log_path, progress_callback=on_progress, segments=segments,
+                            samples_callback=focus_samples.append if post_id is not None else None)
+    except Exception as e:
+        pipeline_progress.update(task_id, status=FAILED, message=str(e))
+        raise
+    pipeline_progress.update(task_id, progress=100, stage="done", status=DONE)
+
+    # 게시글 통합 타임라인에 이 세션을 합침 (실패해도 리뷰어의 숏폼 결과에는 영향 없음)
+    if focus_samples:
+        try:
+            post_timelines.merge_session(post_id, task_id, focus_samples[-1])
+        except Exception as e:
+            print(f"[TIMELINE ERROR] post {post_id} / {task_id}: {e}")
+
+
+def warm_up(load_object_model=False):
+    """
+    분석 전용 워커에서 첫 요청 지연을 없애기 위해 모델을 미리 로드.
+    """
+    import numpy as np
+
+    emotion_gaze = _emotion_gaze()
+    emotion_gaze.backend.predict(np.zeros((1, emotion_gaze.shape_x, emotion_gaze.shape_y, 3), np.float32))
+    emotion_gaze.get_face_cascade()
+    if load_object_model:
+        from reviewer.analysis.object_detector import _get_model
+        _get_model()
+    print("[WARMUP] 분석 모델 로드 완료")
+
+
+# 바이너리 프레임 메시지: [video_time float64 little-endian 8바이트][JPEG 바이트]
+FRAME_HEADER = struct.Struct("<d")
+
 def start_analysis(task_id):
-    log_path = os.path.join(LOG_DIR, f"{task_id}.csv")
-    if not os.path.exists(log_path):
-        with open(log_path, "w", encoding="utf-8") as f:
-            f.write("timestamp,video_time,emotion,attention\n")
+    log_path = emotion_logs.open(task_id)
+    _online_start(task_id)
     print(f"[START] 분석 시작: 로그 파일 생성됨 - {log_path}")
     return {"status": "started"}
 
 
+def parse_frame_message(message):
+    """
+    WebSocket/바이너리 업로드 메시지를 (video_time, JPEG 바이트)로 분리 (복사 없이 memoryview 사용)
+    """
+    if len(message) <= FRAME_HEADER.size:
+        raise ValueError("프레임 메시지가 너무 짧습니다.")
+    view = memoryview(message)
+    video_time = FRAME_HEADER.unpack_from(view)[0]
+    return video_time, view[FRAME_HEADER.size:]
+
+
 def analyze_frame(image_base64, task_id, video_time):
     try:
         image_data = base64.b64decode(image_base64.split(',')[1])
-        emotion, attention = emotion_gaze.analyze_image(image_data)
+    except Exception as e:
+        print(f"[ERROR] analyze_frame 실패: {e}")
+        return {"status": "error", "message": str(e)}
+    return analyze_frame_bytes(image_data, task_id, video_time)
 
-        log_path = os.path.join(LOG_DIR, f"{task_id}.csv")
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        with open(log_path, "a", encoding="utf-8") as f:
-            f.write(f"{now},{video_time:.2f},{emotion},{attention}\n")
+def analyze_frame_bytes(image_data, task_id, video_time):
+    try:
+        emotion, attention = _emotion_gaze().analyze_image(image_data, task_id)
+        attention_value = attention_str_to_float(attention)
+        # CSV에 기록되는 값(소수 둘째 자리)으로 통일 → 컬럼 로그/실시간 분석/일괄 분석이 같은 시각을 봄
+        video_time = round(video_time, 2)
+
+        # 동공 위치는 웹캠(좌우 반전) 프레임 좌표라 영상 프레임의 객체 박스와 비교할 수 없으므로 기록하지 않음
+        # (시선 → 영상 좌표 보정이 생기기 전까지 pupil은 None)
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        emotion_logs.append(
+            task_id,
+            f"{now},{video_time:.2f},{emotion},{attention}\n",
+            sample=(video_time, emotion, attention_value, None)
+        )
+        _online_add_sample(task_id, video_time, emotion, attention_value)
 
         print(f"[LOG] {task_id} - {emotion}, {attention} @ {video_time:.2f}s")
 
@@ -39,23 +154,39 @@ def analyze_frame(image_base64, task_id, video_time):
         return {"status": "error", "message": str(e)}
 
 
-def stop_analysis(task_id):
+def stop_analysis(task_id, post_id=None):
     try:
-        log_path = os.path.join(LOG_DIR, f"{task_id}.csv")
+        # ✅ 버퍼에 남은 로그를 기록 (run_pipeline이 읽는 경로에 바로 저장되어 있어 복사 불필요)
+        log_path = emotion_logs.close(task_id)
         if not os.path.exists(log_path):
             return {"status": "error", "message": "로그 파일이 존재하지 않습니다."}
 
-        # ✅ run_pipeline에서 기대하는 경로로 로그 복사
-        target_log_path = os.path.join(PIPELINE_LOG_DIR, f"{task_id}_emotion_log.csv")
-        shutil.copyfile(log_path, target_log_path)
-        print(f"[INFO] 감정 로그 복사됨: {target_log_path}")
+        # 컬럼 형식 로그가 있으면 파이프라인은 그쪽을 읽음 (CSV 파싱 생략)
+        columns_path = emotion_logs.columns_path_for(task_id)
+        if os.path.exists(columns_path):
+            log_path = columns_path
+
+        # 세션별 시선 추적 상태(FaceMesh) 반납 (모델이 로드된 적 없으면 생략)
+        if "reviewer.analysis.emotion_gaze" in sys.modules:
+            _emotion_gaze().close_session(task_id)
 
-        print(f"[STOP] 분석 종료. 파이프라인 실행 시작 - {log_path}")
-        run_pipeline.run(task_id, log_path)
+        # ✅ 파이프라인은 백그라운드 작업으로 실행하고 바로 응답 (진행률은 progress_store → SSE로 전달)
+        print(f"[STOP] 분석 종료. 파이프라인 작업 등록 - {log_path}")
+        with _online_lock:
+            online_session = _online_sessions.pop(task_id, None)
+        previous = pipeline_jobs.get(task_id)
+        if previous is None or previous["status"] == JOB_FAILED:
+            # 새로 실행되는 작업만 진행률 초기화 (이미 실행 중/완료된 작업은 그대로)
+            pipeline_progress.start(task_id, stage="queued")
+        elif online_session:
+            # 이미 실행 중/완료된 작업이면 실시간 분석 결과는 쓰지 않음
+            online_session.stop()
+            online_session = None
+        job = pipeline_jobs.submit(task_id, _run_pipeline_job, task_id, log_path, online_session, post_id)
 
         # ❌ 여기에서 done.flag를 다시 만들지 않음 (run_pipeline에서 생성됨)
 
-        return {"status": "completed"}
+        return {"status": job["status"], "job": job}
     except Exception as e:
         print(f"[ERROR] stop_analysis 실패: {e}")
         return {"status": "error", "message": str(e)}
@@ -0,0 +1,134 @@
+# job_service.py
+# 파이프라인(객체 인식 → 집중도 분석 → 숏폼 생성)을 웹 요청과 분리해 백그라운드에서 실행
+import os
+import json
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+# 작업 기록(JSON) 저장 디렉토리: 실행 위치(cwd)와 무관하게 프로젝트 루트 기준
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+JOB_DIR = os.path.join(PROJECT_ROOT, "analysis_jobs")
+MAX_WORKERS = 2                # 동시에 실행할 파이프라인 수 상한
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _pid_alive(pid) -> bool:
+    if not pid or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+class JobRunner:
+    """
+    task_id 단위 작업 실행기.
+    - 제한된 크기의 워커 풀에서 실행
+    - 같은 task_id가 대기/실행 중이면 새로 만들지 않고 기존 작업을 반환 (single-flight)
+    - 작업 기록은 JSON 파일로 저장되어 서버 재시작 후에도 상태 조회 가능
+    """
+
+    def __init__(self, job_dir: str = JOB_DIR, max_workers: int = MAX_WORKERS):
+        self.job_dir = job_dir
+        os.makedirs(job_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline-job")
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._recover()
+
+    def submit(self, task_id: str, fn: Callable, *args, **kwargs) -> Dict[str, Any]:
+        with self._lock:
+            job = self._jobs.get(task_id) or self._read(task_id)
+            if job and job["status"] in ACTIVE_STATES + (DONE,):
+                # 이미 대기/실행 중이거나 끝난 작업은 다시 실행하지 않음 (실패한 작업만 재시도)
+                return dict(job)
+
+            job = {
+                "task_id": task_id,
+                "status": QUEUED,
+                "created_at": _now(),
+                "started_at": None,
+                "finished_at": None,
+                "error": None,
+                "pid": os.getpid(),
+            }
+            self._jobs[task_id] = job
+            self._write(job)
+
+        self._executor.submit(self._run, task_id, fn, args, kwargs)
+        print(f"[JOB] 작업 등록: {task_id}")
+        return dict(job)
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(task_id) or self._read(task_id)
+            return dict(job) if job else None
+
+    def _run(self, task_id: str, fn: Callable, args, kwargs):
+        self._update(task_id, status=RUNNING, started_at=_now(), pid=os.getpid())
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            self._update(task_id, status=FAILED, finished_at=_now(), error=str(e))
+            print(f"[JOB] 작업 실패: {task_id} - {e}")
+            return
+        self._update(task_id, status=DONE, finished_at=_now())
+        print(f"[JOB] 작업 완료: {task_id}")
+
+    def _update(self, task_id: str, **fields):
+        with self._lock:
+            job = self._jobs.setdefault(task_id, {"task_id": task_id})
+            job.update(fields)
+            self._write(job)
+
+    def _path(self, task_id: str) -> str:
+        return os.path.join(self.job_dir, f"{task_id}.json")
+
+    def _read(self, task_id: str) -> Optional[Dict[str, Any]]:
+        path = self._path(task_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, job: Dict[str, Any]):
+        path = self._path(job["task_id"])
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _recover(self):
+        """
+        종료된 프로세스에서 대기/실행 중이던 작업은 더 이상 진행되지 않으므로 실패로 기록
+        (다른 워커 프로세스가 살아서 실행 중인 작업은 그대로 둠)
+        """
+        for fname in os.listdir(self.job_dir):
+            if not fname.endswith(".json"):
+                continue
+            job = self._read(fname[:-len(".json")])
+            if job and job.get("status") in ACTIVE_STATES and not _pid_alive(job.get("pid")):
+                job.update(status=FAILED, finished_at=_now(), error="서버 재시작으로 작업이 중단되었습니다.")
+                self._write(job)
+
+
+pipeline_jobs = JobRunner()
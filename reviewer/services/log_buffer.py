@@ -0,0 +1,130 @@
+# log_buffer.py
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from reviewer.analysis.log_columns import EmotionColumnBuilder, save_columns
+
+
+class _TaskLog:
+    def __init__(self, path: str):
+        self.path = path
+        self.rows: List[str] = []
+        self.first_pending_at: Optional[float] = None
+        self.last_append_at = time.monotonic()
+        self.columns = EmotionColumnBuilder()
+        self.lock = threading.Lock()
+
+
+class EmotionLogBuffer:
+    """
+    task별 감정 로그를 메모리에 모았다가 일정 행 수 또는 일정 시간마다 한 번에 파일에 기록.
+    프레임마다 open/append/close 하던 방식 대비 파일 열기 횟수가 크게 줄어듦.
+    CSV와 함께 컬럼 형식(.npz)도 누적해 close 시 저장 (focus_analyzer의 빠른 로더용).
+    """
+
+    def __init__(self, log_dir: str, header: str, flush_rows: int = 30, flush_interval_sec: float = 5.0,
+                 idle_close_sec: float = 3600.0):
+        self.log_dir = log_dir
+        self.header = header
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval_sec = flush_interval_sec
+        self.idle_close_sec = idle_close_sec
+
+        self._tasks: Dict[str, _TaskLog] = {}
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Thread] = None
+
+    def path_for(self, task_id: str) -> str:
+        return os.path.join(self.log_dir, f"{task_id}_emotion_log.csv")
+
+    def columns_path_for(self, task_id: str) -> str:
+        return os.path.join(self.log_dir, f"{task_id}_emotion_log.npz")
+
+    def open(self, task_id: str) -> str:
+        task_log = self._get(task_id)
+        with task_log.lock:
+            if not os.path.exists(task_log.path):
+                os.makedirs(os.path.dirname(task_log.path) or ".", exist_ok=True)
+                with open(task_log.path, "w", encoding="utf-8") as f:
+                    f.write(self.header)
+        return task_log.path
+
+    def append(self, task_id: str, line: str, sample: Optional[Tuple] = None):
+        """
+        line: CSV 한 줄, sample: (video_time, emotion, attention, pupil) 컬럼 누적용
+        """
+        task_log = self._get(task_id)
+        with task_log.lock:
+            task_log.last_append_at = time.monotonic()
+            if task_log.first_pending_at is None:
+                task_log.first_pending_at = task_log.last_append_at
+            task_log.rows.append(line)
+            if sample is not None:
+                task_log.columns.append(*sample)
+            if len(task_log.rows) >= self.flush_rows:
+                self._flush_locked(task_log)
+
+    def flush(self, task_id: str):
+        with self._lock:
+            task_log = self._tasks.get(task_id)
+        if task_log is not None:
+            with task_log.lock:
+                self._flush_locked(task_log)
+
+    def close(self, task_id: str) -> str:
+        """
+        남은 로그를 모두 기록하고 task를 버퍼에서 제거. CSV 로그 파일 경로 반환.
+        컬럼 샘플이 있으면 columns_path_for(task_id)에 .npz로 함께 저장.
+        """
+        with self._lock:
+            task_log = self._tasks.pop(task_id, None)
+        if task_log is None:
+            return self.path_for(task_id)
+        with task_log.lock:
+            self._flush_locked(task_log)
+            if len(task_log.columns):
+                save_columns(self.columns_path_for(task_id), task_log.columns.to_columns())
+        return task_log.path
+
+    def _get(self, task_id: str) -> _TaskLog:
+        with self._lock:
+            task_log = self._tasks.get(task_id)
+            if task_log is None:
+                task_log = _TaskLog(self.path_for(task_id))
+                self._tasks[task_id] = task_log
+            self._ensure_timer()
+            return task_log
+
+    def _flush_locked(self, task_log: _TaskLog):
+        if not task_log.rows:
+            return
+        # start_analysis 없이 프레임이 먼저 들어온 경우에도 헤더가 있도록 함
+        need_header = not os.path.exists(task_log.path)
+        with open(task_log.path, "a", encoding="utf-8") as f:
+            if need_header:
+                f.write(self.header)
+            f.writelines(task_log.rows)
+        task_log.rows = []
+        task_log.first_pending_at = None
+
+    def _ensure_timer(self):
+        if self._timer is None or not self._timer.is_alive():
+            self._timer = threading.Thread(target=self._flush_loop, name="emotion-log-flush", daemon=True)
+            self._timer.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval_sec)
+            now = time.monotonic()
+            with self._lock:
+                task_logs = list(self._tasks.items())
+            for task_id, task_log in task_logs:
+                # stop 없이 버려진 세션은 기록 후 정리
+                if now - task_log.last_append_at >= self.idle_close_sec:
+                    self.close(task_id)
+                    continue
+                with task_log.lock:
+                    if task_log.first_pending_at is not None and now - task_log.first_pending_at >= self.flush_interval_sec:
+                        self._flush_locked(task_log)
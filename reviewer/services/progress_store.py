@@ -0,0 +1,82 @@
+# progress_store.py
+# 파이프라인 진행률 저장소 (메모리). SSE 스트림이 변경을 기다렸다가 바로 전달할 수 있도록 Condition 사용
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# 진행 상태
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+KEEP_FINISHED_SEC = 600   # 끝난 작업의 진행 정보를 메모리에 유지하는 시간
+
+
+class ProgressStore:
+    def __init__(self):
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._cond = threading.Condition()
+
+    def start(self, task_id: str, stage: Optional[str] = None):
+        """
+        새 작업(또는 실패 후 재시도)의 진행 정보를 0%로 초기화
+        """
+        with self._cond:
+            old = self._states.get(task_id)
+            self._states[task_id] = {"task_id": task_id, "progress": 0, "stage": stage, "status": RUNNING,
+                                     "message": None, "version": (old["version"] + 1) if old else 1,
+                                     "updated_at": time.time()}
+            self._cond.notify_all()
+
+    def update(self, task_id: str, progress: Optional[float] = None, stage: Optional[str] = None,
+               status: Optional[str] = None, message: Optional[str] = None):
+        with self._cond:
+            state = self._states.get(task_id)
+            if state is None:
+                state = {"task_id": task_id, "progress": 0, "stage": None, "status": RUNNING,
+                         "message": None, "version": 0}
+                self._states[task_id] = state
+            if progress is not None:
+                # 진행률은 뒤로 가지 않도록
+                state["progress"] = max(state["progress"], min(100, int(progress)))
+            if stage is not None:
+                state["stage"] = stage
+            if status is not None:
+                state["status"] = status
+            if message is not None:
+                state["message"] = message
+            state["version"] += 1
+            state["updated_at"] = time.time()
+            self._cond.notify_all()
+            self._prune_locked()
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._cond:
+            state = self._states.get(task_id)
+            return dict(state) if state else None
+
+    def wait(self, task_id: str, after_version: int, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        task의 version이 after_version보다 커질 때까지 최대 timeout초 대기.
+        변경이 없으면 None 반환.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                state = self._states.get(task_id)
+                if state is not None and state["version"] > after_version:
+                    return dict(state)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def _prune_locked(self):
+        now = time.time()
+        expired = [tid for tid, s in self._states.items()
+                   if s["status"] in (DONE, FAILED) and now - s["updated_at"] > KEEP_FINISHED_SEC]
+        for tid in expired:
+            del self._states[tid]
+
+
+pipeline_progress = ProgressStore()
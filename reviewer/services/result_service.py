@@ -1,9 +1,14 @@
 import os
+from functools import lru_cache
+from reviewer.services.job_service import pipeline_jobs, FAILED
+from reviewer.services import progress_store
+from reviewer.services.progress_store import pipeline_progress
 
 OUTPUT_DIR = os.path.join("static", "shorts_output")
 ANALYSIS_DIR = os.path.join("analysis_outputs")
 
 
+@lru_cache(maxsize=1)
 def get_flask_root_dir():
     cur = os.path.abspath(os.path.dirname(__file__))
     while cur != os.path.dirname(cur):
@@ -14,7 +19,41 @@ def get_flask_root_dir():
 
 
 def get_progress(task_id):
-    return 100 if is_analysis_completed(task_id) else 60
+    state = pipeline_progress.get(task_id)
+    if state:
+        return state["progress"]
+    # 이 프로세스가 실행하지 않은 작업 (서버 재시작 등) → 완료 여부만 확인
+    return 100 if is_analysis_completed(task_id) else 0
+
+
+def get_analysis_status(task_id):
+    """
+    분석 상태 조회: 메모리 진행률 저장소를 먼저 보고, 없을 때만 done.flag / 작업 기록 확인
+    반환: {"status": "completed" | "failed" | "processing", "progress": int, "stage": str, "message": str}
+    """
+    state = pipeline_progress.get(task_id)
+    if state:
+        status = {progress_store.DONE: "completed", progress_store.FAILED: "failed"}.get(state["status"], "processing")
+        return {"status": status, "progress": state["progress"], "stage": state["stage"], "message": state["message"]}
+
+    if is_analysis_completed(task_id):
+        return {"status": "completed", "progress": 100, "stage": "done", "message": None}
+
+    # 백그라운드 파이프라인 작업이 실패한 경우
+    error = get_job_failure(task_id)
+    if error:
+        return {"status": "failed", "progress": 0, "stage": None, "message": error}
+    return {"status": "processing", "progress": 0, "stage": None, "message": None}
+
+
+def get_job_failure(task_id):
+    """
+    파이프라인 작업이 실패했으면 오류 메시지, 아니면 None
+    """
+    job = pipeline_jobs.get(task_id)
+    if job and job.get("status") == FAILED:
+        return job.get("error") or "분석 작업이 실패했습니다."
+    return None
 
 
 def is_analysis_completed(task_id):
@@ -0,0 +1,174 @@
+# timeline_store.py
+# 게시글(영상)별 리뷰어 통합 집중도 타임라인
+#
+# 리뷰 세션의 파이프라인이 끝날 때마다 그 세션의 감정 샘플을 초 단위 배열에 더함 (합계/개수만 저장).
+# 게시글마다 .npz 하나라서 크리에이터 히트맵 조회는 리뷰어 수와 무관하게 파일 하나만 읽고,
+# 같은 프로세스에서는 파일이 바뀌지 않았으면 만들어 둔 응답을 그대로 반환.
+#
+# 타임라인 파일 (영상 T초, 감정 E종, 라벨 L종)
+#   tasks           str     (S,)     이미 합친 리뷰 세션 task_id (같은 세션 중복 합산 방지)
+#   samples         int64   (T,)     초별 감정 샘플 수
+#   attention_sum   float64 (T,)     초별 집중도 합계
+#   emotions        str     (E,)     감정 문자열 사전
+#   emotion_counts  int64   (T, E)   초별 감정 샘플 수
+#   object_hits     int64   (T,)     초별 시선이 객체 박스 안에 있던 샘플 수
+#   labels          str     (L,)     라벨 문자열 사전
+#   label_hits      int64   (T, L)   초별 라벨마다 시선이 들어간 샘플 수
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from reviewer.analysis.file_lock import locked
+from reviewer.analysis.log_columns import load_columns, save_columns
+
+# 실행 위치(cwd)와 무관하게 프로젝트 루트 기준 (여러 워커 프로세스가 같은 파일을 봐야 함)
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+POST_TIMELINE_DIR = os.path.join(PROJECT_ROOT, "post_timelines")
+
+
+def _empty_timeline() -> Dict[str, np.ndarray]:
+    return {
+        "tasks": np.zeros(0, dtype=str),
+        "samples": np.zeros(0, dtype=np.int64),
+        "attention_sum": np.zeros(0, dtype=np.float64),
+        "emotions": np.zeros(0, dtype=str),
+        "emotion_counts": np.zeros((0, 0), dtype=np.int64),
+        "object_hits": np.zeros(0, dtype=np.int64),
+        "labels": np.zeros(0, dtype=str),
+        "label_hits": np.zeros((0, 0), dtype=np.int64),
+    }
+
+
+def _grow(values: np.ndarray, seconds: int, width: Optional[int] = None) -> np.ndarray:
+    """
+    초 축(0번 축)을 seconds까지, 2차원이면 사전 축을 width까지 0으로 늘림
+    """
+    pad = [(0, seconds - values.shape[0])]
+    if values.ndim == 2:
+        pad.append((0, width - values.shape[1]))
+    return np.pad(values, pad)
+
+
+def _merge_vocab(vocab: np.ndarray, names: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    기존 사전에 names를 추가하고 (새 사전, names 각각의 인덱스) 반환
+    """
+    index = {name: i for i, name in enumerate(vocab.tolist())}
+    codes = np.array([index.setdefault(name, len(index)) for name in names], dtype=np.int64)
+    return np.array(list(index), dtype=str), codes
+
+
+def _histogram(seconds: np.ndarray, codes: np.ndarray, num_seconds: int, width: int) -> np.ndarray:
+    return np.bincount(seconds * width + codes, minlength=num_seconds * width).reshape(num_seconds, width)
+
+
+def accumulate(timeline: Dict[str, np.ndarray], samples) -> Dict[str, np.ndarray]:
+    """
+    FocusSamples(한 리뷰 세션)를 타임라인에 더한 새 타임라인 반환
+    """
+    valid = samples.timestamp >= 0
+    seconds = samples.timestamp[valid].astype(np.int64)
+    num_seconds = max(len(timeline["samples"]), int(seconds.max()) + 1 if len(seconds) else 0)
+
+    emotions, emotion_codes = _merge_vocab(timeline["emotions"], samples.emotions)
+    labels, label_codes = _merge_vocab(timeline["labels"], samples.labels)
+    hits = samples.hits[valid] > 0
+
+    merged = dict(timeline)
+    merged["samples"] = _grow(timeline["samples"], num_seconds) + np.bincount(seconds, minlength=num_seconds)
+    merged["attention_sum"] = _grow(timeline["attention_sum"], num_seconds) + \
+        np.bincount(seconds, weights=samples.attention[valid], minlength=num_seconds)
+    merged["emotions"] = emotions
+    merged["emotion_counts"] = _grow(timeline["emotion_counts"], num_seconds, len(emotions)) + \
+        _histogram(seconds, emotion_codes[samples.emotion[valid]], num_seconds, len(emotions))
+    merged["object_hits"] = _grow(timeline["object_hits"], num_seconds) + \
+        np.bincount(seconds, weights=hits.any(axis=1), minlength=num_seconds).astype(np.int64)
+
+    # 라벨별: 샘플 행 x 라벨 열 중 적중한 칸만 (초, 라벨) 히스토그램으로
+    hit_row, hit_col = np.nonzero(hits)
+    merged["labels"] = labels
+    merged["label_hits"] = _grow(timeline["label_hits"], num_seconds, len(labels)) + \
+        _histogram(seconds[hit_row], label_codes[hit_col], num_seconds, len(labels))
+    return merged
+
+
+def to_heatmap(post_id: int, timeline: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """
+    크리에이터 화면용 초 단위 히스토그램 (샘플이 없는 초의 평균 집중도는 None)
+    """
+    samples = timeline["samples"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        attention = np.round(timeline["attention_sum"] / samples, 3)
+    return {
+        "post_id": post_id,
+        "sessions": len(timeline["tasks"]),
+        "seconds": len(samples),
+        "samples": samples.tolist(),
+        "attention": [None if n == 0 else a for n, a in zip(samples.tolist(), attention.tolist())],
+        "emotions": timeline["emotions"].tolist(),
+        "emotion_counts": timeline["emotion_counts"].tolist(),
+        "object_hits": timeline["object_hits"].tolist(),
+        "labels": timeline["labels"].tolist(),
+        "label_hits": timeline["label_hits"].tolist(),
+    }
+
+
+class PostTimelineStore:
+    """
+    post_id별 타임라인 파일 관리. merge_session은 백그라운드 파이프라인 작업에서, heatmap은 크리에이터 요청에서 호출
+    """
+
+    def __init__(self, timeline_dir: str = POST_TIMELINE_DIR):
+        self.timeline_dir = timeline_dir
+        os.makedirs(timeline_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._heatmaps: Dict[int, Tuple[int, Dict[str, Any]]] = {}   # post_id -> (파일 mtime_ns, 응답)
+
+    def path_for(self, post_id: int) -> str:
+        return os.path.join(self.timeline_dir, f"post_{post_id}_timeline.npz")
+
+    def merge_session(self, post_id: int, task_id: str, samples) -> bool:
+        """
+        리뷰 세션 하나의 샘플(FocusSamples)을 타임라인에 합침. 이미 합친 세션이면 False
+        """
+        path = self.path_for(post_id)
+        # 다른 워커 프로세스도 같은 게시글 타임라인을 갱신할 수 있으므로 읽기-합치기-쓰기 전체를 파일 잠금으로 감쌈
+        with self._lock, locked(path):
+            timeline = load_columns(path) if os.path.exists(path) else _empty_timeline()
+            if task_id in timeline["tasks"].tolist():
+                return False
+
+            timeline = accumulate(timeline, samples)
+            timeline["tasks"] = np.append(timeline["tasks"], task_id)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            save_columns(tmp_path, timeline)
+            os.replace(tmp_path, path)
+            self._heatmaps[post_id] = (os.stat(path).st_mtime_ns, to_heatmap(post_id, timeline))
+
+        print(f"[TIMELINE] post {post_id}: 세션 {task_id} 합침 (누적 {len(timeline['tasks'])}개, "
+              f"{len(timeline['samples'])}초)")
+        return True
+
+    def heatmap(self, post_id: int) -> Optional[Dict[str, Any]]:
+        """
+        게시글의 통합 히트맵 (합친 세션이 없으면 None)
+        다른 워커 프로세스가 파일을 갱신했을 수 있으므로 mtime이 같을 때만 만들어 둔 응답 사용
+        """
+        path = self.path_for(post_id)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self._heatmaps.get(post_id)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with self._lock:
+            heatmap = to_heatmap(post_id, load_columns(path))
+            self._heatmaps[post_id] = (mtime, heatmap)
+        return heatmap
+
+
+post_timelines = PostTimelineStore()